@@ -0,0 +1,131 @@
+"""워드(DOCX) 전자책 렌더링 벤치마크
+
+    python benchmarks/bench_docx.py [--chapters 5] [--subtopics 10] [--repeat 3] [--out book.docx]
+
+책 한 권(기본: 챕터 5개 x 소제목 10개, 소제목마다 약 3천 자, 가끔 표 포함)을 렌더링해
+걸린 시간과 파일 크기, document.xml 크기를 출력한다. --out을 주면 결과 파일을 저장한다.
+이어서 챕터 조각 캐시(FragmentCache)를 채운 뒤 소제목 하나의 문단 하나만 고쳐 다시 내보내는
+시간을 잰다 (결과 document.xml이 캐시 없이 만든 것과 같은지도 확인).
+"""
+import argparse
+import io
+import random
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from docx_export import DOCX_AVAILABLE, DocxChapter, DocxSubtopic, FragmentCache, get_template, render_ebook_docx  # noqa: E402
+
+SENTENCES = [
+    "처음에는 저도 막막했습니다.",
+    "「작은 습관」 하나가 결과를 바꿉니다.",
+    "핵심은 꾸준함입니다.",
+    "매일 10분만 투자하면 됩니다.",
+    "생각보다 많은 사람들이 이 단계에서 포기합니다.",
+    "결국 방법은 하나였습니다.",
+]
+TABLE = "| 구분 | 전 | 후 |\n|---|---|---|\n| 시간 | 3시간 | 30분 |\n| 비용 | 10만 원 | 2만 원 |"
+
+
+def make_text(rng, table_rate):
+    """정리된 본문 하나 (약 3천 자, table_rate 확률로 문단 뒤에 표)"""
+    parts = []
+    while sum(len(p) for p in parts) < 3000:
+        parts.append(' '.join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 5))))
+        if rng.random() < table_rate:
+            parts.append(TABLE)
+        elif rng.random() < 0.05:
+            parts.append("★ 이 문장만은 꼭 기억하세요.")
+    return '\n\n'.join(parts)
+
+
+def make_book(n_chapters, n_subtopics, table_rate=0.03, seed=1):
+    rng = random.Random(seed)
+    return [
+        DocxChapter(c, f"PART {c + 1}. 챕터 제목 {c + 1}", [
+            DocxSubtopic(s, f"소제목 {c + 1}-{s + 1}", make_text(rng, table_rate))
+            for s in range(n_subtopics)
+        ])
+        for c in range(n_chapters)
+    ]
+
+
+def render(chapters, fragment_cache=None):
+    return render_ebook_docx(
+        "벤치마크 책", "부제", "저자", chapters,
+        prologue="프롤로그 문단입니다.\n\n" * 5,
+        epilogue="에필로그 문단입니다.\n\n" * 5,
+        author_bio="저자 소개입니다.\n\n" * 3,
+        fragment_cache=fragment_cache,
+    )
+
+
+def edit_one_paragraph(chapters, chapter_index):
+    """chapter_index 챕터 첫 소제목의 첫 문단만 바꾼 책"""
+    chapter = chapters[chapter_index]
+    first = chapter.subtopics[0]
+    edited = first._replace(text="고친 문장입니다. " + first.text)
+    chapters = list(chapters)
+    chapters[chapter_index] = chapter._replace(subtopics=[edited, *chapter.subtopics[1:]])
+    return chapters
+
+
+def document_xml(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return zf.read('word/document.xml')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chapters", type=int, default=5)
+    parser.add_argument("--subtopics", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+    if not DOCX_AVAILABLE:
+        print("python-docx is not installed")
+        return 1
+
+    chapters = make_book(args.chapters, args.subtopics)
+    chars = sum(len(sub.text) for ch in chapters for sub in ch.subtopics)
+    print(f"book: {args.chapters} chapters x {args.subtopics} subtopics, {chars:,} chars")
+
+    started = time.perf_counter()
+    get_template()
+    print(f"template build: {(time.perf_counter() - started) * 1e3:.1f} ms (once per process)")
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        data = render(chapters)
+        timings.append(time.perf_counter() - started)
+    print(f"render: best {min(timings) * 1e3:.1f} ms, mean {sum(timings) / len(timings) * 1e3:.1f} ms")
+    print(f"docx: {len(data) / 1024:.1f} KiB, document.xml {len(document_xml(data)) / 1024:.1f} KiB")
+
+    # 캐시를 채운 뒤 매번 다른 챕터의 문단 하나를 고쳐 다시 내보낸다
+    cache = FragmentCache()
+    started = time.perf_counter()
+    render(chapters, cache)
+    cold = time.perf_counter() - started
+    timings = []
+    same = True
+    for i in range(args.repeat):
+        edited = edit_one_paragraph(chapters, i % len(chapters))
+        started = time.perf_counter()
+        cached = render(edited, cache)
+        timings.append(time.perf_counter() - started)
+        same &= document_xml(cached) == document_xml(render(edited))
+    print(f"cached export: cold {cold * 1e3:.1f} ms, after a one-paragraph edit best {min(timings) * 1e3:.1f} ms"
+          f" ({len(chapters) - 1}/{len(chapters)} chapters from cache), same document.xml: {'ok' if same else 'DIFFERENT'}")
+
+    if args.out:
+        Path(args.out).write_bytes(data)
+        print(f"saved {args.out}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""본문 정리 벤치마크: 예전 clean_text/clean_content vs text_normalize
+
+    python benchmarks/bench_normalize.py [--repeat 5] [--fuzz 50000]
+
+1) 짧은 문자열 전수 조합 + 무작위 문자열로 두 구현의 결과가 같은지 확인 (다르면 종료 코드 1)
+2) 책 한 권 분량(소제목 50개 x 약 3천 자)의 한국어 본문으로 처리량(MB/s)을 잰다.
+"""
+import argparse
+import itertools
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from text_normalize import clean_content, clean_text  # noqa: E402
+
+
+def legacy_clean_text(text):
+    """바꾸기 전 clean_text"""
+    if not text:
+        return ""
+    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\*\*([^*]+)\*\*', r'「\1」', text)
+    text = text.replace('**', '').replace('*', '').replace('###', '').replace('##', '').replace('#', '')
+    return text.strip()
+
+
+def legacy_clean_content(text):
+    """바꾸기 전 clean_content"""
+    if not text:
+        return ""
+    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
+    text = re.sub(r'\*([^*]+)\*', r'\1', text)
+    text = text.replace('**', '').replace('*', '').replace('###', '').replace('##', '').replace('#', '')
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+PAIRS = [
+    ("clean_content", legacy_clean_content, clean_content),
+    ("clean_text", legacy_clean_text, clean_text),
+]
+
+
+def check_equal(fuzz):
+    """다른 결과가 나온 입력 목록"""
+    mismatches = []
+    inputs = (''.join(t) for n in range(1, 8) for t in itertools.product('#* \na', repeat=n))
+    rng = random.Random(0)
+    alphabet = '#* \n\t가나「」★.|'
+    randoms = (''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(fuzz))
+    for text in itertools.chain(inputs, randoms):
+        for name, old, new in PAIRS:
+            if old(text) != new(text):
+                mismatches.append((name, text))
+    return mismatches
+
+
+def make_subtopic(rng, index):
+    """AI 본문처럼 보이는 소제목 하나 (제목/굵은 글씨/「」/★/표/빈 줄이 섞인 약 3천 자)"""
+    sentences = [
+        "처음에는 저도 막막했습니다.",
+        "「작은 습관」 하나가 결과를 바꿉니다.",
+        "**핵심은 꾸준함**입니다.",
+        "매일 *10분*만 투자하면 됩니다.",
+        "생각보다 많은 사람들이 이 단계에서 포기합니다.",
+        "결국 방법은 하나였습니다.",
+    ]
+    parts = [f"## {index}. 소제목 제목\n"]
+    while sum(len(p) for p in parts) < 3000:
+        paragraph = ' '.join(rng.choice(sentences) for _ in range(rng.randint(2, 5)))
+        parts.append(paragraph)
+        roll = rng.random()
+        if roll < 0.1:
+            parts.append("★ 이 문장만은 꼭 기억하세요.")
+        elif roll < 0.15:
+            parts.append("| 구분 | 전 | 후 |\n|---|---|---|\n| 시간 | 3시간 | 30분 |")
+        elif roll < 0.2:
+            parts.append("### 정리")
+    # 문단 사이는 보통 빈 줄 하나, 가끔 두세 줄
+    return ''.join(p + rng.choice(["\n\n"] * 4 + ["\n\n\n", "\n\n\n\n"]) for p in parts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fuzz", type=int, default=50000)
+    args = parser.parse_args()
+
+    mismatches = check_equal(args.fuzz)
+    print(f"equality check: {'ok' if not mismatches else f'{len(mismatches)} mismatches'}")
+    for name, text in mismatches[:10]:
+        print(f"  {name}: {text!r}")
+
+    rng = random.Random(1)
+    subtopics = [make_subtopic(rng, i) for i in range(50)]
+    size_mb = sum(len(s.encode('utf-8')) for s in subtopics) / 1e6
+    print(f"book: {len(subtopics)} subtopics, {sum(map(len, subtopics)):,} chars ({size_mb:.2f} MB utf-8)")
+    print(f"{'function':16} {'legacy ms':>10} {'new ms':>10} {'legacy MB/s':>12} {'new MB/s':>10} {'speedup':>8}")
+    for name, old, new in PAIRS:
+        t_old = min(timeit.repeat(lambda: [old(s) for s in subtopics], number=1, repeat=args.repeat))
+        t_new = min(timeit.repeat(lambda: [new(s) for s in subtopics], number=1, repeat=args.repeat))
+        print(f"{name:16} {t_old * 1e3:>10.2f} {t_new * 1e3:>10.2f} {size_mb / t_old:>12.1f} {size_mb / t_new:>10.1f} {t_old / t_new:>7.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""목차 파서 회귀 검사 + 벤치마크: 예전 파서 3개 vs outline_parser.parse_outline
+
+    python benchmarks/bench_outline_parser.py [--repeat 200]
+
+outline_replies.jsonl의 각 응답에 대해 챕터별 소제목 수가 기대값과 같은지 확인하고
+(새 파서가 하나라도 틀리면 종료 코드 1) 파싱 시간을 비교한다.
+"""
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from outline_parser import parse_outline  # noqa: E402
+
+CORPUS_PATH = Path(__file__).with_name("outline_replies.jsonl")
+
+
+def legacy_outline_only(text):
+    """바꾸기 전 generate_outline_only의 파서"""
+    chapters, subtopics, current_ch = [], {}, None
+    for orig_line in text.split('\n'):
+        line = orig_line.strip()
+        if not line:
+            continue
+        is_chapter, ch_name = False, None
+        if re.match(r'^(PART|파트|Part)\s*\d+[\.\s]', line, re.IGNORECASE):
+            is_chapter, ch_name = True, line
+        elif re.match(r'^(Chapter|챕터)\s*\d+[\.\s]', line, re.IGNORECASE):
+            is_chapter, ch_name = True, line
+        elif re.match(r'^#+\s*(PART|파트|Chapter|챕터|\d+)', line, re.IGNORECASE):
+            is_chapter, ch_name = True, re.sub(r'^#+\s*', '', line)
+        elif re.match(r'^\d+[\.\)]\s', line) and not orig_line.startswith(' '):
+            is_chapter, ch_name = True, line
+        elif re.match(r'^[【\[]?\s*\d+\s*(부|장|편)[】\]]?', line):
+            is_chapter, ch_name = True, line
+        if is_chapter and ch_name:
+            ch_name = re.sub(r'^[#\*\-\s]+', '', ch_name)
+            ch_name = ch_name.replace('**', '').replace('*', '').replace('#', '').strip()
+            if ch_name and len(ch_name) > 3:
+                current_ch = ch_name
+                if current_ch not in chapters:
+                    chapters.append(current_ch)
+                    subtopics[current_ch] = []
+        elif current_ch:
+            is_subtopic, st_name = False, None
+            if re.match(r'^[\-\•\·\*\→\▶]\s*', line):
+                is_subtopic, st_name = True, re.sub(r'^[\-\•\·\*\→\▶]\s*', '', line)
+            elif re.match(r'^[a-z\d][\)\.\:]\s', line, re.IGNORECASE):
+                is_subtopic, st_name = True, re.sub(r'^[a-z\d][\)\.\:]\s*', '', line, flags=re.IGNORECASE)
+            elif orig_line.startswith('  ') or orig_line.startswith('\t'):
+                is_subtopic, st_name = True, line.lstrip('- •·*→▶0123456789.):\t ')
+            elif len(chapters) > 0 and not re.match(r'^(PART|파트|Part|Chapter|챕터|\d+[\.\)])', line, re.IGNORECASE):
+                if 5 < len(line) < 100:
+                    is_subtopic, st_name = True, line.lstrip('- •·*→▶0123456789.):\t ')
+            if is_subtopic and st_name:
+                st_name = st_name.replace('**', '').replace('*', '').replace('#', '').strip()
+                st_name = re.sub(r'^\d+[\.\)\:]\s*', '', st_name)
+                if st_name and len(st_name) > 3 and len(subtopics[current_ch]) < 5:
+                    if st_name.lower() != current_ch.lower() and st_name not in subtopics[current_ch]:
+                        subtopics[current_ch].append(st_name)
+    return [(ch, subtopics[ch]) for ch in chapters]
+
+
+def legacy_auto(text):
+    """바꾸기 전 auto_generate_all의 파서"""
+    chapters, subtopics, current_ch = [], {}, None
+    for orig_line in text.split('\n'):
+        line = orig_line.strip()
+        if not line:
+            continue
+        is_chapter, ch_name = False, None
+        if re.match(r'^(PART|파트)\s*\d+', line, re.IGNORECASE):
+            is_chapter, ch_name = True, line
+        elif re.match(r'^\d+[\.\)]\s', line):
+            is_chapter, ch_name = True, line
+        elif re.match(r'^#+\s*(PART|파트|\d+)', line, re.IGNORECASE):
+            is_chapter, ch_name = True, re.sub(r'^#+\s*', '', line)
+        if is_chapter and ch_name:
+            ch_name = ch_name.replace('**', '').replace('*', '').replace('#', '').strip()
+            if ch_name and len(ch_name) > 3:
+                current_ch = ch_name
+                if current_ch not in chapters:
+                    chapters.append(current_ch)
+                    subtopics[current_ch] = []
+        elif current_ch:
+            is_subtopic, st_name = False, None
+            if line.startswith('-') or line.startswith('•') or line.startswith('·'):
+                is_subtopic, st_name = True, line.strip().lstrip('-•· ')
+            elif re.match(r'^\s+[\da-z][\)\.]', orig_line):
+                is_subtopic, st_name = True, re.sub(r'^[\s\da-z\)\.\-]+', '', line).strip()
+            if is_subtopic and st_name:
+                st_name = st_name.replace('**', '').replace('*', '').replace('#', '').strip()
+                if st_name and len(st_name) > 3 and not re.match(r'^(PART|파트|Chapter|챕터)', st_name, re.IGNORECASE):
+                    subtopics[current_ch].append(st_name)
+    return [(ch, subtopics[ch]) for ch in chapters]
+
+
+def legacy_page4(text):
+    """바꾸기 전 PAGE 4 목차 생성 버튼의 파서"""
+    chapters, current_ch, subtopics = [], None, {}
+    for orig_line in text.split('\n'):
+        line = orig_line.strip()
+        if not line:
+            continue
+        clean_line = re.sub(r'^[#\*\s]+', '', line).strip()
+        clean_line = clean_line.replace('**', '').replace('*', '').strip()
+        is_chapter = False
+        if re.search(r'PART\s*\d+', clean_line, re.IGNORECASE):
+            is_chapter = True
+        elif re.search(r'파트\s*\d+', clean_line):
+            is_chapter = True
+        elif re.search(r'(Chapter|챕터)\s*\d+', clean_line, re.IGNORECASE):
+            is_chapter = True
+        elif re.match(r'^\d+[\.\)]\s*.+', clean_line) and not clean_line.startswith('-'):
+            is_chapter = True
+        elif re.match(r'^\d+\s+[가-힣A-Za-z]', clean_line):
+            is_chapter = True
+        if is_chapter:
+            if clean_line and len(clean_line) > 3:
+                current_ch = clean_line
+                chapters.append(current_ch)
+                subtopics[current_ch] = []
+        elif current_ch:
+            is_subtopic, st_name = False, ""
+            if re.match(r'^\s*[\-\•\·]\s*', line):
+                is_subtopic, st_name = True, re.sub(r'^[\s\-\•\·]+', '', line).strip()
+            elif orig_line.startswith('  ') or orig_line.startswith('\t'):
+                if not any(x in line.upper() for x in ['PART', 'CHAPTER', '파트']):
+                    is_subtopic, st_name = True, line.strip().lstrip('-•· ')
+            elif re.match(r'^\s+[\da-z][\)\.]', orig_line):
+                is_subtopic, st_name = True, re.sub(r'^[\s\da-z\)\.\-]+', '', line).strip()
+            if is_subtopic:
+                st_name = st_name.replace('**', '').replace('*', '').replace('#', '').strip()
+                if st_name and len(st_name) > 3 and not re.match(r'^(PART|파트|Chapter|챕터)', st_name, re.IGNORECASE):
+                    subtopics[current_ch].append(st_name)
+    # 같은 제목 챕터는 dict 키가 겹쳐 마지막 것만 남는다
+    return [(ch, subtopics[ch]) for ch in dict.fromkeys(chapters)]
+
+
+def new_parser(text):
+    return [(ch.title, ch.subtopics) for ch in parse_outline(text).chapters]
+
+
+PARSERS = [
+    ("outline_only", legacy_outline_only),
+    ("auto", legacy_auto),
+    ("page4", legacy_page4),
+    ("new", new_parser),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    print(f"{'reply':40}" + "".join(f" {name:>13}" for name, _ in PARSERS))
+    passed = {name: 0 for name, _ in PARSERS}
+    times = {name: 0.0 for name, _ in PARSERS}
+    for row in rows:
+        cells = []
+        for name, fn in PARSERS:
+            ok = [len(subs) for _, subs in fn(row["reply"])] == row["subtopic_counts"]
+            passed[name] += ok
+            us = timeit.timeit(lambda: fn(row["reply"]), number=args.repeat) / args.repeat * 1e6
+            times[name] += us
+            cells.append(f"{'ok' if ok else 'FAIL'} {us:6.1f}us")
+        print(f"{row['name']:40}" + "".join(f" {c:>13}" for c in cells))
+    print(f"{'passed':40}" + "".join(f" {passed[name]:>6}/{len(rows):<6}" for name, _ in PARSERS))
+    print(f"{'total us':40}" + "".join(f" {times[name]:>13.1f}" for name, _ in PARSERS))
+
+    # 책 한 권 분량 (20챕터 x 5소제목) 반복 파싱
+    big = "\n\n".join(
+        f"PART {i}. 파트 제목 {i}번째 이야기\n" + "\n".join(f"- 소제목 {i}-{j} 이렇게 쓰면 달라진다" for j in range(5))
+        for i in range(1, 21)
+    )
+    print(f"{'20x5 outline':40}" + "".join(
+        f" {timeit.timeit(lambda: fn(big), number=args.repeat) / args.repeat * 1e6:>11.1f}us" for _, fn in PARSERS
+    ))
+    return 0 if passed["new"] == len(rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
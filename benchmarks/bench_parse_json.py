@@ -0,0 +1,87 @@
+"""parse_json 마이크로벤치마크: 예전 정규식 방식 vs json_extract.extract_json
+
+    python benchmarks/bench_parse_json.py [--repeat 200]
+
+json_replies.jsonl의 각 응답에 대해 두 방식의 결과가 기대한 키를 갖는지 확인하고
+한 번 파싱에 걸리는 시간을 비교한다. 마지막 항목은 중괄호가 많이 섞인 긴 응답
+(정규식이 되돌아가며 엉뚱한 범위를 잡는 경우)을 만들어 같은 방식으로 잰다.
+"""
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from json_extract import extract_json  # noqa: E402
+
+CORPUS_PATH = Path(__file__).with_name("json_replies.jsonl")
+
+
+def legacy_parse_json(response):
+    """바꾸기 전 parse_json (화면 경고 제외)"""
+    if not response:
+        return None
+    try:
+        json_match = re.search(r'```json\s*([\s\S]*?)\s*```', response)
+        if json_match:
+            return json.loads(json_match.group(1))
+        match = re.search(r'\{[\s\S]*\}', response)
+        if match:
+            json_str = match.group()
+            json_str = re.sub(r',\s*}', '}', json_str)
+            json_str = re.sub(r',\s*]', ']', json_str)
+            return json.loads(json_str)
+    except Exception:
+        pass
+    return None
+
+
+def new_parse_json(response):
+    return extract_json(response)[0]
+
+
+def load_corpus():
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    # 긴 응답 + 본문 곳곳의 중괄호
+    body = "「{키워드}」를 정리하면 {a, b} 두 가지입니다. " * 2000
+    payload = json.dumps({"summary": "요약", "items": [f"항목 {i}" for i in range(200)]}, ensure_ascii=False)
+    rows.append({"name": "long_reply_many_braces", "reply": body + "\n" + payload + "\n" + body, "keys": ["summary", "items"], "truncated": False})
+    return rows
+
+
+def is_correct(result, keys):
+    if keys is None:
+        return result is None
+    return isinstance(result, dict) and all(k in result for k in keys)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = load_corpus()
+    print(f"{'reply':40} {'chars':>7} {'legacy':>8} {'new':>8} {'legacy us':>10} {'new us':>10}")
+    totals = [0.0, 0.0]
+    failures = 0
+    for row in rows:
+        reply = row["reply"]
+        ok_old = is_correct(legacy_parse_json(reply), row["keys"])
+        ok_new = is_correct(new_parse_json(reply), row["keys"])
+        failures += not ok_new
+        repeat = max(1, args.repeat // 20) if len(reply) > 50000 else args.repeat
+        t_old = timeit.timeit(lambda: legacy_parse_json(reply), number=repeat) / repeat * 1e6
+        t_new = timeit.timeit(lambda: new_parse_json(reply), number=repeat) / repeat * 1e6
+        totals[0] += t_old
+        totals[1] += t_new
+        print(f"{row['name']:40} {len(reply):>7} {'ok' if ok_old else 'FAIL':>8} {'ok' if ok_new else 'FAIL':>8} {t_old:>10.1f} {t_new:>10.1f}")
+    print(f"{'total':40} {'':>7} {'':>8} {'':>8} {totals[0]:>10.1f} {totals[1]:>10.1f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
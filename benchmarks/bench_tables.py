@@ -0,0 +1,157 @@
+"""표 렌더링 벤치마크: 예전 셀 단위 add_premium_table vs EB Table 스타일 + tblGrid
+
+    python benchmarks/bench_tables.py [--tables 20] [--repeat 3]
+
+표 크기(행 x 열) 3x3 ~ 30x8마다 같은 표를 --tables 개씩 새 문서에 넣고 표 하나당 시간을 잰다.
+두 방식의 셀 글자가 같은지도 확인한다 (다르면 종료 코드 1).
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from docx_export import DOCX_AVAILABLE, EbookRenderer  # noqa: E402
+
+if DOCX_AVAILABLE:
+    from docx.enum.table import WD_TABLE_ALIGNMENT
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    from docx.shared import Cm, Pt, RGBColor
+
+SIZES = [(3, 3), (5, 4), (10, 5), (20, 6), (30, 8)]
+
+
+def set_font(run, size, bold=False, color=None):
+    run.font.size = Pt(size)
+    run.font.name = 'Malgun Gothic'
+    run._element.rPr.rFonts.set(qn('w:eastAsia'), '맑은 고딕')
+    run.bold = bold
+    if color:
+        run.font.color.rgb = RGBColor(*color)
+
+
+def legacy_add_table(doc, table_data):
+    """바꾸기 전 add_premium_table (셀마다 글꼴/배경/여백/정렬, 열 너비는 행마다)"""
+    rows = len(table_data)
+    cols = max(len(row) for row in table_data)
+    table = doc.add_table(rows=rows, cols=cols)
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    table.autofit = False
+    if cols == 2:
+        col_widths = [Cm(4.5), Cm(9.5)]
+    elif cols == 3:
+        col_widths = [Cm(3.5), Cm(5.25), Cm(5.25)]
+    elif cols == 4:
+        col_widths = [Cm(3), Cm(3.7), Cm(3.7), Cm(3.6)]
+    else:
+        col_widths = [Cm(14 / cols)] * cols
+    for col_idx in range(cols):
+        for row in table.rows:
+            if col_idx < len(row.cells):
+                row.cells[col_idx].width = col_widths[col_idx] if col_idx < len(col_widths) else Cm(3)
+
+    for i, row_data in enumerate(table_data):
+        row = table.rows[i]
+        row.height = Cm(1.2)
+        for j, cell_text in enumerate(row_data):
+            if j >= cols:
+                continue
+            cell = row.cells[j]
+            cell.text = ''
+            para = cell.paragraphs[0]
+            run = para.add_run(str(cell_text))
+            if i == 0:
+                para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                set_font(run, 10, bold=True, color=(255, 255, 255))
+                fill = '1A1A1A'
+            elif j == 0:
+                para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                set_font(run, 10, bold=True, color=(30, 30, 30))
+                fill = 'F5F5F0'
+            else:
+                para.alignment = WD_ALIGN_PARAGRAPH.LEFT
+                para.paragraph_format.left_indent = Pt(10)
+                set_font(run, 10, color=(50, 50, 50))
+                fill = 'FFFFFF'
+            tcPr = cell._tc.get_or_add_tcPr()
+            shading = OxmlElement('w:shd')
+            shading.set(qn('w:fill'), fill)
+            tcPr.append(shading)
+            tcMar = OxmlElement('w:tcMar')
+            for margin_name, margin_val in [('top', '120'), ('left', '150'), ('bottom', '120'), ('right', '150')]:
+                margin = OxmlElement(f'w:{margin_name}')
+                margin.set(qn('w:w'), margin_val)
+                margin.set(qn('w:type'), 'dxa')
+                tcMar.append(margin)
+            tcPr.append(tcMar)
+            vAlign = OxmlElement('w:vAlign')
+            vAlign.set(qn('w:val'), 'center')
+            tcPr.append(vAlign)
+
+    tblBorders = OxmlElement('w:tblBorders')
+    for border_name, val, size, color in [
+        ('top', 'single', '12', '1A1A1A'), ('bottom', 'single', '12', '1A1A1A'),
+        ('left', 'nil', None, None), ('right', 'nil', None, None),
+        ('insideH', 'single', '4', 'D0D0D0'), ('insideV', 'nil', None, None),
+    ]:
+        border = OxmlElement(f'w:{border_name}')
+        border.set(qn('w:val'), val)
+        if size:
+            border.set(qn('w:sz'), size)
+            border.set(qn('w:color'), color)
+        tblBorders.append(border)
+    table._tbl.tblPr.append(tblBorders)
+    return table
+
+
+def make_table(rows, cols):
+    header = ["구분"] + [f"항목 {c}" for c in range(1, cols)]
+    return [header] + [[f"행 {r}"] + [f"값 {r}-{c} <&>" for c in range(1, cols)] for r in range(1, rows)]
+
+
+def cell_texts(doc):
+    return [[cell.text for cell in table._cells] for table in doc.tables]
+
+
+def run_legacy(table_data, count):
+    renderer = EbookRenderer()
+    for _ in range(count):
+        legacy_add_table(renderer.doc, table_data)
+    return renderer.doc
+
+
+def run_new(table_data, count):
+    renderer = EbookRenderer()
+    for _ in range(count):
+        renderer.add_table(table_data)
+    return renderer.doc
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if not DOCX_AVAILABLE:
+        print("python-docx is not installed")
+        return 1
+
+    EbookRenderer()  # 기본 문서 준비 (한 번)
+    failed = False
+    print(f"{'size':>6} {'legacy ms/table':>16} {'new ms/table':>13} {'speedup':>8}  same text")
+    for rows, cols in SIZES:
+        table_data = make_table(rows, cols)
+        same = cell_texts(run_legacy(table_data, 1)) == cell_texts(run_new(table_data, 1))
+        failed |= not same
+        t_old = min(timeit.repeat(lambda: run_legacy(table_data, args.tables), number=1, repeat=args.repeat))
+        t_new = min(timeit.repeat(lambda: run_new(table_data, args.tables), number=1, repeat=args.repeat))
+        print(f"{rows:>3}x{cols:<2} {t_old / args.tables * 1e3:>16.2f} {t_new / args.tables * 1e3:>13.2f}"
+              f" {t_old / t_new:>7.1f}x  {'ok' if same else 'DIFFERENT'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
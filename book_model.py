@@ -0,0 +1,275 @@
+"""전자책 원고 모델 (Book / Chapter / Subtopic)
+
+세션의 outline(챕터 제목 목록)과 chapters 딕셔너리를 목차 순서대로 묶은 가벼운 객체.
+본문 딕셔너리는 복사하지 않고 참조만 하므로 기존 코드가 subtopic_data에 쓰는 내용이
+그대로 보인다. 챕터/소제목 딕셔너리마다 'id'를 심어 두어 제목을 바꿔도 같은 항목으로
+찾을 수 있다.
+
+분량 통계(글자 수/문단 수)는 본문이 바뀔 때(Subtopic.set_content) 한 번만 세어
+subtopic_data['stats']에 저장하고, 챕터/책 합계는 바뀐 만큼만 더하고 뺀다.
+화면을 다시 그릴 때는 합계를 읽기만 하므로 책 길이와 관계없이 비용이 없다.
+"""
+import hashlib
+import uuid
+
+
+def new_id(prefix):
+    return f"{prefix}_{uuid.uuid4().hex[:12]}"
+
+
+def ensure_id(data, prefix):
+    """딕셔너리에 id가 없으면 새로 심고 반환 (이전 세션/저널에서 온 데이터용)"""
+    if not data.get('id'):
+        data['id'] = new_id(prefix)
+    return data['id']
+
+
+def new_subtopic_data(content=''):
+    return {'id': new_id('st'), 'questions': [], 'answers': [], 'content': content}
+
+
+def new_chapter_data(subtopics, contents=None, chapter_id=None):
+    """챕터 딕셔너리 생성 - contents는 {소제목: 본문}"""
+    contents = contents or {}
+    return {
+        'id': chapter_id or new_id('ch'),
+        'subtopics': list(subtopics),
+        'subtopic_data': {s: new_subtopic_data(contents.get(s, '')) for s in subtopics},
+    }
+
+
+CHARS_PER_PAGE = 500  # 예상 페이지 수 = 글자 수(공백 제외) / 500
+
+
+def count_chars(text):
+    """공백/줄바꿈을 뺀 글자 수"""
+    return len(text) - text.count(' ') - text.count('\n')
+
+
+def text_stats(content):
+    """본문 분량 통계 {'chars': 공백 제외 글자 수, 'paragraphs': 빈 줄로 나뉜 문단 수}"""
+    if not content:
+        return {'chars': 0, 'paragraphs': 0}
+    return {
+        'chars': count_chars(content),
+        'paragraphs': sum(1 for p in content.split('\n\n') if p.strip()),
+    }
+
+
+def hash_content(content):
+    """본문 버전 키 (미리보기 HTML 같은 본문별 캐시에 쓴다)"""
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+
+def estimate_pages(chars):
+    return chars // CHARS_PER_PAGE
+
+
+class Totals:
+    """챕터/책 분량 합계 (본문이 바뀐 소제목의 차이만 반영)"""
+
+    __slots__ = ('chars', 'paragraphs', 'done')
+
+    def __init__(self):
+        self.chars = 0
+        self.paragraphs = 0
+        self.done = 0
+
+    def add(self, stats, done, sign=1):
+        self.chars += sign * stats['chars']
+        self.paragraphs += sign * stats['paragraphs']
+        self.done += sign * done
+
+    def merge(self, other):
+        self.chars += other.chars
+        self.paragraphs += other.paragraphs
+        self.done += other.done
+
+    @property
+    def pages(self):
+        return estimate_pages(self.chars)
+
+    def __repr__(self):
+        return f"Totals(chars={self.chars}, paragraphs={self.paragraphs}, done={self.done})"
+
+
+class Subtopic:
+    """소제목 하나 - data는 세션의 subtopic_data[소제목] 딕셔너리"""
+
+    __slots__ = ('id', 'title', 'index', 'chapter', 'data')
+
+    def __init__(self, title, index, chapter, data):
+        self.id = ensure_id(data, 'st')
+        self.title = title
+        self.index = index
+        self.chapter = chapter
+        self.data = data
+
+    @property
+    def content(self):
+        return self.data.get('content') or ''
+
+    @property
+    def images(self):
+        """Page 5에서 올린 이미지 목록 [{'name', 'data'(base64)}]"""
+        return self.data.get('images') or []
+
+    @property
+    def done(self):
+        return bool(self.data.get('content'))
+
+    @property
+    def stats(self):
+        """저장된 분량 통계 (이전 세션/저널처럼 통계가 없는 본문은 이때 한 번 센다)"""
+        stats = self.data.get('stats')
+        if stats is None:
+            stats = self.data['stats'] = text_stats(self.content)
+        return stats
+
+    @property
+    def content_hash(self):
+        """저장된 본문 해시 (없으면 이때 한 번 계산)"""
+        content_hash = self.data.get('content_hash')
+        if content_hash is None:
+            content_hash = self.data['content_hash'] = hash_content(self.content)
+        return content_hash
+
+    @property
+    def chars(self):
+        return self.stats['chars']
+
+    @property
+    def paragraphs(self):
+        return self.stats['paragraphs']
+
+    @property
+    def pages(self):
+        return estimate_pages(self.chars)
+
+    def set_content(self, content):
+        """본문 저장 - 통계를 새로 세고 챕터/책 합계에는 차이만 반영"""
+        old_stats, old_done = self.stats, self.done
+        self.data['content'] = content
+        self.data['stats'] = text_stats(content)
+        self.data['content_hash'] = hash_content(content)
+        for totals in (self.chapter.totals, self.chapter.book.totals):
+            totals.add(old_stats, old_done, sign=-1)
+            totals.add(self.data['stats'], self.done)
+
+    def __repr__(self):
+        return f"Subtopic({self.id!r}, {self.title!r})"
+
+
+class Chapter:
+    """챕터 하나 - data는 세션의 chapters[챕터] 딕셔너리, index는 목차 순서 (0부터)"""
+
+    __slots__ = ('id', 'title', 'index', 'book', 'data', 'subtopics', 'totals', '_by_title')
+
+    def __init__(self, title, index, book, data):
+        self.id = ensure_id(data, 'ch')
+        self.title = title
+        self.index = index
+        self.book = book
+        self.data = data
+        sub_data = data.setdefault('subtopic_data', {})
+        self.subtopics = [
+            Subtopic(s, i, self, sub_data.setdefault(s, new_subtopic_data()))
+            for i, s in enumerate(dict.fromkeys(data.get('subtopics', [])))
+        ]
+        self._by_title = {sub.title: sub for sub in self.subtopics}
+        self.totals = Totals()
+        for sub in self.subtopics:
+            self.totals.add(sub.stats, sub.done)
+
+    def subtopic(self, title):
+        return self._by_title.get(title)
+
+    def written(self):
+        """본문이 있는 소제목 (목차 순서)"""
+        return [sub for sub in self.subtopics if sub.done]
+
+    def done_count(self):
+        return self.totals.done
+
+    def char_count(self):
+        return self.totals.chars
+
+    def __repr__(self):
+        return f"Chapter({self.id!r}, {self.title!r})"
+
+
+class Book:
+    """목차 순서대로 정렬된 원고 전체 (세션에 보관, 목차 구조가 바뀔 때만 새로 만든다)"""
+
+    __slots__ = ('signature', 'chapters', 'totals', '_chapters_by_id', '_chapters_by_title', '_subtopics_by_id')
+
+    def __init__(self, outline, chapters_data):
+        self.signature = self.make_signature(outline, chapters_data)
+        self.chapters = []
+        self.totals = Totals()
+        for title in dict.fromkeys(outline):
+            data = chapters_data.get(title)
+            if data is None:
+                data = chapters_data[title] = new_chapter_data([])
+            chapter = Chapter(title, len(self.chapters), self, data)
+            self.chapters.append(chapter)
+            self.totals.merge(chapter.totals)
+        self._chapters_by_id = {ch.id: ch for ch in self.chapters}
+        self._chapters_by_title = {ch.title: ch for ch in self.chapters}
+        self._subtopics_by_id = {sub.id: sub for ch in self.chapters for sub in ch.subtopics}
+
+    @staticmethod
+    def make_signature(outline, chapters_data):
+        """목차 구조 서명 - 제목/순서뿐 아니라 딕셔너리가 바뀌어도 (목차 수정 저장 등) 달라진다"""
+        signature = []
+        for title in outline:
+            data = chapters_data.get(title)
+            if data is None:
+                signature.append((title, None))
+                continue
+            sub_data = data.get('subtopic_data', {})
+            signature.append((title, id(data), tuple((s, id(sub_data.get(s))) for s in data.get('subtopics', []))))
+        return tuple(signature)
+
+    def chapter(self, chapter_id):
+        return self._chapters_by_id.get(chapter_id)
+
+    def subtopic(self, subtopic_id):
+        return self._subtopics_by_id.get(subtopic_id)
+
+    def find_chapter(self, title):
+        return self._chapters_by_title.get(title)
+
+    def find(self, chapter_title, subtopic_title):
+        """(챕터 제목, 소제목 제목) → Subtopic (없으면 None)"""
+        chapter = self._chapters_by_title.get(chapter_title)
+        return chapter.subtopic(subtopic_title) if chapter else None
+
+    def iter_subtopics(self):
+        for chapter in self.chapters:
+            yield from chapter.subtopics
+
+    def subtopic_count(self):
+        return len(self._subtopics_by_id)
+
+    def done_count(self):
+        return self.totals.done
+
+    def char_count(self):
+        return self.totals.chars
+
+    def page_count(self):
+        return self.totals.pages
+
+    def progress(self):
+        total = self.subtopic_count()
+        return self.done_count() / total if total else 0.0
+
+    def __len__(self):
+        return len(self.chapters)
+
+    def __bool__(self):
+        return bool(self.chapters)
+
+    def __repr__(self):
+        return f"Book({len(self.chapters)} chapters, {self.subtopic_count()} subtopics)"
@@ -0,0 +1,856 @@
+"""워드(DOCX) 전자책 렌더러
+
+모양은 모두 이름 있는 문단/글자 스타일(EB ...)로 정의해 두고, 본문에는 스타일 이름만
+붙인다. 글꼴(맑은 고딕, eastAsia 포함)은 문서 기본값에 한 번만 넣고, 빈 문단을 여러 개
+넣어 만들던 여백은 문단의 앞/뒤 간격과 '앞에서 쪽 나누기' 속성으로 바꿨다.
+스타일을 넣은 기본 문서(A5 페이지 설정 포함)는 프로세스에서 한 번만 만들어 재사용한다.
+챕터는 내용 해시(chapter_key)별로 렌더링한 XML 조각을 FragmentCache에 보관해 두고,
+다시 내보낼 때 바뀐 챕터만 새로 렌더링한다. 파일은 write_ebook_docx가 구역마다 XML 조각을
+zip에 흘려 쓰므로 (캐시된 조각은 그대로) 책 전체의 문서 트리를 메모리에 들고 있지 않는다.
+"""
+import hashlib
+import io
+import re
+import struct
+import threading
+import zipfile
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+try:
+    from docx import Document
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml import OxmlElement, parse_xml
+    from docx.oxml.ns import qn
+    from docx.shared import Cm, Pt, RGBColor
+    from lxml import etree
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+
+# 이미지 축소용 (없으면 원본 그대로 넣는다)
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+DocxChapter = namedtuple('DocxChapter', 'index title subtopics')  # index: 목차 순서 (0부터)
+DocxSubtopic = namedtuple('DocxSubtopic', 'index title text images', defaults=((),))  # text: clean_content를 거친 본문 (None = 아직 안 씀), images: prepare_image 결과 목록
+EmbeddedImage = namedtuple('EmbeddedImage', 'digest ext data width height')  # digest: 원본 sha1 앞 16자, width/height: 표시 크기 (EMU)
+
+# 페이지 설정 (A5 크기 - 전자책에 적합)
+PAGE_WIDTH_CM = 14.8
+PAGE_HEIGHT_CM = 21
+MARGIN_X_CM = 2.2
+MARGIN_Y_CM = 2.5
+TEXT_WIDTH_CM = PAGE_WIDTH_CM - 2 * MARGIN_X_CM  # 본문(표/이미지) 최대 너비
+TWIPS_PER_CM = 1440 / 2.54
+
+FONT_NAME = 'Malgun Gothic'
+FONT_EAST_ASIA = '맑은 고딕'
+BLANK_LINE = 25  # 예전 빈 문단 하나의 높이 (pt, 기본 11pt 줄 + 문단 뒤 10pt)
+BLANK_LINE_TEXT = 15  # 문단 뒤 간격을 뺀 빈 줄 높이 (pt)
+
+# 스타일 정의: 이름 → 속성 (size/bold/italic/color는 글자, 나머지는 문단 속성, 간격은 pt)
+PARAGRAPH_STYLES = {
+    # 표지 / 판권
+    'EB Title': dict(size=28, bold=True, align='center', space_before=BLANK_LINE * 8, space_after=16),
+    'EB Subtitle': dict(size=12, color='505050', align='center', space_before=8),
+    'EB Author': dict(size=13, align='center', space_before=BLANK_LINE * 10),
+    'EB Copyright': dict(size=9, color='787878', align='center', space_after=2),
+    # 프롤로그
+    'EB Prologue Title': dict(size=14, bold=True, align='center', space_before=BLANK_LINE * 4, space_after=30, page_break_before=True),
+    'EB Prologue': dict(size=10, align='left', line_spacing=1.6, space_after=14),
+    # 목차
+    'EB TOC Title': dict(size=16, color='282828', align='center', space_before=BLANK_LINE * 4, space_after=60, page_break_before=True),
+    'EB TOC Number': dict(size=24, color='C8C8C8', space_before=28, space_after=4, keep_with_next=True),
+    'EB TOC Chapter': dict(space_after=14),
+    'EB TOC Entry': dict(left_indent=0.3, space_after=6),
+    # 챕터 시작 페이지
+    'EB Part Label': dict(size=9, color='A0A0A0', align='center', space_before=BLANK_LINE * 7, space_after=8, page_break_before=True),
+    'EB Part Number': dict(size=48, color='282828', align='center', space_after=16),
+    'EB Rule': dict(size=10, color='C8C8C8', align='center', space_after=20),
+    'EB Chapter Title': dict(size=14, bold=True, color='1E1E1E', align='center', space_after=60),
+    # 소제목 / 본문
+    'EB Subtopic Rule': dict(size=10, color='C8C8C8', align='left', space_before=BLANK_LINE_TEXT + 40, space_after=12, page_break_before=True, keep_with_next=True),
+    'EB Subtopic': dict(size=13, bold=True, color='191919', space_after=24, keep_with_next=True),
+    'EB Body': dict(size=10.5, color='2D2D2D', align='justify', line_spacing=1.85, space_after=14, first_line_indent=0.6),
+    'EB Separator': dict(size=10, color='C8C8C8', align='center', space_before=30, space_after=30),
+    'EB Table Before': dict(space_after=10, keep_with_next=True),
+    'EB Table After': dict(space_after=20),
+    'EB Table Header': dict(size=10, bold=True, color='FFFFFF', align='center'),
+    'EB Table Label': dict(size=10, bold=True, color='1E1E1E', align='center'),
+    'EB Table Cell': dict(size=10, color='323232', align='left', left_indent_pt=10),
+    'EB Image': dict(align='center', space_before=12, space_after=14),
+    # 에필로그 / 저자 소개
+    'EB Label': dict(size=9, color='A0A0A0', align='center', space_before=BLANK_LINE * 6, space_after=16, page_break_before=True),
+    'EB Epilogue Title': dict(size=14, bold=True, color='282828', align='center', space_after=40),
+    'EB Epilogue': dict(size=10, color='323232', align='justify', line_spacing=1.7, space_after=14, first_line_indent=0.5),
+    'EB Signature Rule': dict(size=10, color='C8C8C8', align='right', space_before=BLANK_LINE * 3, space_after=10),
+    'EB Signature': dict(size=11, italic=True, color='505050', align='right'),
+    'EB About Name': dict(size=16, bold=True, color='282828', align='center', space_after=30),
+    'EB About': dict(size=10, color='505050', align='center', line_spacing=1.6, space_after=14),
+    'EB End Mark': dict(size=12, color='C8C8C8', align='center', space_before=BLANK_LINE * 4),
+}
+CHARACTER_STYLES = {
+    'EB Drop Cap': dict(size=18, bold=True, color='282828'),
+    'EB TOC Chapter Link': dict(size=12, bold=True, color='1E1E1E'),
+    'EB TOC Bullet': dict(size=10, color='B4B4B4'),
+    'EB TOC Entry Link': dict(size=10, color='505050'),
+}
+
+# 표 스타일: 상하 진한 선 + 연한 가로선, 넉넉한 셀 여백, 헤더 행은 검정 배경, 첫 열은 베이지 배경
+# (글자 모양은 셀 문단의 EB Table Header / Label / Cell 스타일)
+TABLE_STYLE_ID = 'EBTable'
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+TABLE_STYLE_XML = f"""<w:style {W_NS} w:type="table" w:customStyle="1" w:styleId="{TABLE_STYLE_ID}">
+  <w:name w:val="EB Table"/>
+  <w:basedOn w:val="TableNormal"/>
+  <w:uiPriority w:val="99"/>
+  <w:tblPr>
+    <w:jc w:val="center"/>
+    <w:tblBorders>
+      <w:top w:val="single" w:sz="12" w:space="0" w:color="1A1A1A"/>
+      <w:left w:val="nil"/>
+      <w:bottom w:val="single" w:sz="12" w:space="0" w:color="1A1A1A"/>
+      <w:right w:val="nil"/>
+      <w:insideH w:val="single" w:sz="4" w:space="0" w:color="D0D0D0"/>
+      <w:insideV w:val="nil"/>
+    </w:tblBorders>
+    <w:tblCellMar>
+      <w:top w:w="120" w:type="dxa"/>
+      <w:left w:w="150" w:type="dxa"/>
+      <w:bottom w:w="120" w:type="dxa"/>
+      <w:right w:w="150" w:type="dxa"/>
+    </w:tblCellMar>
+  </w:tblPr>
+  <w:tcPr>
+    <w:shd w:val="clear" w:color="auto" w:fill="FFFFFF"/>
+    <w:vAlign w:val="center"/>
+  </w:tcPr>
+  <w:tblStylePr w:type="firstRow">
+    <w:tcPr><w:shd w:val="clear" w:color="auto" w:fill="1A1A1A"/></w:tcPr>
+  </w:tblStylePr>
+  <w:tblStylePr w:type="firstCol">
+    <w:tcPr><w:shd w:val="clear" w:color="auto" w:fill="F5F5F0"/></w:tcPr>
+  </w:tblStylePr>
+</w:style>"""
+TABLE_ROW_HEIGHT = round(1.2 * TWIPS_PER_CM)  # 넉넉한 행 높이 (최소 1.2cm)
+# 열 수별 너비 비율 (첫 열 좁게), 그 밖에는 균등
+TABLE_COLUMN_RATIOS = {
+    2: (4.5, 9.5),
+    3: (3.5, 5.25, 5.25),
+    4: (3, 3.7, 3.7, 3.6),
+}
+
+# 이미지: 본문 너비(10.4cm)를 IMAGE_DPI로 채우는 픽셀 수보다 크면 줄이고, 높이는 IMAGE_MAX_HEIGHT_CM까지
+EMU_PER_CM = 360000
+IMAGE_DPI = 200
+IMAGE_MAX_PX = round(TEXT_WIDTH_CM / 2.54 * IMAGE_DPI)
+IMAGE_MAX_HEIGHT_CM = 14
+IMAGE_SCREEN_DPI = 96  # 작은 이미지는 이 해상도 기준 크기로 (늘리지 않는다)
+IMAGE_JPEG_QUALITY = 85
+IMAGE_CACHE_LIMIT = 64  # 준비해 둔 이미지 수 (원본 해시별)
+IMAGE_CONTENT_TYPES = {'png': 'image/png', 'jpeg': 'image/jpeg'}
+IMAGE_REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
+
+_ALIGNMENTS = {}
+if DOCX_AVAILABLE:
+    _ALIGNMENTS = {
+        'left': WD_ALIGN_PARAGRAPH.LEFT,
+        'center': WD_ALIGN_PARAGRAPH.CENTER,
+        'right': WD_ALIGN_PARAGRAPH.RIGHT,
+        'justify': WD_ALIGN_PARAGRAPH.JUSTIFY,
+    }
+
+# 표 감지/파싱
+_TABLE_RULE = re.compile(r'^\|[\s\-:]+\|$')
+_BOX_DRAWING = re.compile(r'^[─━┌┬┐├┼┤└┴┘│┃]+$')
+_DASHES = re.compile(r'^[\s\-]+$')
+_RULE_CELL = re.compile(r'^[\s\-:]+$')
+_BOOKMARK_UNSAFE = re.compile(r'[^\w가-힣]')
+
+
+def _apply_font(font, spec):
+    if 'size' in spec:
+        font.size = Pt(spec['size'])
+    if spec.get('bold'):
+        font.bold = True
+    if spec.get('italic'):
+        font.italic = True
+    if 'color' in spec:
+        font.color.rgb = RGBColor.from_string(spec['color'])
+
+
+def _apply_paragraph_format(fmt, spec):
+    if 'align' in spec:
+        fmt.alignment = _ALIGNMENTS[spec['align']]
+    if 'space_before' in spec:
+        fmt.space_before = Pt(spec['space_before'])
+    if 'space_after' in spec:
+        fmt.space_after = Pt(spec['space_after'])
+    if 'line_spacing' in spec:
+        fmt.line_spacing = spec['line_spacing']
+    if 'first_line_indent' in spec:
+        fmt.first_line_indent = Cm(spec['first_line_indent'])
+    if 'left_indent' in spec:
+        fmt.left_indent = Cm(spec['left_indent'])
+    if 'left_indent_pt' in spec:
+        fmt.left_indent = Pt(spec['left_indent_pt'])
+    if spec.get('page_break_before'):
+        fmt.page_break_before = True
+    if spec.get('keep_with_next'):
+        fmt.keep_with_next = True
+
+
+def _set_default_font(doc):
+    """문서 기본 글꼴 (모든 스타일이 물려받음)"""
+    rpr_default = doc.styles.element.find(qn('w:docDefaults')).find(qn('w:rPrDefault')).find(qn('w:rPr'))
+    fonts = rpr_default.find(qn('w:rFonts'))
+    if fonts is None:
+        fonts = OxmlElement('w:rFonts')
+        rpr_default.insert(0, fonts)
+    for attr in list(fonts.attrib):
+        del fonts.attrib[attr]
+    fonts.set(qn('w:ascii'), FONT_NAME)
+    fonts.set(qn('w:hAnsi'), FONT_NAME)
+    fonts.set(qn('w:eastAsia'), FONT_EAST_ASIA)
+
+
+@lru_cache(maxsize=1)
+def get_template():
+    """스타일과 페이지 설정을 넣은 빈 문서 (bytes, 프로세스에서 한 번만 만든다)"""
+    doc = Document()
+
+    # 페이지 설정 (A5 크기 - 전자책에 적합)
+    section = doc.sections[0]
+    section.page_width = Cm(PAGE_WIDTH_CM)
+    section.page_height = Cm(PAGE_HEIGHT_CM)
+    section.left_margin = Cm(MARGIN_X_CM)
+    section.right_margin = Cm(MARGIN_X_CM)
+    section.top_margin = Cm(MARGIN_Y_CM)
+    section.bottom_margin = Cm(MARGIN_Y_CM)
+
+    _set_default_font(doc)
+    normal = doc.styles['Normal']
+    for name, spec in PARAGRAPH_STYLES.items():
+        style = doc.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+        style.base_style = normal
+        style.quick_style = True
+        _apply_font(style.font, spec)
+        _apply_paragraph_format(style.paragraph_format, spec)
+    for name, spec in CHARACTER_STYLES.items():
+        style = doc.styles.add_style(name, WD_STYLE_TYPE.CHARACTER)
+        _apply_font(style.font, spec)
+    doc.styles.element.append(parse_xml(TABLE_STYLE_XML))
+
+    # 기본 문서의 빈 문단 제거 (sectPr만 남긴다)
+    body = doc.element.body
+    for p in body.findall(qn('w:p')):
+        body.remove(p)
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def new_document():
+    return Document(io.BytesIO(get_template()))
+
+
+@lru_cache(maxsize=1)
+def get_template_parts():
+    """기본 문서를 스트리밍 쓰기용으로 나눈 것 → (zip 항목 [(이름, bytes)], document.xml 앞부분, 뒷부분)
+
+    document.xml은 '<w:body>'까지(앞)와 sectPr부터 끝까지(뒤)로 나누고, 본문은 그 사이에 흘려 쓴다.
+    """
+    with zipfile.ZipFile(io.BytesIO(get_template())) as zf:
+        entries = [(info.filename, zf.read(info)) for info in zf.infolist()]
+    document_xml = dict(entries)[DOCUMENT_PART]
+    body_start = document_xml.index(b'<w:body>') + len(b'<w:body>')
+    body_end = document_xml.index(b'<w:sectPr', body_start)
+    return entries, document_xml[:body_start], document_xml[body_end:]
+
+
+def strip_part_prefix(title, index):
+    """챕터 제목에서 'PART 1.' 같은 번호 접두사 제거"""
+    n = index + 1
+    for prefix in [f"PART {n}.", f"PART{n}.", f"PART {n} ", f"PART{n} ", f"{n}.", f"{n})"]:
+        title = title.replace(prefix, "").strip()
+    return title
+
+
+def bookmark_name(name):
+    """워드 북마크 규칙에 맞는 이름 (특수문자 → _, 40자 이내)"""
+    return _BOOKMARK_UNSAFE.sub('_', name)[:40]
+
+
+def parse_table_data(text):
+    """표 텍스트를 파싱하여 2D 배열로 변환"""
+    table_data = []
+    for line in text.strip().split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+
+        # 순수 구분선만 스킵: |---|---|, 박스 그리기 문자, 하이픈만 있는 라인
+        if _TABLE_RULE.match(line) or _BOX_DRAWING.match(line):
+            continue
+        if _DASHES.match(line) and len(line.replace(' ', '').replace('-', '')) == 0:
+            continue
+
+        # 마크다운 테이블 (| cell | cell |) / 일반 파이프 구분 (cell | cell)
+        if (line.startswith('|') and line.endswith('|')) or ('|' in line and not line.startswith('|')):
+            cells = [c for c in (cell.strip() for cell in line.split('|')) if c]
+            if cells:
+                table_data.append(cells)
+        # 탭 구분 테이블
+        elif '\t' in line:
+            cells = [c for c in (cell.strip() for cell in line.split('\t')) if c]
+            if len(cells) >= 2:
+                table_data.append(cells)
+        # 콜론 기반 파싱 (Before: xxx) - 단, URL이 아닌 경우, 첫 번째 콜론으로만 분리
+        elif ':' in line and not line.startswith('http'):
+            parts = line.split(':', 1)
+            if len(parts) == 2 and len(parts[0]) < 30:  # 키가 너무 길면 제외
+                table_data.append([parts[0].strip(), parts[1].strip()])
+    return table_data
+
+
+def _is_table_start(line, next_line=None):
+    """표 시작 라인인지 확인"""
+    stripped = line.strip()
+    # 마크다운 테이블 (| cell | cell |)
+    if stripped.startswith('|') and stripped.endswith('|') and stripped.count('|') >= 2:
+        return True
+    # 파이프로 구분된 내용 (cell | cell)
+    if '|' in stripped and len(stripped.split('|')) >= 2:
+        if any(p.strip() and not _RULE_CELL.match(p) for p in stripped.split('|')):
+            return True
+    # 콜론 기반 테이블 (키: 값) - 연속된 경우
+    if next_line and ':' in stripped and ':' in next_line:
+        if len(stripped.split(':')[0].strip()) < 30 and len(next_line.split(':')[0].strip()) < 30:
+            return True
+    return False
+
+
+def _is_table_continue(line):
+    """표 계속 라인인지 확인 (빈 줄은 표 종료)"""
+    stripped = line.strip()
+    if not stripped:
+        return False
+    # 마크다운 테이블 / 구분선 / 파이프로 구분된 내용
+    if '|' in stripped:
+        return True
+    # 콜론 기반 (키: 값)
+    return ':' in stripped and len(stripped.split(':')[0].strip()) < 30
+
+
+def split_content_blocks(text):
+    """본문 → [('text' | 'table', 내용)] (표는 연속된 표 형식 줄 2줄 이상)"""
+    blocks = []
+    current_block = []
+    lines = text.split('\n')
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        next_line = lines[i + 1] if i + 1 < len(lines) else None
+        if _is_table_start(line, next_line):
+            # 이전 일반 텍스트 저장
+            if current_block:
+                blocks.append(('text', '\n'.join(current_block)))
+                current_block = []
+            # 표 라인 수집
+            table_lines = [line]
+            i += 1
+            while i < len(lines) and _is_table_continue(lines[i]):
+                table_lines.append(lines[i])
+                i += 1
+            if len(table_lines) >= 2:
+                blocks.append(('table', '\n'.join(table_lines)))
+            else:
+                current_block.extend(table_lines)
+        else:
+            current_block.append(line)
+            i += 1
+    if current_block:
+        blocks.append(('text', '\n'.join(current_block)))
+    return blocks
+
+
+def table_column_widths(cols):
+    """열 너비 (twips, 합계 = 본문 너비)"""
+    ratios = TABLE_COLUMN_RATIOS.get(cols, (1,) * cols)
+    total = sum(ratios)
+    return [round(TEXT_WIDTH_CM * TWIPS_PER_CM * r / total) for r in ratios]
+
+
+def table_xml(table_data, style_ids):
+    """표 데이터(2D 목록) → <w:tbl> XML 문자열
+
+    셀 배경/여백/세로 정렬/테두리는 EB Table 스타일이 정하므로 셀에는 문단 스타일과 글자만 넣는다.
+    모자란 셀은 빈 문단으로 채운다.
+    """
+    cols = max(len(row) for row in table_data)
+    widths = table_column_widths(cols)
+    header, label, cell = (style_ids[n] for n in ('EB Table Header', 'EB Table Label', 'EB Table Cell'))
+    parts = [
+        f'<w:tbl {W_NS}><w:tblPr><w:tblStyle w:val="{TABLE_STYLE_ID}"/>'
+        f'<w:tblW w:w="{sum(widths)}" w:type="dxa"/><w:jc w:val="center"/><w:tblLayout w:type="fixed"/>'
+        '<w:tblLook w:val="00A0" w:firstRow="1" w:lastRow="0" w:firstColumn="1" w:lastColumn="0"'
+        ' w:noHBand="1" w:noVBand="1"/></w:tblPr><w:tblGrid>',
+        *(f'<w:gridCol w:w="{w}"/>' for w in widths),
+        '</w:tblGrid>',
+    ]
+    row_start = f'<w:tr><w:trPr><w:trHeight w:val="{TABLE_ROW_HEIGHT}"/></w:trPr>'
+    for i, row_data in enumerate(table_data):
+        parts.append(row_start)
+        for j in range(cols):
+            style = header if i == 0 else label if j == 0 else cell
+            parts.append(f'<w:tc><w:p><w:pPr><w:pStyle w:val="{style}"/></w:pPr>')
+            if j < len(row_data):
+                parts.append(f'<w:r><w:t xml:space="preserve">{escape(str(row_data[j]))}</w:t></w:r>')
+            parts.append('</w:p></w:tc>')
+        parts.append('</w:tr>')
+    parts.append('</w:tbl>')
+    return ''.join(parts)
+
+
+def image_size(data):
+    """PNG/JPEG 헤더에서 (형식, 가로 px, 세로 px) - 알 수 없으면 None"""
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and data[12:16] == b'IHDR':
+        width, height = struct.unpack('>II', data[16:24])
+        return 'png', width, height
+    if data[:2] == b'\xff\xd8':
+        pos = 2
+        while pos + 9 < len(data):
+            if data[pos] != 0xFF:
+                return None
+            marker = data[pos + 1]
+            if marker == 0xFF:  # 채움 바이트
+                pos += 1
+                continue
+            length = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+            # SOF0~SOF15 (DHT/JPG/DAC 제외)
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+                return 'jpeg', width, height
+            pos += 2 + length
+    return None
+
+
+def _downscale(data, ext):
+    """본문 너비보다 큰 이미지 축소 (사진 회전 정보도 반영) → (형식, bytes, 가로 px, 세로 px)"""
+    with Image.open(io.BytesIO(data)) as img:
+        rotated = img.getexif().get(0x0112, 1) != 1  # EXIF Orientation
+        if img.width <= IMAGE_MAX_PX and not rotated:
+            return ext, data, img.width, img.height
+        if ext == 'jpeg':
+            img.draft('RGB', (IMAGE_MAX_PX, IMAGE_MAX_PX))  # 필요한 만큼만 줄여서 디코딩 (회전 전 기준이라 정사각형으로)
+        img = ImageOps.exif_transpose(img)
+        if img.width > IMAGE_MAX_PX:
+            img = img.resize((IMAGE_MAX_PX, max(1, round(img.height * IMAGE_MAX_PX / img.width))), Image.LANCZOS)
+        buffer = io.BytesIO()
+        if ext == 'jpeg':
+            img.convert('RGB').save(buffer, 'JPEG', quality=IMAGE_JPEG_QUALITY, optimize=True)
+        else:
+            img.save(buffer, 'PNG', optimize=True)
+        return ext, buffer.getvalue(), img.width, img.height
+
+
+_image_cache = OrderedDict()
+_image_cache_lock = threading.Lock()
+
+
+def prepare_image(data):
+    """업로드한 이미지 bytes → EmbeddedImage (본문 너비에 맞게 축소, 원본 해시별로 캐시) - 읽을 수 없으면 None"""
+    digest = hashlib.sha1(data).hexdigest()[:16]
+    with _image_cache_lock:
+        image = _image_cache.get(digest)
+        if image is not None:
+            _image_cache.move_to_end(digest)
+            return image
+
+    size = image_size(data)
+    if size is None:
+        return None
+    ext, width, height = size
+    if PIL_AVAILABLE:
+        try:
+            ext, data, width, height = _downscale(data, ext)
+        except Exception:
+            pass  # 축소에 실패하면 원본 그대로
+    if not width or not height:
+        return None
+
+    # 표시 크기: 96dpi 기준 크기, 본문 너비/최대 높이를 넘으면 비율대로 줄인다
+    width_cm = min(width / IMAGE_SCREEN_DPI * 2.54, TEXT_WIDTH_CM)
+    height_cm = width_cm * height / width
+    if height_cm > IMAGE_MAX_HEIGHT_CM:
+        width_cm, height_cm = width_cm * IMAGE_MAX_HEIGHT_CM / height_cm, IMAGE_MAX_HEIGHT_CM
+    image = EmbeddedImage(digest, ext, data, round(width_cm * EMU_PER_CM), round(height_cm * EMU_PER_CM))
+
+    with _image_cache_lock:
+        _image_cache[digest] = image
+        while len(_image_cache) > IMAGE_CACHE_LIMIT:
+            _image_cache.popitem(last=False)
+    return image
+
+
+def image_rel_id(image):
+    return f"rIdImg{image.digest}"
+
+
+def image_part_name(image):
+    return f"media/image_{image.digest}.{image.ext}"
+
+
+def image_xml(image, shape_id, style_id):
+    """이미지 하나를 담은 <w:p> XML (인라인 그림)"""
+    return (
+        f'<w:p {W_NS} xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+        ' xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"'
+        ' xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+        ' xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        f'<w:pPr><w:pStyle w:val="{style_id}"/></w:pPr><w:r><w:drawing>'
+        '<wp:inline distT="0" distB="0" distL="0" distR="0">'
+        f'<wp:extent cx="{image.width}" cy="{image.height}"/>'
+        f'<wp:docPr id="{shape_id}" name="Picture {shape_id}"/>'
+        '<wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+        '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture"><pic:pic>'
+        f'<pic:nvPicPr><pic:cNvPr id="0" name="image_{image.digest}.{image.ext}"/><pic:cNvPicPr/></pic:nvPicPr>'
+        f'<pic:blipFill><a:blip r:embed="{image_rel_id(image)}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+        f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{image.width}" cy="{image.height}"/></a:xfrm>'
+        '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr>'
+        '</pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>'
+    )
+
+
+def _add_image_parts(entries, images):
+    """[Content_Types].xml / document.xml.rels에 이미지 형식과 관계 추가"""
+    patched = []
+    for name, data in entries:
+        if name == CONTENT_TYPES_PART:
+            for ext in sorted({image.ext for image in images}):
+                if f'Extension="{ext}"'.encode() not in data:
+                    default = f'<Default Extension="{ext}" ContentType="{IMAGE_CONTENT_TYPES[ext]}"/>'
+                    data = data.replace(b'</Types>', default.encode() + b'</Types>')
+        elif name == DOCUMENT_RELS_PART:
+            rels = ''.join(
+                f'<Relationship Id="{image_rel_id(image)}" Type="{IMAGE_REL_TYPE}" Target="{image_part_name(image)}"/>'
+                for image in images
+            )
+            data = data.replace(b'</Relationships>', rels.encode() + b'</Relationships>')
+        patched.append((name, data))
+    return patched
+
+
+DOCUMENT_PART = 'word/document.xml'
+DOCUMENT_RELS_PART = 'word/_rels/document.xml.rels'
+CONTENT_TYPES_PART = '[Content_Types].xml'
+FRAGMENT_WRAP_END = b'</w:body>'
+FRAGMENT_CACHE_LIMIT = 64  # 보관할 챕터 조각 수
+
+
+def chapter_key(chapter):
+    """챕터 조각 캐시 키 - 번호/제목/소제목 제목/본문/이미지가 같으면 같은 값 (번호는 PART 번호와 북마크에 들어간다)"""
+    digest = hashlib.sha1(f"{chapter.index}\0{chapter.title}".encode('utf-8'))
+    for sub in chapter.subtopics:
+        digest.update(f"\0{sub.index}\0{sub.title}\0{'' if sub.text is None else 'T' + sub.text}".encode('utf-8'))
+        digest.update(''.join(f"\0{image.digest}" for image in sub.images).encode('ascii'))
+    return digest.hexdigest()
+
+
+class FragmentCache:
+    """챕터 XML 조각 LRU 캐시 (키: chapter_key, 값: <w:body> 안쪽 XML bytes)"""
+
+    __slots__ = ('limit', '_items', 'hits', 'misses')
+
+    def __init__(self, limit=FRAGMENT_CACHE_LIMIT):
+        self.limit = limit
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        fragment = self._items.get(key)
+        if fragment is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._items.move_to_end(key)
+        return fragment
+
+    def put(self, key, fragment):
+        self._items[key] = fragment
+        self._items.move_to_end(key)
+        while len(self._items) > self.limit:
+            self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return f"FragmentCache({len(self._items)} chapters, hits={self.hits}, misses={self.misses})"
+
+
+class EbookRenderer:
+    """스타일 기반 전자책 렌더러 - 문단에는 스타일만 붙이고 글자 서식은 넣지 않는다"""
+
+    def __init__(self):
+        self.doc = new_document()
+        # 스타일 이름 → styleId (python-docx의 para.style = ... 는 매번 스타일 전체를 훑으므로 id를 직접 쓴다)
+        self.style_ids = {name: self.doc.styles[name].style_id for name in (*PARAGRAPH_STYLES, *CHARACTER_STYLES)}
+        self._body = self.doc.element.body
+        self._sect_pr = self._body.sectPr  # 본문 끝 (표는 이 앞에 직접 넣는다)
+        # 조각을 감싸는 <w:body> - 문서 루트와 같은 네임스페이스를 선언해 조각 안에는 선언이 없다
+        self._nsmap = {prefix: uri for prefix, uri in self.doc.element.nsmap.items() if prefix}
+
+    def paragraph(self, text='', style=None, **direct):
+        """문단 추가 - direct는 이 문단에만 덮어쓸 문단 속성 (space_before, page_break_before 등)"""
+        para = self.doc.add_paragraph(text)
+        if style:
+            para._p.style = self.style_ids[style]
+        if direct:
+            _apply_paragraph_format(para.paragraph_format, direct)
+        return para
+
+    def run(self, para, text, style=None):
+        """문단에 글자 추가 (style은 글자 스타일 이름)"""
+        run = para.add_run(text)
+        if style:
+            run._r.style = self.style_ids[style]
+        return run
+
+    def add_bookmark(self, paragraph, name, bookmark_id):
+        """문단에 북마크 추가 → 정리된 북마크 이름
+
+        bookmark_id는 문서 안에서 겹치지 않아야 한다. 챕터 조각을 캐시해 다시 붙이므로
+        렌더링 순서가 아니라 위치(챕터/소제목 번호)로 정한다.
+        """
+        clean_name = bookmark_name(name)
+        start = OxmlElement('w:bookmarkStart')
+        start.set(qn('w:id'), str(bookmark_id))
+        start.set(qn('w:name'), clean_name)
+        end = OxmlElement('w:bookmarkEnd')
+        end.set(qn('w:id'), str(bookmark_id))
+        paragraph._p.insert(0, start)
+        paragraph._p.append(end)
+        return clean_name
+
+    def add_hyperlink(self, paragraph, text, name, char_style):
+        """북마크로 연결되는 하이퍼링크 (글자 모양은 글자 스타일)"""
+        hyperlink = OxmlElement('w:hyperlink')
+        hyperlink.set(qn('w:anchor'), bookmark_name(name))
+        run = OxmlElement('w:r')
+        rpr = OxmlElement('w:rPr')
+        rstyle = OxmlElement('w:rStyle')
+        rstyle.set(qn('w:val'), self.style_ids[char_style])
+        rpr.append(rstyle)
+        run.append(rpr)
+        text_elem = OxmlElement('w:t')
+        text_elem.text = text
+        text_elem.set(qn('xml:space'), 'preserve')
+        run.append(text_elem)
+        hyperlink.append(run)
+        paragraph._p.append(hyperlink)
+        return hyperlink
+
+    # ── 앞부분 ──────────────────────────────────────────
+
+    def render_cover(self, title, subtitle, author):
+        self.paragraph(title, 'EB Title')
+        if subtitle:
+            self.paragraph(subtitle, 'EB Subtitle')
+        self.paragraph(author or "저자", 'EB Author')
+
+        # 판권 페이지
+        copyright_lines = [
+            f"{title}",
+            "",
+            f"지은이: {author if author else '저자'}",
+            "",
+            "이 책의 저작권은 저자에게 있습니다.",
+            "무단 전재와 복제를 금합니다."
+        ]
+        for i, line in enumerate(copyright_lines):
+            if i == 0:
+                self.paragraph(line, 'EB Copyright', page_break_before=True, space_before=BLANK_LINE * 18)
+            else:
+                self.paragraph(line, 'EB Copyright')
+
+    def render_prologue(self, prologue_text):
+        self.paragraph("Prologue", 'EB Prologue Title')
+        for para_text in prologue_text.split('\n\n'):
+            if para_text.strip():
+                self.paragraph(para_text.strip(), 'EB Prologue')
+
+    def render_toc(self, chapters):
+        self.paragraph("CONTENTS", 'EB TOC Title')
+        for chapter in chapters:
+            idx = chapter.index
+            self.paragraph(f"{idx + 1:02d}", 'EB TOC Number')
+            title_para = self.paragraph(style='EB TOC Chapter')
+            self.add_hyperlink(title_para, strip_part_prefix(chapter.title, idx), f"chapter_{idx + 1}", 'EB TOC Chapter Link')
+            for sub in chapter.subtopics:
+                entry = self.paragraph(style='EB TOC Entry')
+                self.run(entry, "·  ", 'EB TOC Bullet')
+                self.add_hyperlink(entry, sub.title, f"subtopic_{idx + 1}_{sub.index + 1}", 'EB TOC Entry Link')
+
+    # ── 본문 ────────────────────────────────────────────
+
+    def render_chapter(self, chapter):
+        """챕터 시작 페이지 + 본문이 있는 소제목 (소제목마다 새 페이지)"""
+        idx = chapter.index
+        self.paragraph("P A R T", 'EB Part Label')
+        self.paragraph(f"{idx + 1}", 'EB Part Number')
+        self.paragraph("───────────", 'EB Rule')
+        ch_name = self.paragraph(strip_part_prefix(chapter.title, idx), 'EB Chapter Title')
+        self.add_bookmark(ch_name, f"chapter_{idx + 1}", (idx + 1) * 1000)
+
+        last_index = len(chapter.subtopics) - 1
+        for sub in chapter.subtopics:
+            if sub.text is None:
+                continue
+            self.paragraph("──", 'EB Subtopic Rule')
+            sub_title = self.paragraph(sub.title, 'EB Subtopic')
+            self.add_bookmark(sub_title, f"subtopic_{idx + 1}_{sub.index + 1}", (idx + 1) * 1000 + sub.index + 1)
+            self.render_body(sub.text)
+            # Page 5에서 올린 이미지는 소제목 끝에
+            for n, image in enumerate(sub.images):
+                self.add_image(image, (idx + 1) * 1000000 + (sub.index + 1) * 1000 + n + 1)
+
+            # 소제목 사이 구분 (마지막 소제목 제외)
+            if sub.index < last_index:
+                self.paragraph("· · ·", 'EB Separator')
+
+    def chapter_xml(self, chapter, cache=None):
+        """챕터 본문 XML 조각 (cache가 있으면 내용이 같은 챕터는 렌더링하지 않고 캐시된 조각)"""
+        if cache is None:
+            self.render_chapter(chapter)
+            return self.take_xml()
+        key = chapter_key(chapter)
+        fragment = cache.get(key)
+        if fragment is None:
+            self.render_chapter(chapter)
+            fragment = self.take_xml()
+            cache.put(key, fragment)
+        return fragment
+
+    def take_xml(self):
+        """지금까지 본문에 쌓인 요소를 떼어 내 XML bytes로 (sectPr은 남긴다)"""
+        if len(self._body) == 1:
+            return b''
+        wrapper = OxmlElement('w:body', nsdecls=self._nsmap)
+        wrapper.extend(self._body[:-1])
+        xml = etree.tostring(wrapper, encoding='utf-8')
+        return xml[xml.index(b'>') + 1:-len(FRAGMENT_WRAP_END)]
+
+    def render_body(self, text):
+        """본문 블록 (표 감지 포함) - 첫 문단 첫 글자는 드롭캡"""
+        is_first_para = True
+        for block_type, block_content in split_content_blocks(text):
+            if block_type == 'table':
+                table_data = parse_table_data(block_content)
+                if table_data and len(table_data) >= 2:
+                    self.paragraph(style='EB Table Before')
+                    self.add_table(table_data)
+                    self.paragraph(style='EB Table After')
+                    is_first_para = False
+                continue
+
+            paragraphs = block_content.split('\n\n')
+            if not any(p.strip() for p in paragraphs):
+                paragraphs = block_content.split('\n')
+            for para_text in paragraphs:
+                para_text = para_text.strip()
+                if not para_text:
+                    continue
+                if is_first_para:
+                    para = self.paragraph(style='EB Body')
+                    self.run(para, para_text[0], 'EB Drop Cap')
+                    self.run(para, para_text[1:])
+                    is_first_para = False
+                else:
+                    self.paragraph(para_text, 'EB Body')
+
+    def add_table(self, table_data):
+        """프리미엄 테이블 - 모양은 EB Table 스타일, 열 너비는 tblGrid로 (셀마다 속성을 넣지 않는다)"""
+        tbl = parse_xml(table_xml(table_data, self.style_ids))
+        self._sect_pr.addprevious(tbl)
+        return tbl
+
+    def add_image(self, image, shape_id):
+        """이미지 문단 (그림은 rId로 패키지의 media 파일을 가리킨다, shape_id는 문서 안에서 겹치지 않게)"""
+        para = parse_xml(image_xml(image, shape_id, self.style_ids['EB Image']))
+        self._sect_pr.addprevious(para)
+        return para
+
+    # ── 뒷부분 ──────────────────────────────────────────
+
+    def render_epilogue(self, epilogue_text, author):
+        self.paragraph("E P I L O G U E", 'EB Label')
+        self.paragraph("───────────", 'EB Rule')
+        self.paragraph("마치며", 'EB Epilogue Title')
+        for para_text in epilogue_text.split('\n\n'):
+            if para_text.strip():
+                self.paragraph(para_text.strip(), 'EB Epilogue')
+        self.paragraph("─────", 'EB Signature Rule')
+        self.paragraph(f"{author if author else '저자'}", 'EB Signature')
+
+    def render_about(self, author, author_bio):
+        self.paragraph("A B O U T", 'EB Label')
+        self.paragraph("───────────", 'EB Rule')
+        self.paragraph(author if author else "저자", 'EB About Name')
+        for para_text in author_bio.split('\n\n'):
+            if para_text.strip():
+                self.paragraph(para_text.strip(), 'EB About')
+        self.paragraph("◆", 'EB End Mark')
+
+
+def write_ebook_docx(out, title, subtitle, author, chapters, prologue, epilogue, author_bio, fragment_cache=None):
+    """전자책 워드 파일을 out(바이너리 파일 객체)에 스트리밍으로 쓴다
+
+    chapters는 목차 순서의 DocxChapter 목록. document.xml은 구역(앞부분 / 챕터 하나 / 뒷부분)을
+    렌더링할 때마다 XML로 바꿔 zip 항목에 바로 흘려 쓰고 요소는 버리므로, 메모리에는 한 구역 분량만
+    남는다. fragment_cache(FragmentCache)를 주면 내용이 그대로인 챕터는 캐시된 조각을 그대로 쓴다.
+    """
+    renderer = EbookRenderer()
+    entries, document_head, document_tail = get_template_parts()
+    # 같은 이미지는 패키지에 한 번만 (원본 해시별 media 파일 하나)
+    images = list({
+        image.digest: image
+        for chapter in chapters for sub in chapter.subtopics if sub.text is not None
+        for image in sub.images
+    }.values())
+    if images:
+        entries = _add_image_parts(entries, images)
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, data in entries:
+            if name != DOCUMENT_PART:
+                zf.writestr(name, data)
+                continue
+            with zf.open(DOCUMENT_PART, 'w') as document_xml:
+                document_xml.write(document_head)
+                renderer.render_cover(title, subtitle, author)
+                renderer.render_prologue(prologue)
+                renderer.render_toc(chapters)
+                document_xml.write(renderer.take_xml())
+                for chapter in chapters:
+                    document_xml.write(renderer.chapter_xml(chapter, fragment_cache))
+                renderer.render_epilogue(epilogue, author)
+                renderer.render_about(author, author_bio)
+                document_xml.write(renderer.take_xml())
+                document_xml.write(document_tail)
+        for image in images:  # 이미 압축된 형식이라 그대로 저장
+            zf.writestr(f"word/{image_part_name(image)}", image.data, compress_type=zipfile.ZIP_STORED)
+
+
+def render_ebook_docx(*args, **kwargs):
+    """전자책 워드 파일 (bytes) - 인자는 write_ebook_docx와 같다 (out 제외)"""
+    buffer = io.BytesIO()
+    write_ebook_docx(buffer, *args, **kwargs)
+    return buffer.getvalue()
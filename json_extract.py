@@ -0,0 +1,216 @@
+"""AI 응답에서 JSON 객체 추출 (앞에서부터 한 번 훑기)
+
+parse_json이 쓰던 ```json 블록 정규식 + 탐욕적 \\{[\\s\\S]*\\} 검색 대신
+'{' 후보를 앞에서부터 찾아 그 객체 범위(괄호 짝)만 json.JSONDecoder.raw_decode로 시도한다.
+실패한 후보는 범위 전체를 건너뛰므로 응답 길이에 비례한 시간으로 끝나고,
+바깥 객체가 깨졌을 때 그 안의 중첩 객체를 대신 돌려주지도 않는다.
+max_tokens에 걸려 잘린 응답은 열린 문자열/괄호를 닫아 살릴 수 있는 데까지 복구한다.
+"""
+import json
+import re
+
+_decoder = json.JSONDecoder()
+_FENCE = "```json"
+REPAIR_ATTEMPTS = 3  # 쉼표 정리/잘림 복구를 시도할 실패 후보 수 (바깥 객체부터)
+_WHITESPACE = ' \t\r\n'
+# '{' 다음이 '"' 또는 '}'인 위치 (본문 속 {키워드} 같은 중괄호는 바로 거른다)
+_CANDIDATE = re.compile(r'\{[ \t\r\n]*(?:["}]|\Z)')
+# 완성된 문자열은 통째로, 그 밖에서는 괄호(/쉼표)만 잡는다 (짝 없는 '"'는 끝나지 않은 문자열)
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_BRACKETS = re.compile(_STRING + r'|["{}\[\]]', re.S)
+_STRUCTURAL = re.compile(_STRING + r'|["{}\[\],]', re.S)
+_TRAILING_COMMA = re.compile(r',[ \t\r\n]*[}\]]')
+
+
+def _is_object_start(text, pos):
+    """pos의 '{'가 JSON 객체 시작 후보인지"""
+    return _CANDIDATE.match(text, pos) is not None
+
+
+def object_end(text, start):
+    """start의 '{'와 짝이 맞는 '}' 다음 위치 (문자열 안 괄호는 무시, 끝까지 안 닫히면 len(text))"""
+    depth = 0
+    for match in _BRACKETS.finditer(text, start):
+        token = match.group()
+        if token in '{[':
+            depth += 1
+        elif token in '}]':
+            depth -= 1
+            if depth == 0:
+                return match.end()
+        elif token == '"':
+            break  # 끝나지 않은 문자열
+    return len(text)
+
+
+def strip_trailing_commas(text):
+    """문자열 밖의 ',}' / ',]' 쉼표 제거 (한 번 훑기)"""
+    if not _TRAILING_COMMA.search(text):
+        return text
+    out = []
+    last = 0
+    length = len(text)
+    for match in _STRUCTURAL.finditer(text):
+        token = match.group()
+        if token == '"':
+            break  # 끝나지 않은 문자열
+        if token == ',':
+            i = match.start()
+            j = i + 1
+            while j < length and text[j] in _WHITESPACE:
+                j += 1
+            if j < length and text[j] in '}]':
+                out.append(text[last:i])
+                last = i + 1
+    out.append(text[last:])
+    return ''.join(out)
+
+
+def _last_comma(text, start, end):
+    """text[start:end]에서 (중첩 괄호/문자열 밖의) 마지막 쉼표 위치, 없으면 None"""
+    comma = None
+    depth = 0
+    for match in _STRUCTURAL.finditer(text, start, end):
+        token = match.group()
+        if token in '{[':
+            depth += 1
+        elif token in '}]':
+            depth -= 1
+        elif token == ',':
+            if depth == 0:
+                comma = match.start()
+        elif token == '"':
+            break  # 끝나지 않은 문자열
+    return comma
+
+
+def _closers(stack):
+    return ''.join('}' if ch == '{' else ']' for ch, _ in reversed(stack))
+
+
+def close_truncated(fragment):
+    """잘린 JSON 조각을 닫아서 파싱 → 객체 (복구 못 하면 None)
+
+    열린 문자열과 괄호를 닫아 보고, 안 되면 안쪽 괄호부터 마지막 쉼표 앞까지
+    잘라 내면서 (끝나지 않은 키/값 버림) 다시 시도한다. 쉼표 위치는 그때 가서
+    그 괄호 구간만 훑어 찾는다.
+    """
+    stack = []  # (여는 괄호, 여는 위치)
+    in_string = False
+    for match in _BRACKETS.finditer(fragment):
+        ch = match.group()
+        if ch == '"':
+            in_string = True  # 끝나지 않은 문자열 - 나머지는 전부 그 안
+            break
+        if ch in '{[':
+            stack.append((ch, match.start()))
+        elif ch in '}]':
+            if stack:
+                stack.pop()
+            if not stack:
+                fragment = fragment[:match.end()]
+                break
+
+    if not stack:
+        return None
+
+    def candidates():
+        tail = fragment.rstrip()
+        if in_string:
+            tail += '"'
+        yield strip_trailing_commas(tail) + _closers(stack)
+        # 안쪽 괄호부터: 마지막 쉼표 앞까지 자르고 그 바깥 괄호들만 닫기
+        end = len(fragment)
+        for depth in range(len(stack) - 1, -1, -1):
+            start = stack[depth][1]
+            comma = _last_comma(fragment, start + 1, end)
+            if comma is not None:
+                yield fragment[:comma] + _closers(stack[:depth + 1])
+            end = start
+
+    for candidate in candidates():
+        try:
+            obj = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(obj, dict):
+            return obj
+    return None
+
+
+def _repair(span, truncated):
+    """raw_decode가 실패한 후보 범위 복구 → (객체, 잘린 응답 복구 여부), 실패하면 None"""
+    # 마지막 쉼표가 남은 응답 (모델이 자주 내는 형식 오류)
+    cleaned = strip_trailing_commas(span)
+    if cleaned != span:
+        try:
+            obj, _ = _decoder.raw_decode(cleaned)
+            return obj, False
+        except ValueError:
+            pass
+    # max_tokens에서 끊긴 응답
+    if truncated:
+        obj = close_truncated(span)
+        if obj is not None:
+            return obj, True
+    return None
+
+
+def extract_json(text, repair_truncated=True):
+    """응답 텍스트에서 첫 번째로 유효한 JSON 객체 → (객체, 잘린 응답 복구 여부)
+
+    ```json 블록 안의 객체를 먼저, 그다음 앞에서부터 후보마다 한 번 시도하고,
+    실패하면 (앞쪽 REPAIR_ATTEMPTS개 후보까지) 쉼표 정리와 잘림 복구를 해 본다. 그래도 실패한 후보는 범위 끝으로 건너뛰므로 깨진 바깥 객체 대신
+    중첩 객체를 돌려주지 않는다. 못 찾으면 (None, False).
+    """
+    if not text:
+        return None, False
+    length = len(text)
+    attempts = 0
+
+    def attempt(start):
+        """후보 하나 시도 → (결과 또는 None, 다음에 볼 위치)"""
+        nonlocal attempts
+        if attempts < REPAIR_ATTEMPTS:
+            # 앞쪽 후보는 범위를 재지 않고 바로 파싱 (대부분 여기서 끝난다)
+            try:
+                obj, end = _decoder.raw_decode(text, start)
+                return (obj, False), end
+            except json.JSONDecodeError as e:
+                error = e
+            attempts += 1
+            if error.msg.startswith('Unterminated string') or error.pos >= len(text.rstrip()):
+                end = length  # 끝까지 닫히지 않음 (범위를 따로 잴 필요 없음)
+            else:
+                end = object_end(text, start)
+            return _repair(text[start:end], repair_truncated and end == length), end
+        # 그 뒤로는 범위 안에서만 파싱 (실패해도 오류 위치 계산이 범위 안에서 끝남)
+        end = object_end(text, start)
+        try:
+            obj, _ = _decoder.raw_decode(text[start:end])
+            return (obj, False), end
+        except ValueError:
+            return None, end
+
+    fence_start = fence_end = -1
+    fence = text.find(_FENCE)
+    if fence != -1:
+        pos = text.find('{', fence + len(_FENCE))
+        if pos != -1 and _is_object_start(text, pos):
+            result, end = attempt(pos)
+            if result is not None:
+                return result
+            fence_start, fence_end = pos, end
+
+    pos = 0
+    while True:
+        match = _CANDIDATE.search(text, pos)
+        if match is None:
+            return None, False
+        start = match.start()
+        if fence_start <= start < fence_end:
+            pos = fence_end  # 이미 시도한 ```json 블록 객체
+            continue
+        result, pos = attempt(start)
+        if result is not None:
+            return result
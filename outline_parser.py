@@ -0,0 +1,176 @@
+"""AI 목차 응답 파서 (목차 생성 / 빠른 제작 / PAGE 4 공용)
+
+정규식은 모듈을 불러올 때 한 번만 컴파일하고, 줄마다 classify_line으로
+챕터/소제목/기타를 한 번에 판정한다. 결과는 Outline 객체로 돌려준다.
+"""
+import re
+
+# 챕터 판정 전에 떼어 낼 앞부분 (마크다운 #, *, 공백, 📕 같은 기호 - 글머리 기호/괄호/숫자는 남김)
+_CHAPTER_LEAD = re.compile(r'^(?:[#*\s]|[^\w\s\-•·→▶【\[])+')
+_CHAPTER_PATTERNS = (
+    re.compile(r'^(?:PART|파트|Chapter|챕터)\s*\d+', re.IGNORECASE),   # PART 1. 제목 / 챕터 2 제목
+    re.compile(r'^[【\[]?\s*\d+\s*(?:부|장|편)(?:[】\]]|\s|$)'),        # 【1부】 제목 / 2장 제목
+)
+# 번호만 있는 줄: PART 같은 챕터 표시가 이미 나왔으면 소제목, 아니면 챕터
+_NUMBERED_PATTERNS = (
+    re.compile(r'^\d+[\.\)]\s*\S'),                                    # 1. 제목 (들여쓰기 없을 때만)
+    re.compile(r'^\d+\s+[가-힣A-Za-z]'),                               # 1 제목
+)
+_BULLET = re.compile(r'^[\-•·*→▶]\s*')
+_ENUMERATED = re.compile(r'^[a-z\d][\)\.:]\s+', re.IGNORECASE)
+_LEADING_NUMBER = re.compile(r'^\d+[\.\):]\s*')
+_HEADING_WORD = re.compile(r'^(?:PART|파트|Chapter|챕터)', re.IGNORECASE)
+_MARKDOWN = re.compile(r'\*\*|[*#]')
+
+MIN_TITLE_LENGTH = 4  # 이보다 짧은 챕터/소제목은 버림
+MIN_PLAIN_SUBTOPIC_LENGTH = 6  # 기호 없는 일반 줄을 소제목으로 볼 최소/최대 길이
+MAX_PLAIN_SUBTOPIC_LENGTH = 99
+
+CHAPTER = 'chapter'
+NUMBERED = 'numbered'
+SUBTOPIC = 'subtopic'
+TEXT = 'text'
+
+
+class OutlineChapter:
+    """챕터 하나 (제목 + 소제목 목록)"""
+
+    __slots__ = ('title', 'subtopics')
+
+    def __init__(self, title, subtopics=None):
+        self.title = title
+        self.subtopics = subtopics if subtopics is not None else []
+
+    def __repr__(self):
+        return f"OutlineChapter({self.title!r}, {self.subtopics!r})"
+
+
+class Outline:
+    """파싱된 목차 (title은 '### 📕 ...' 시스템명 줄, tagline은 '> ...' 설명 줄)"""
+
+    __slots__ = ('chapters', 'title', 'tagline')
+
+    def __init__(self, chapters=None, title='', tagline=''):
+        self.chapters = chapters if chapters is not None else []
+        self.title = title
+        self.tagline = tagline
+
+    def __bool__(self):
+        return bool(self.chapters)
+
+    def __len__(self):
+        return len(self.chapters)
+
+    def chapter_titles(self):
+        return [ch.title for ch in self.chapters]
+
+    def subtopic_map(self):
+        return {ch.title: list(ch.subtopics) for ch in self.chapters}
+
+    def subtopic_count(self):
+        return sum(len(ch.subtopics) for ch in self.chapters)
+
+    def __repr__(self):
+        return f"Outline({self.chapters!r})"
+
+
+def clean_title(text):
+    """마크다운 기호 제거"""
+    return _MARKDOWN.sub('', text).strip()
+
+
+def classify_line(raw):
+    """한 줄 판정 → (종류, 이름) - 종류는 CHAPTER / NUMBERED / SUBTOPIC / TEXT, 빈 줄은 None"""
+    line = raw.strip()
+    if not line:
+        return None
+    indented = raw[:1] in (' ', '\t')
+
+    head = _CHAPTER_LEAD.sub('', line)
+    if head:
+        for pattern in _CHAPTER_PATTERNS:
+            if pattern.match(head):
+                return CHAPTER, clean_title(head)
+        if not indented:
+            for pattern in _NUMBERED_PATTERNS:
+                if pattern.match(head):
+                    return NUMBERED, clean_title(head)
+
+    match = _BULLET.match(line) or _ENUMERATED.match(line)
+    if match:
+        return SUBTOPIC, clean_title(_LEADING_NUMBER.sub('', line[match.end():]))
+    if indented:
+        return SUBTOPIC, clean_title(_LEADING_NUMBER.sub('', line.lstrip('-•·*→▶ \t')))
+    return TEXT, clean_title(line)
+
+
+def parse_outline(text, max_subtopics=None):
+    """AI 목차 응답 → Outline (챕터를 못 찾으면 빈 Outline)
+
+    - 챕터: PART/파트/Chapter/챕터 + 숫자, 【1부】, '1. 제목' (들여쓰기 없음, PART 표시가
+      있는 목차에서는 '1. 제목'이 소제목)
+    - 소제목: 글머리 기호(- • · * → ▶), 'a) 제목', 들여쓰기된 줄, 챕터 아래의 짧은 일반 줄
+    - 챕터 표시가 전혀 없으면 글머리 목록 바로 위의 일반 줄을 챕터로 본다
+    max_subtopics를 주면 챕터당 소제목을 그 수까지만 받는다.
+    """
+    outline = Outline()
+    seen = {}
+    current = None
+    has_parts = False  # PART/챕터 표시가 나왔는지
+    implicit = False  # 챕터 표시 없이 일반 줄을 챕터로 쓰는 중
+    last_text = None  # 챕터 표시가 없는 목차용: 직전 일반 줄
+
+    def start_chapter(name):
+        chapter = seen.get(name)
+        if chapter is None:
+            chapter = OutlineChapter(name)
+            seen[name] = chapter
+            outline.chapters.append(chapter)
+        return chapter
+
+    for raw in (text or '').splitlines():
+        kind_name = classify_line(raw)
+        if kind_name is None:
+            continue
+        kind, name = kind_name
+        if kind == NUMBERED:
+            if has_parts:
+                kind, name = SUBTOPIC, clean_title(_LEADING_NUMBER.sub('', raw.strip()))
+            else:
+                kind = CHAPTER
+
+        if kind == CHAPTER:
+            if len(name) >= MIN_TITLE_LENGTH:
+                current = start_chapter(name)
+                has_parts = has_parts or kind_name[0] == CHAPTER
+                implicit = False
+            continue
+
+        if kind == TEXT and raw.strip().startswith('>'):
+            if current is None:
+                outline.tagline = outline.tagline or name.lstrip('> ').strip()
+            continue
+        # 챕터 표시가 없는 목차: 일반 줄은 다음 글머리 목록의 챕터 후보
+        if kind == TEXT and (current is None or implicit):
+            if current is None and not outline.title:
+                outline.title = name
+            last_text = name if len(name) >= MIN_TITLE_LENGTH else None
+            continue
+        if kind == SUBTOPIC and last_text and (current is None or implicit):
+            current = start_chapter(last_text)
+            implicit = True
+            last_text = None
+        if current is None:
+            continue
+
+        # 기호 없는 일반 줄: 마침표/콜론으로 끝나면 설명 문장이지 소제목이 아니다
+        if kind == TEXT and (not MIN_PLAIN_SUBTOPIC_LENGTH <= len(name) <= MAX_PLAIN_SUBTOPIC_LENGTH or name.endswith(('.', '。', ':'))):
+            continue
+        if len(name) < MIN_TITLE_LENGTH or _HEADING_WORD.match(name):
+            continue
+        if name.lower() == current.title.lower() or name in current.subtopics:
+            continue
+        if max_subtopics is not None and len(current.subtopics) >= max_subtopics:
+            continue
+        current.subtopics.append(name)
+    return outline
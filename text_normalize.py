@@ -0,0 +1,52 @@
+"""본문 정리 (clean_text / clean_content) - 미리 컴파일한 정규식 + 필요한 단계만
+
+예전 구현은 매번 정규식을 새로 찾고 (정규식 3개 + replace 5번 + 줄바꿈 정리) 본문을
+열 번 가까이 다시 훑었다. 여기서는
+- clean_content의 **굵게** / *기울임* 정규식은 어차피 뒤에서 * 를 모두 지우므로 없앤다
+- 줄 첫머리 # 제목 표시, * / # 기호, 세 줄 이상 줄바꿈은 해당 문자가 있을 때만 처리한다
+- 줄바꿈 정리는 '\\n\\n\\n' 리터럴로 시작하는 패턴을 써서 정규식 엔진이 빠르게 건너뛰게 한다
+결과는 예전 구현과 글자 하나까지 같다 (benchmarks/bench_normalize.py에서 확인).
+
+- clean_content: 마크다운 기호를 지우고 빈 줄은 최대 한 줄로. 「」 강조어와 ★ 핵심 문장은 그대로 둔다.
+- clean_text: **굵은 글씨**는 「굵은 글씨」로 바꾸고 나머지 마크다운 기호를 지운다.
+"""
+import re
+
+_HEADING = re.compile(r'^#{1,6}\s*', re.MULTILINE)  # 줄 첫머리 제목 표시 (뒤 공백/줄바꿈까지)
+_BOLD = re.compile(r'\*\*([^*]+)\*\*')
+_EXTRA_NEWLINES = re.compile(r'\n\n\n+')
+
+
+def _strip_headings(text):
+    if text.startswith('#') or '\n#' in text:
+        return _HEADING.sub('', text)
+    return text
+
+
+def _drop_markers(text):
+    """남은 * / # 기호 제거"""
+    if '*' in text:
+        text = text.replace('*', '')
+    if '#' in text:
+        text = text.replace('#', '')
+    return text
+
+
+def clean_content(text):
+    """AI 본문 정리 - 마크다운 제목/강조 기호 제거, 연속 빈 줄 정리"""
+    if not text:
+        return ""
+    text = _drop_markers(_strip_headings(text))
+    if '\n\n\n' in text:
+        text = _EXTRA_NEWLINES.sub('\n\n', text)
+    return text.strip()
+
+
+def clean_text(text):
+    """짧은 AI 응답 정리 - **강조**는 「강조」로, 나머지 마크다운 기호 제거"""
+    if not text:
+        return ""
+    text = _strip_headings(text)
+    if '**' in text:
+        text = _BOLD.sub(r'「\1」', text)
+    return _drop_markers(text).strip()
@@ -7,10 +7,33 @@ import urllib.parse
 import uuid
 import platform
 import hashlib
+import io
+import os
+import queue
+import random
 import requests
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from book_model import Book, count_chars, estimate_pages, new_chapter_data, new_subtopic_data
+from docx_export import DOCX_AVAILABLE, DocxChapter, DocxSubtopic, FragmentCache, prepare_image, write_ebook_docx
+from json_extract import extract_json
+from outline_parser import Outline, OutlineChapter, parse_outline
+from text_normalize import clean_content
+
+# 스레드에서 세션 상태 접근용 (병렬 AI 호출)
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    SCRIPT_CTX_AVAILABLE = True
+except ImportError:
+    SCRIPT_CTX_AVAILABLE = False
+
 # Claude API
 try:
     import anthropic
@@ -18,6 +41,13 @@ try:
 except ImportError:
     CLAUDE_AVAILABLE = False
 
+# HTTP 연결 풀 설정용 (anthropic 설치 시 함께 설치됨)
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
 # Gemini (이미지 생성용으로만 사용)
 try:
     import google.generativeai as genai
@@ -50,20 +80,6 @@ try:
 except ImportError:
     COOKIE_AVAILABLE = False
 
-# Word 문서 생성용
-try:
-    from docx import Document
-    from docx.shared import Pt, Inches, Cm, RGBColor
-    from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING, WD_TAB_ALIGNMENT, WD_TAB_LEADER
-    from docx.enum.table import WD_TABLE_ALIGNMENT
-    from docx.enum.style import WD_STYLE_TYPE
-    from docx.oxml.ns import qn
-    from docx.oxml import OxmlElement
-    import io
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
-
 # ==========================================
 # 설정
 # ==========================================
@@ -280,6 +296,570 @@ def get_pending_devices():
         return data.get("pending_devices", [])
     return []
 
+# ==========================================
+# Claude 클라이언트 (연결 풀 재사용)
+# ==========================================
+CLAUDE_MODEL_OPTIONS = {
+    "Claude Sonnet 4 (추천)": "claude-sonnet-4-20250514",
+    "Claude Sonnet 3.5 v2": "claude-3-5-sonnet-20241022",
+    "Claude Haiku 3.5 (저렴)": "claude-3-5-haiku-20241022"
+}
+CLAUDE_DEFAULT_MODEL = CLAUDE_MODEL_OPTIONS["Claude Sonnet 4 (추천)"]
+CLAUDE_CONNECT_TIMEOUT = 10  # 연결 타임아웃 (초)
+CLAUDE_READ_TIMEOUT = 300  # 응답 타임아웃 (초) - 본문 생성은 1~2분 걸림
+CLAUDE_MAX_KEEPALIVE = 20  # API 키별 유지할 연결 수
+CLAUDE_KEEPALIVE_EXPIRY = 120  # 유휴 연결 유지 시간 (초)
+CLAUDE_RPM_LIMIT = 50  # API 키별 분당 요청 수 한도
+CLAUDE_INPUT_TPM_LIMIT = 30000  # API 키별 분당 입력 토큰 한도
+CLAUDE_OUTPUT_TPM_LIMIT = 8000  # API 키별 분당 출력 토큰 한도
+CLAUDE_MAX_RETRIES = 5  # 429/과부하/연결 오류 시 재시도 횟수
+CLAUDE_RETRY_BASE_DELAY = 2  # 재시도 대기 시작값 (초, 매번 2배)
+CLAUDE_RETRY_MAX_DELAY = 60  # 재시도 대기 상한 (초)
+CLAUDE_USAGE_LOG_LIMIT = 200  # 호출별 토큰 사용 기록 보관 수
+BODY_GENERATION_WORKERS = 4  # 본문 동시 생성 기본값 (1이면 순서대로 생성)
+MAX_GENERATION_WORKERS = 8  # 사이드바에서 고를 수 있는 최대 동시 생성 수
+
+class ClaudeClientRegistry:
+    """API 키별 Claude 클라이언트 보관소 (서버 프로세스 전체 공유)
+
+    요청마다 클라이언트를 새로 만들면 HTTP 연결 풀과 TLS 세션이 버려지므로
+    키마다 하나만 만들어 모든 호출에서 재사용한다.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'clients_created': 0, 'reused': 0}
+
+    def get(self, api_key):
+        """API 키에 해당하는 클라이언트 반환 (없으면 생성)"""
+        key = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+        with self._lock:
+            self._stats['requests'] += 1
+            client = self._clients.get(key)
+            if client is None:
+                client = self._create(api_key)
+                self._clients[key] = client
+                self._stats['clients_created'] += 1
+            else:
+                self._stats['reused'] += 1
+            return client
+
+    def _create(self, api_key):
+        # 재시도는 ask_ai에서 한도 관리와 함께 처리하므로 SDK 자체 재시도는 끈다
+        if not HTTPX_AVAILABLE:
+            return anthropic.Anthropic(api_key=api_key, timeout=CLAUDE_READ_TIMEOUT, max_retries=0)
+        timeout = httpx.Timeout(CLAUDE_READ_TIMEOUT, connect=CLAUDE_CONNECT_TIMEOUT)
+        limits = httpx.Limits(max_keepalive_connections=CLAUDE_MAX_KEEPALIVE, keepalive_expiry=CLAUDE_KEEPALIVE_EXPIRY)
+        http_client_class = getattr(anthropic, 'DefaultHttpxClient', httpx.Client)
+        return anthropic.Anthropic(
+            api_key=api_key,
+            timeout=timeout,
+            max_retries=0,
+            http_client=http_client_class(timeout=timeout, limits=limits)
+        )
+
+    def get_stats(self):
+        """연결 재사용 통계"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['clients'] = len(self._clients)
+        stats['reuse_rate'] = stats['reused'] / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+@st.cache_resource
+def get_claude_registry():
+    """프로세스 전체에서 공유하는 Claude 클라이언트 보관소"""
+    return ClaudeClientRegistry()
+
+class TokenBucket:
+    """분당 한도를 초당 충전량으로 나눠 쓰는 토큰 버킷"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """amount만큼 쓰려면 기다려야 하는 시간 (0이면 바로 사용 가능)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def charge(self, amount, now):
+        """실제 사용량 반영 (음수면 돌려받음) - 한도를 넘긴 만큼은 빚으로 남아 다음 요청이 기다린다"""
+        self._refill(now)
+        self.tokens = max(-self.capacity, min(self.capacity, self.tokens - amount))
+
+class ClaudeRateLimiter:
+    """API 키별 요청 수(RPM) / 입력·출력 토큰(TPM) 한도 관리 (서버의 모든 세션 공유)
+
+    호출 전에 acquire()로 한도가 찰 때까지 기다리고 (입력은 추정치만큼 미리 차감),
+    응답을 받으면 settle()로 usage의 실제 입력/출력 토큰을 반영한다. 429를 받으면
+    pause()로 같은 키를 쓰는 모든 세션을 retry-after 동안 멈춘다.
+    """
+
+    def __init__(self, rpm=CLAUDE_RPM_LIMIT, input_tpm=CLAUDE_INPUT_TPM_LIMIT, output_tpm=CLAUDE_OUTPUT_TPM_LIMIT):
+        self.rpm = rpm
+        self.input_tpm = input_tpm
+        self.output_tpm = output_tpm
+        self._buckets = {}
+        self._paused_until = {}
+        self._lock = threading.Lock()
+        self._stats = {'acquired': 0, 'waited': 0, 'wait_seconds': 0.0, 'retries': 0, 'rate_limited': 0, 'failed': 0}
+
+    @staticmethod
+    def estimate_tokens(text):
+        """입력 토큰 추정 (한글은 대략 글자당 1토큰으로 보수적으로 계산)"""
+        return max(1, len(text))
+
+    def _get_buckets(self, key):
+        """키별 (요청, 입력 토큰, 출력 토큰) 버킷 (_lock 안에서 호출)"""
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            buckets = (TokenBucket(self.rpm), TokenBucket(self.input_tpm), TokenBucket(self.output_tpm))
+            self._buckets[key] = buckets
+        return buckets
+
+    def acquire(self, api_key, tokens):
+        """요청 1건 + 입력 토큰만큼 한도가 생길 때까지 대기 (출력 토큰은 이전 응답의 빚이 없어질 때까지)"""
+        key = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+        waited = 0.0
+        while True:
+            with self._lock:
+                buckets = self._get_buckets(key)
+                now = time.monotonic()
+                wait = max(
+                    self._paused_until.get(key, 0.0) - now,
+                    buckets[0].wait_time(1, now),
+                    buckets[1].wait_time(tokens, now),
+                    buckets[2].wait_time(1, now)
+                )
+                if wait <= 0:
+                    buckets[0].take(1)
+                    buckets[1].take(tokens)
+                    self._stats['acquired'] += 1
+                    if waited:
+                        self._stats['waited'] += 1
+                        self._stats['wait_seconds'] += waited
+                    return waited
+            wait = min(wait, 1.0)
+            time.sleep(wait)
+            waited += wait
+
+    def settle(self, api_key, estimated_tokens, usage):
+        """응답의 실제 usage 반영 - 입력은 추정치와의 차이, 출력은 전부 차감"""
+        input_tokens = (getattr(usage, 'input_tokens', None) or 0) + (getattr(usage, 'cache_creation_input_tokens', None) or 0)
+        output_tokens = getattr(usage, 'output_tokens', None) or 0
+        key = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+        with self._lock:
+            buckets = self._get_buckets(key)
+            now = time.monotonic()
+            buckets[1].charge(input_tokens - min(estimated_tokens, buckets[1].capacity), now)
+            buckets[2].charge(output_tokens, now)
+
+    def pause(self, api_key, seconds):
+        """429 수신 시 해당 키의 모든 요청을 seconds 동안 보류"""
+        key = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+        with self._lock:
+            self._stats['rate_limited'] += 1
+            self._paused_until[key] = max(self._paused_until.get(key, 0.0), time.monotonic() + seconds)
+
+    def record(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+@st.cache_resource
+def get_claude_rate_limiter():
+    """프로세스 전체에서 공유하는 Claude 호출 한도 관리자"""
+    return ClaudeRateLimiter()
+
+class ClaudeUsageLog:
+    """호출별 토큰 사용량 기록 (프롬프트 캐시 읽기/생성 토큰 포함, 서버 전체 공유)
+
+    고정 규칙을 system 블록으로 캐시한 효과(입력 비용, 첫 토큰까지 걸린 시간)를
+    확인하기 위해 최근 CLAUDE_USAGE_LOG_LIMIT건과 누적 합계를 보관한다.
+    """
+
+    FIELDS = ('input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens')
+
+    def __init__(self, limit=CLAUDE_USAGE_LOG_LIMIT):
+        self._calls = deque(maxlen=limit)
+        self._totals = {name: 0 for name in self.FIELDS}
+        self._totals['calls'] = 0
+        self._lock = threading.Lock()
+
+    def record(self, kind, model, usage, latency, ttft=None):
+        """응답 1건의 usage 기록 (ttft는 스트리밍일 때 첫 토큰까지 걸린 초)"""
+        entry = {name: getattr(usage, name, None) or 0 for name in self.FIELDS}
+        entry.update(kind=kind, model=model, latency=round(latency, 2), ttft=round(ttft, 2) if ttft is not None else None, ts=time.time())
+        with self._lock:
+            self._calls.append(entry)
+            self._totals['calls'] += 1
+            for name in self.FIELDS:
+                self._totals[name] += entry[name]
+        return entry
+
+    def recent(self, limit=20):
+        with self._lock:
+            return list(self._calls)[-limit:]
+
+    def get_stats(self):
+        """누적 토큰 수와 캐시 적중률 (캐시에서 읽은 입력 토큰 비율)"""
+        with self._lock:
+            stats = dict(self._totals)
+        prompt_tokens = stats['input_tokens'] + stats['cache_read_input_tokens'] + stats['cache_creation_input_tokens']
+        stats['cache_read_rate'] = stats['cache_read_input_tokens'] / prompt_tokens if prompt_tokens else 0.0
+        return stats
+
+@st.cache_resource
+def get_claude_usage_log():
+    """프로세스 전체에서 공유하는 Claude 토큰 사용 기록"""
+    return ClaudeUsageLog()
+
+def get_retry_delay(attempt, error=None):
+    """재시도 대기 시간: retry-after 헤더 우선, 없으면 지수 백오프 + full jitter"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms'):
+            return min(float(headers['retry-after-ms']) / 1000, CLAUDE_RETRY_MAX_DELAY)
+        if headers.get('retry-after'):
+            return min(float(headers['retry-after']), CLAUDE_RETRY_MAX_DELAY)
+    except (TypeError, ValueError):
+        pass
+    return random.uniform(0, min(CLAUDE_RETRY_MAX_DELAY, CLAUDE_RETRY_BASE_DELAY * (2 ** attempt)))
+
+# ==========================================
+# AI 응답 캐시 (로컬 디스크, LRU)
+# ==========================================
+LLM_CACHE_PATH = Path.home() / ".ebook_app_llm_cache.sqlite3"
+LLM_CACHE_MAX_BYTES = 200 * 1024 * 1024  # 캐시 최대 크기 (넘으면 오래 안 쓴 것부터 삭제)
+
+# 호출 종류별 보관 시간 (초) - 0이면 캐시하지 않음
+LLM_CACHE_TTL = {
+    'analysis': 7 * 24 * 3600,   # 시장/타겟/경쟁서 분석
+    'title': 3 * 24 * 3600,      # 제목 생성
+    'outline': 24 * 3600,        # 컨셉/목차/소제목
+    'question': 24 * 3600,       # 인터뷰 질문
+    'content': 0,                # 본문/프롤로그 (매번 새로 작성)
+    'default': 24 * 3600,
+}
+
+class LLMResponseCache:
+    """(모델, temperature, 프롬프트) 해시 기준 AI 응답 캐시
+
+    같은 주제로 분석/추천 버튼을 다시 누르거나 화면이 다시 실행될 때
+    동일한 프롬프트를 또 보내지 않도록 디스크(sqlite)에 응답을 보관한다.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, max_bytes=LLM_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'bypassed': 0, 'expired': 0, 'evicted': 0}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            kind TEXT,
+            response TEXT,
+            size INTEGER,
+            created_at REAL,
+            expires_at REAL,
+            last_access REAL
+        )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model, temp, prompt, system=''):
+        """캐시 키 (모델 + temperature + system + 프롬프트 해시)"""
+        raw = f"{model}\x00{float(temp):.3f}\x00{system}\x00{prompt}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """저장된 응답 반환 (없거나 만료되면 None)"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+            response, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._stats['hits'] += 1
+            return response
+
+    def put(self, key, kind, response, ttl):
+        """응답 저장 후 용량 초과 시 오래 안 쓴 항목 삭제"""
+        if ttl <= 0 or not response:
+            return
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, response, size, now, now + ttl, now)
+            )
+            self._stats['writes'] += 1
+            self._evict()
+            self._conn.commit()
+
+    def note_bypass(self):
+        with self._lock:
+            self._stats['bypassed'] += 1
+
+    def _evict(self):
+        """용량 상한을 넘으면 last_access가 오래된 순서로 삭제 (lock 안에서 호출)"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        total = sum(size for _, size in rows)
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self._stats['evicted'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def get_stats(self):
+        """히트/미스 통계와 현재 캐시 크기"""
+        with self._lock:
+            stats = dict(self._stats)
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        stats['entries'] = entries
+        stats['bytes'] = total
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+@st.cache_resource
+def get_llm_cache():
+    """프로세스 전체에서 공유하는 AI 응답 캐시 (디스크 사용 불가 시 None)"""
+    try:
+        return LLMResponseCache()
+    except sqlite3.Error:
+        return None
+
+# ==========================================
+# 백그라운드 작업 엔진 (화면과 별개로 생성 진행)
+# ==========================================
+JOB_DIR = Path.home() / ".ebook_app_jobs"
+JOB_LOCAL_KINDS = ('docx',)  # AI를 부르지 않는 작업 (공유 큐에서 실행)
+JOB_LOCAL_WORKERS = 2  # 로컬 작업을 동시에 실행할 수 (서버 전체)
+JOB_POLL_INTERVAL = 2  # 작업 상태 화면 갱신 간격 (초)
+JOB_HISTORY_LIMIT = 50  # 디스크와 메모리에 남길 끝난 작업 기록 수
+JOB_ACTIVE_STATUSES = ('queued', 'running')
+
+# 현재 스레드가 실행 중인 작업 id (작업 안의 오류 메시지를 작업 기록으로 보냄)
+_job_local = threading.local()
+
+class JobProgress:
+    """st.empty() 대신 넘기는 진행 표시 (info/success/warning/error 메시지를 작업에 기록)"""
+
+    def __init__(self, engine, job_id):
+        self.engine = engine
+        self.job_id = job_id
+
+    def _show(self, level, message):
+        self.engine.update(self.job_id, level=level, message=str(message))
+
+    def info(self, message):
+        self._show('info', message)
+
+    def success(self, message):
+        self._show('success', message)
+
+    def warning(self, message):
+        self._show('warning', message)
+
+    def error(self, message):
+        self._show('error', message)
+
+    def empty(self):
+        pass
+
+class JobEngine:
+    """목차/본문/워드 생성 같은 긴 작업을 작업 스레드에서 실행
+
+    AI 생성 작업은 작업마다 전용 스레드에서 바로 시작한다 (세션당 하나만 돌고,
+    API 호출량은 ClaudeRateLimiter가 키별로 조절하므로 다른 세션의 긴 생성
+    뒤에 줄 서지 않는다). WORD 만들기 같은 로컬 작업(JOB_LOCAL_KINDS)만
+    JOB_LOCAL_WORKERS개 스레드가 공유 큐에서 처리한다.
+
+    작업은 제출한 세션의 컨텍스트를 붙여 실행되므로 st.session_state에 결과가
+    그대로 쌓이고, 화면 재실행이나 다른 위젯 조작과 상관없이 계속 진행된다.
+    작업 상태는 JOB_DIR에 JSON으로 남고, 끝난 작업은 최근 JOB_HISTORY_LIMIT개만
+    메모리에 둔다.
+    """
+
+    def __init__(self, local_workers=JOB_LOCAL_WORKERS, job_dir=JOB_DIR):
+        self.job_dir = Path(job_dir)
+        self._local_queue = queue.Queue()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._load_history()
+        for i in range(local_workers):
+            threading.Thread(target=self._local_worker, name=f"ebook-job-local-{i}", daemon=True).start()
+
+    def _load_history(self):
+        """이전 프로세스의 작업 기록 불러오기 (끝나지 못한 작업은 중단 처리)"""
+        if not self.job_dir.exists():
+            return
+        paths = sorted(self.job_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for path in paths[JOB_HISTORY_LIMIT:]:
+            path.unlink(missing_ok=True)
+        for path in paths[:JOB_HISTORY_LIMIT]:
+            try:
+                job = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            if job.get('status') in JOB_ACTIVE_STATUSES:
+                job['status'] = 'interrupted'
+                job['level'] = 'warning'
+                job['message'] = "서버가 재시작되어 중단되었습니다. 첫 화면의 '이전 작업 불러오기'에서 이어서 생성할 수 있습니다."
+                self._save(job)
+            self._jobs[job['id']] = job
+
+    def _save(self, job):
+        try:
+            self.job_dir.mkdir(parents=True, exist_ok=True)
+            data = {k: v for k, v in job.items() if k != 'result'}
+            tmp_path = self.job_dir / f"{job['id']}.json.tmp"
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+            tmp_path.replace(self.job_dir / f"{job['id']}.json")
+        except OSError:
+            pass
+
+    def submit(self, kind, label, fn):
+        """작업 등록 후 job_id 반환 - fn(progress)는 작업 스레드에서 실행된다"""
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            'id': job_id,
+            'kind': kind,
+            'label': label,
+            'status': 'queued',
+            'level': 'info',
+            'message': "⏳ 대기 중...",
+            'errors': [],
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'started': None,
+            'finished': None,
+        }
+        ctx = get_script_run_ctx() if SCRIPT_CTX_AVAILABLE else None
+        with self._lock:
+            self._jobs[job_id] = job
+            self._save(job)
+        if kind in JOB_LOCAL_KINDS:
+            self._local_queue.put((job_id, fn, ctx))
+        else:
+            threading.Thread(target=self._run, args=(job_id, fn, ctx), name=f"ebook-job-{job_id}", daemon=True).start()
+        return job_id
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            self._save(job)
+
+    def add_error(self, job_id, level, message):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job['errors'] = (job['errors'] + [f"[{level}] {message}"])[-20:]
+            self._save(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def pop_result(self, job_id):
+        """끝난 작업의 결과를 꺼내고 메모리에서 비움 (화면에 반영할 때 한 번)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.pop('result', None) if job else None
+
+    def _trim(self):
+        """끝난 작업은 최근 JOB_HISTORY_LIMIT개만 남김 (_lock 안에서 호출)"""
+        finished = [job for job in self._jobs.values() if job['status'] not in JOB_ACTIVE_STATUSES]
+        if len(finished) <= JOB_HISTORY_LIMIT:
+            return
+        finished.sort(key=lambda job: job.get('finished') or job['created'])
+        for job in finished[:-JOB_HISTORY_LIMIT]:
+            del self._jobs[job['id']]
+
+    def _run(self, job_id, fn, ctx):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        _job_local.job_id = job_id
+        self.update(job_id, status='running', started=datetime.now().isoformat(timespec='seconds'))
+        try:
+            result = fn(JobProgress(self, job_id))
+            ok = result is not None and result is not False
+            self.update(
+                job_id,
+                status='done' if ok else 'failed',
+                result=result,
+                finished=datetime.now().isoformat(timespec='seconds')
+            )
+        except Exception as e:
+            self.update(
+                job_id,
+                status='failed',
+                level='error',
+                message=f"오류 발생: {str(e)[:200]}",
+                finished=datetime.now().isoformat(timespec='seconds')
+            )
+        finally:
+            _job_local.job_id = None
+            with self._lock:
+                self._trim()
+
+    def _local_worker(self):
+        while True:
+            job_id, fn, ctx = self._local_queue.get()
+            try:
+                self._run(job_id, fn, ctx)
+            finally:
+                self._local_queue.task_done()
+
+@st.cache_resource
+def get_job_engine():
+    """프로세스 전체에서 공유하는 백그라운드 작업 엔진"""
+    return JobEngine()
+
 # 비디오 배경용 base64 인코딩
 @st.cache_data
 def get_video_base64(video_path):
@@ -1123,6 +1703,31 @@ select option {
 .stLinkButton > div:first-child > p {
     display: none !important;
 }
+
+/* 본문 미리보기 박스 (PAGE 5) */
+.content-preview-box {
+    background:#ffffff !important;
+    padding:25px 30px;
+    border-radius:12px;
+    border:1px solid rgba(212,175,55,0.3);
+    margin:15px 0;
+    font-family:'S-CoreDream', sans-serif !important;
+    font-size:17px;
+    max-height:500px;
+    overflow-y:auto;
+}
+.content-preview-box,
+.content-preview-box p,
+.content-preview-box span,
+.content-preview-box div {
+    color:#000000 !important;
+    -webkit-text-fill-color:#000000 !important;
+}
+.content-preview-box b[style*="color:#e67e22"],
+.content-preview-box p[style*="color:#e67e22"] {
+    color:#e67e22 !important;
+    -webkit-text-fill-color:#e67e22 !important;
+}
 </style>
 """, unsafe_allow_html=True)
 
@@ -1162,7 +1767,6 @@ if not st.session_state['authenticated']:
 
             # 새 기기 등록
             if 'new_device_code' not in st.session_state:
-                import random
                 import string
                 st.session_state['new_device_code'] = 'DEV_' + ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
 
@@ -1265,6 +1869,9 @@ if not st.session_state['authenticated']:
 defaults = {
     'topic': '', 'target_persona': '', 'pain_points': '',
     'outline': [], 'chapters': {}, 'book_title': '', 'subtitle': '',
+    'book_assets': {'prologue': '', 'epilogue': '', 'author_bio': ''},
+    'generation_workers': BODY_GENERATION_WORKERS,
+    'jobs': [],
     'score_details': None, 'generated_titles': None, 'suggested_targets': None,
     'analyzed_pains': None, 'review_analysis': None, 'market_gaps': None,
     'knowledge_hub': [], 'study_summary': None, 'current_page': 0,
@@ -1328,13 +1935,9 @@ with st.sidebar:
     # 모델 선택
     st.markdown("### 🤖 모델 선택")
     if 'claude_model' not in st.session_state:
-        st.session_state['claude_model'] = "claude-sonnet-4-20250514"
+        st.session_state['claude_model'] = CLAUDE_DEFAULT_MODEL
 
-    model_options = {
-        "Claude Sonnet 4 (추천)": "claude-sonnet-4-20250514",
-        "Claude Sonnet 3.5 v2": "claude-3-5-sonnet-20241022",
-        "Claude Haiku 3.5 (저렴)": "claude-3-5-haiku-20241022"
-    }
+    model_options = CLAUDE_MODEL_OPTIONS
     selected_model = st.selectbox(
         "모델 선택",
         options=list(model_options.keys()),
@@ -1350,6 +1953,15 @@ with st.sidebar:
     else:
         st.info("⚡ 안정적인 성능")
 
+    # 본문 동시 생성 수
+    st.session_state['generation_workers'] = st.slider(
+        "본문 동시 생성 수",
+        min_value=1,
+        max_value=MAX_GENERATION_WORKERS,
+        value=st.session_state['generation_workers'],
+        help="한 번에 여러 소제목을 함께 작성합니다. API 한도가 낮으면 줄이세요 (1 = 순서대로)"
+    )
+
     # API 키 발급 방법 안내
     with st.expander("📖 Claude API 키 발급 방법 (상세)", expanded=False):
         st.markdown("""
@@ -1465,6 +2077,39 @@ with st.sidebar:
                         st.success("추가됨!")
                         st.rerun()
 
+            # Claude 연결 재사용 현황
+            st.markdown("**📡 Claude 연결 현황:**")
+            if CLAUDE_AVAILABLE:
+                conn_stats = get_claude_registry().get_stats()
+                st.caption(f"호출 {conn_stats['requests']:,}회 · 클라이언트 {conn_stats['clients_created']}개 생성 · 재사용 {conn_stats['reused']:,}회 ({conn_stats['reuse_rate']:.0%})")
+                limit_stats = get_claude_rate_limiter().get_stats()
+                st.caption(f"한도 대기 {limit_stats['waited']:,}회 ({limit_stats['wait_seconds']:.0f}초) · 429 {limit_stats['rate_limited']:,}회 · 재시도 {limit_stats['retries']:,}회 · 최종 실패 {limit_stats['failed']:,}회")
+                usage_stats = get_claude_usage_log().get_stats()
+                st.caption(f"입력 {usage_stats['input_tokens']:,} · 프롬프트 캐시 읽기 {usage_stats['cache_read_input_tokens']:,} ({usage_stats['cache_read_rate']:.0%}) · 캐시 생성 {usage_stats['cache_creation_input_tokens']:,} · 출력 {usage_stats['output_tokens']:,} 토큰")
+                recent_calls = get_claude_usage_log().recent(5)
+                if recent_calls:
+                    st.caption(" · ".join(
+                        f"{c['kind']} 캐시 {c['cache_read_input_tokens']:,}/{c['cache_creation_input_tokens']:,} "
+                        f"{c['ttft'] if c['ttft'] is not None else c['latency']}초" for c in recent_calls
+                    ))
+            else:
+                st.caption("anthropic 패키지 없음")
+
+            # AI 응답 캐시 현황
+            st.markdown("**🗄️ AI 응답 캐시:**")
+            llm_cache = get_llm_cache()
+            if llm_cache is not None:
+                cache_stats = llm_cache.get_stats()
+                st.caption(f"히트 {cache_stats['hits']:,} · 미스 {cache_stats['misses']:,} ({cache_stats['hit_rate']:.0%}) · 강제 재생성 {cache_stats['bypassed']:,}")
+                st.caption(f"저장 {cache_stats['entries']:,}개 · {cache_stats['bytes'] / 1024 / 1024:.1f}MB / {LLM_CACHE_MAX_BYTES / 1024 / 1024:.0f}MB · 만료 {cache_stats['expired']:,} · 삭제 {cache_stats['evicted']:,}")
+                if st.button("🧹 캐시 비우기", key="btn_clear_llm_cache"):
+                    llm_cache.clear()
+                    st.success("캐시를 비웠습니다")
+            else:
+                st.caption("캐시 사용 불가")
+
+            st.markdown("---")
+
             if st.button("🚪 관리자 로그아웃", key="btn_admin_logout"):
                 st.session_state['admin_logged_in'] = False
                 st.rerun()
@@ -1484,88 +2129,361 @@ with st.sidebar:
 def get_api_key():
     return st.session_state.get('api_key', '')
 
-def clean_text(text):
-    if not text:
-        return ""
-    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\*\*([^*]+)\*\*', r'「\1」', text)
-    text = text.replace('**', '').replace('*', '').replace('###', '').replace('##', '').replace('#', '')
-    return text.strip()
-
-def clean_content(text):
-    if not text:
-        return ""
-    # 마크다운 제거
-    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
-    # **굵은글씨** 패턴 완전 제거
-    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-    text = re.sub(r'\*([^*]+)\*', r'\1', text)
-    text = text.replace('**', '').replace('*', '').replace('###', '').replace('##', '').replace('#', '')
-    # 연속 줄바꿈 정리
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    return text.strip()
-
 def parse_json(response):
-    """JSON 파싱 - 개선된 에러 처리"""
+    """응답에서 JSON 객체 추출 (json_extract.extract_json, 잘린 응답은 복구)"""
     if not response:
         return None
-    try:
-        # 먼저 전체 응답에서 JSON 블록 찾기
-        json_match = re.search(r'```json\s*([\s\S]*?)\s*```', response)
-        if json_match:
-            return json.loads(json_match.group(1))
+    data, repaired = extract_json(response)
+    if data is None:
+        report_message("JSON 파싱 경고: 응답에서 JSON을 찾지 못했습니다", 'warning')
+    elif repaired:
+        report_message("응답이 길어 잘린 JSON을 복구했습니다. 일부 항목이 빠졌을 수 있습니다.", 'warning')
+    return data
+
+def report_message(message, level='error'):
+    """오류/경고 표시 - 백그라운드 작업 안에서는 화면 대신 작업 기록에 남긴다"""
+    job_id = getattr(_job_local, 'job_id', None)
+    if job_id:
+        get_job_engine().add_error(job_id, level, message)
+    else:
+        getattr(st, level)(message)
+
+def submit_with_ctx(executor, fn, *args, **kwargs):
+    """현재 세션 컨텍스트를 붙여서 작업 제출 (스레드 안에서도 st.session_state, st.error 사용 가능)"""
+    ctx = get_script_run_ctx() if SCRIPT_CTX_AVAILABLE else None
+    job_id = getattr(_job_local, 'job_id', None)
+
+    def run():
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        _job_local.job_id = job_id
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _job_local.job_id = None
+
+    return executor.submit(run)
+
+STREAM_RENDER_INTERVAL = 0.15  # 스트리밍 미리보기 갱신 간격 (초)
+CLAUDE_RETRY_STATUS = (429, 500, 502, 503, 504, 529)  # 재시도할 HTTP 상태 코드
+
+def is_retryable_error(error):
+    """일시적인 오류(한도 초과, 서버 과부하, 연결 끊김)인지 확인"""
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    return isinstance(error, anthropic.APIStatusError) and error.status_code in CLAUDE_RETRY_STATUS
 
-        # JSON 블록이 없으면 중괄호로 시작하는 객체 찾기
-        match = re.search(r'\{[\s\S]*\}', response)
-        if match:
-            json_str = match.group()
-            # 불완전한 JSON 수정 시도
-            json_str = re.sub(r',\s*}', '}', json_str)  # 마지막 쉼표 제거
-            json_str = re.sub(r',\s*]', ']', json_str)  # 배열 마지막 쉼표 제거
-            return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        st.warning(f"JSON 파싱 경고: {str(e)[:50]}")
-    except Exception as e:
-        st.warning(f"파싱 오류: {str(e)[:50]}")
-    return None
+def build_system_blocks(system):
+    """system 프롬프트를 캐시 가능한 블록 목록으로 변환
+
+    system은 문자열 또는 문자열 목록 (앞쪽일수록 여러 호출이 공유하는 고정 규칙).
+    각 블록 끝에 cache_control을 달아 고정 규칙 블록과 책 단위 블록을 따로 캐시한다
+    (캐시 지점은 요청당 최대 4개).
+    """
+    if not system:
+        return None
+    texts = [system] if isinstance(system, str) else [t for t in system if t]
+    return [
+        {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}} if i >= len(texts) - 4
+        else {"type": "text", "text": text}
+        for i, text in enumerate(texts)
+    ]
 
-def ask_ai(prompt, temp=0.7):
-    """Claude API 호출"""
+def call_claude(client, request, on_text=None):
+    """Claude 요청 1회 실행 → (응답 텍스트, usage, 첫 토큰까지 걸린 초) (on_text가 있으면 스트리밍)"""
+    if on_text is None:
+        message = client.messages.create(**request)
+        # 도구(구조화 출력) 호출이면 도구 입력을 JSON 문자열로 반환
+        for block in message.content:
+            if block.type == 'tool_use':
+                return json.dumps(block.input, ensure_ascii=False), message.usage, None
+        return message.content[0].text, message.usage, None
+
+    # 스트리밍: 받은 조각을 모아 주기적으로 미리보기 갱신
+    chunks = []
+    last_render = 0.0
+    started = time.monotonic()
+    ttft = None
+    with client.messages.stream(**request) as stream:
+        for chunk in stream.text_stream:
+            if ttft is None:
+                ttft = time.monotonic() - started
+            chunks.append(chunk)
+            now = time.monotonic()
+            if now - last_render >= STREAM_RENDER_INTERVAL:
+                on_text(''.join(chunks))
+                last_render = now
+        usage = stream.get_final_message().usage
+    text = ''.join(chunks)
+    on_text(text)
+    return text, usage, ttft
+
+def ask_ai(prompt, temp=0.7, on_text=None, cache_kind='default', bypass_cache=False, system=None,
+           tool=None, model=None, cache_check=None):
+    """Claude API 호출
+
+    on_text를 넘기면 스트리밍 모드: 토큰이 도착할 때마다 지금까지의 전체 텍스트로
+    on_text(text)를 호출하고 (STREAM_RENDER_INTERVAL 간격), 완료 후 전체 텍스트를 반환한다.
+    cache_kind는 LLM_CACHE_TTL의 호출 종류, bypass_cache=True면 캐시를 읽지 않고 새로 생성해 덮어쓴다.
+    system에는 호출마다 같은 고정 규칙(문자열 또는 목록)을 넘긴다 - Anthropic 프롬프트 캐시로
+    재사용되고, prompt에는 소제목별로 바뀌는 내용만 남긴다.
+    tool(name/description/input_schema)을 넘기면 그 도구 호출을 강제해 입력 JSON 문자열을 반환한다.
+    model은 세션 모델 대신 쓸 모델, cache_check(text)가 False면 응답을 캐시에 저장하지 않는다.
+    """
     api_key = get_api_key()
     if not api_key:
-        st.error("Claude API 키를 입력해주세요")
+        report_message("Claude API 키를 입력해주세요")
         return None
 
     if not CLAUDE_AVAILABLE:
-        st.error("anthropic 패키지가 설치되지 않았습니다. pip install anthropic")
+        report_message("anthropic 패키지가 설치되지 않았습니다. pip install anthropic")
         return None
 
     # 선택된 모델 가져오기 (기본값: Sonnet 4)
-    model = st.session_state.get('claude_model', 'claude-sonnet-4-20250514')
+    model = model or st.session_state.get('claude_model', CLAUDE_DEFAULT_MODEL)
+
+    # 같은 요청의 이전 응답이 있으면 재사용
+    cache = get_llm_cache()
+    ttl = LLM_CACHE_TTL.get(cache_kind, LLM_CACHE_TTL['default'])
+    cache_key = None
+    if cache is not None and ttl > 0:
+        cache_key = LLMResponseCache.make_key(model, temp, prompt, json.dumps([system, tool], ensure_ascii=False) if (system or tool) else '')
+        if bypass_cache:
+            cache.note_bypass()
+        else:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                if on_text is not None:
+                    on_text(cached)
+                return cached
+
+    client = get_claude_registry().get(api_key)
+    limiter = get_claude_rate_limiter()
+    request = {
+        'model': model,
+        'max_tokens': 8000,
+        'temperature': temp,
+        'messages': [
+            {"role": "user", "content": prompt}
+        ]
+    }
+    system_blocks = build_system_blocks(system)
+    if system_blocks:
+        request['system'] = system_blocks
+    if tool:
+        request['tools'] = [tool]
+        request['tool_choice'] = {'type': 'tool', 'name': tool['name']}
+    input_tokens = ClaudeRateLimiter.estimate_tokens(
+        prompt + ''.join(block['text'] for block in system_blocks or []) + (json.dumps(tool, ensure_ascii=False) if tool else '')
+    )
+
+    # 한도 안에서 호출, 429/과부하/연결 오류는 백오프 후 재시도
+    for attempt in range(CLAUDE_MAX_RETRIES + 1):
+        try:
+            limiter.acquire(api_key, input_tokens)
+            started = time.monotonic()
+            text, usage, ttft = call_claude(client, request, on_text)
+            limiter.settle(api_key, input_tokens, usage)
+            get_claude_usage_log().record(cache_kind, model, usage, time.monotonic() - started, ttft)
+            if cache_key and (cache_check is None or cache_check(text)):
+                cache.put(cache_key, cache_kind, text, ttl)
+            return text
+        except anthropic.AuthenticationError:
+            report_message("API 키가 유효하지 않습니다. Claude API 키를 확인해주세요.")
+            return None
+        except anthropic.BadRequestError as e:
+            report_message(f"요청 오류: {str(e)[:100]}")
+            return None
+        except Exception as e:
+            if not is_retryable_error(e):
+                report_message(f"AI 오류: {str(e)[:100]}")
+                return None
+            if attempt == CLAUDE_MAX_RETRIES:
+                limiter.record('failed')
+                if isinstance(e, anthropic.RateLimitError):
+                    report_message("API 할당량이 초과되었습니다. 잠시 후 다시 시도해주세요.")
+                else:
+                    report_message(f"AI 오류 (재시도 {CLAUDE_MAX_RETRIES}회 실패): {str(e)[:100]}")
+                return None
+            delay = get_retry_delay(attempt, e)
+            if isinstance(e, anthropic.RateLimitError):
+                limiter.pause(api_key, delay)
+            limiter.record('retries')
+            time.sleep(delay)
+
+# ==========================================
+# 구조화 출력 (분석 함수용 JSON 스키마)
+# ==========================================
+JSON_REPAIR_MAX_CHARS = 12000  # 수정 요청에 넣을 원래 응답 최대 길이
+
+def _schema_str(description=''):
+    return {'type': 'string', 'description': description} if description else {'type': 'string'}
+
+def _schema_list(items=None, min_items=0):
+    schema = {'type': 'array', 'items': items or {'type': 'string'}}
+    if min_items:
+        schema['minItems'] = min_items
+    return schema
+
+def _schema_obj(properties, required=None):
+    return {'type': 'object', 'properties': properties, 'required': list(properties) if required is None else required}
+
+JSON_SCHEMA_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+}
 
+def validate_json_schema(data, schema, path='$'):
+    """스키마 검사 (type/properties/required/items/minItems만 지원) → 오류 목록 (비어 있으면 통과)"""
+    expected = schema.get('type')
+    if expected:
+        types = expected if isinstance(expected, list) else [expected]
+        if not any(isinstance(data, JSON_SCHEMA_TYPES[t]) and not (t in ('integer', 'number') and isinstance(data, bool)) for t in types):
+            return [f"{path}: {'/'.join(types)} 필요 ({type(data).__name__})"]
+    errors = []
+    if isinstance(data, dict):
+        for key in schema.get('required', []):
+            if key not in data:
+                errors.append(f"{path}.{key}: 누락")
+        for key, sub_schema in schema.get('properties', {}).items():
+            if key in data:
+                errors.extend(validate_json_schema(data[key], sub_schema, f"{path}.{key}"))
+    elif isinstance(data, list):
+        if len(data) < schema.get('minItems', 0):
+            errors.append(f"{path}: 최소 {schema['minItems']}개 필요 ({len(data)}개)")
+        if 'items' in schema:
+            for i, item in enumerate(data):
+                errors.extend(validate_json_schema(item, schema['items'], f"{path}[{i}]"))
+    return errors
+
+def load_structured(text, schema):
+    """도구 응답 문자열 → (dict, 오류 목록)"""
+    if not text:
+        return None, ["응답 없음"]
     try:
-        client = anthropic.Anthropic(api_key=api_key)
-        message = client.messages.create(
-            model=model,
-            max_tokens=8000,
-            temperature=temp,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return message.content[0].text
-    except anthropic.AuthenticationError:
-        st.error("API 키가 유효하지 않습니다. Claude API 키를 확인해주세요.")
-        return None
-    except anthropic.RateLimitError:
-        st.error("API 할당량이 초과되었습니다. 잠시 후 다시 시도해주세요.")
-        return None
-    except anthropic.BadRequestError as e:
-        st.error(f"요청 오류: {str(e)[:100]}")
+        data = json.loads(text)
+    except ValueError:
+        data = parse_json(text)  # 도구 대신 글로 답한 경우
+        if data is None:
+            return None, ["JSON 아님"]
+    errors = validate_json_schema(data, schema)
+    return (data, errors) if not errors else (None, errors)
+
+def ask_ai_json(prompt, schema, name, description, temp=0.7, cache_kind='analysis'):
+    """스키마를 도구로 넘겨 구조화된 JSON(dict)을 받는다
+
+    응답은 스키마로 검사하고, 통과한 응답만 캐시한다. 검사에 실패하면
+    사이드바에서 고른 모델로 형식만 고치는 요청을 한 번 보내고, 그래도 안 되면 None.
+    """
+    tool = {'name': name, 'description': description, 'input_schema': schema}
+    text = ask_ai(prompt, temp, cache_kind=cache_kind, tool=tool,
+                  cache_check=lambda t: not load_structured(t, schema)[1])
+    if not text:
         return None
-    except Exception as e:
-        st.error(f"AI 오류: {str(e)[:100]}")
+    data, errors = load_structured(text, schema)
+    if not errors:
+        return data
+
+    # 형식 오류만 짚어서 수정 (같은 내용을 처음부터 다시 만들지 않음)
+    error_lines = "\n".join(f"- {e}" for e in errors[:10])
+    repair_prompt = f"""아래 응답이 {name} 형식에 맞지 않습니다.
+내용은 그대로 두고 오류 항목만 고쳐서 {name} 도구로 다시 제출하세요.
+빠진 항목은 응답 내용에 맞게 짧게 채우세요.
+
+[오류]
+{error_lines}
+
+[응답]
+{text[:JSON_REPAIR_MAX_CHARS]}"""
+    fixed = ask_ai(repair_prompt, 0.0, cache_kind='content', tool=tool)
+    data, errors = load_structured(fixed, schema)
+    if errors:
+        report_message(f"응답 형식 오류: {errors[0][:80]}", 'warning')
         return None
+    return data
+
+# 분석 함수별 응답 스키마
+TARGETS_SCHEMA = _schema_obj({
+    'personas': _schema_list(_schema_obj({
+        'name': _schema_str("타겟 이름 (구체적으로)"),
+        'demographics': _schema_str("연령대, 직업"),
+        'needs': _schema_str("이 타겟이 이 책을 사는 이유"),
+        'pain_points': _schema_list(),
+    }), min_items=1),
+})
+
+PAINS_SCHEMA = _schema_obj({
+    'surface_pains': _schema_obj({'pains': _schema_list(min_items=1), 'description': _schema_str()}),
+    'hidden_pains': _schema_obj({'pains': _schema_list(min_items=1), 'description': _schema_str()}),
+    'emotional_pains': _schema_obj({'pains': _schema_list(), 'description': _schema_str()}),
+    'failed_attempts': _schema_obj({'attempts': _schema_list(), 'why_failed': _schema_str()}),
+    'dream_outcome': _schema_obj({'ideal_result': _schema_str(), 'timeline': _schema_str(), 'what_changes': _schema_str()}),
+    'buying_triggers': _schema_obj({'triggers': _schema_list(), 'objections': _schema_list()}),
+    'marketing_hook': _schema_str("마케팅 훅 한 문장"),
+})
+
+REVIEWS_SCHEMA = _schema_obj({
+    'analysis_scope': _schema_obj({
+        'books_analyzed': _schema_str(),
+        'reviews_analyzed': _schema_str(),
+        'negative_reviews': _schema_str(),
+        'platforms': _schema_list(),
+    }),
+    'negative_patterns': _schema_list(_schema_obj({
+        'pattern': _schema_str(),
+        'frequency': _schema_str(),
+        'example_reviews': _schema_list(),
+        'reader_emotion': _schema_str(),
+        'hidden_need': _schema_str(),
+        'solution': _schema_str(),
+    }), min_items=1),
+    'hidden_needs_summary': _schema_obj({'needs': _schema_list(), 'insight': _schema_str()}),
+    'concept_suggestions': _schema_list(_schema_obj({
+        'concept': _schema_str(),
+        'why_works': _schema_str(),
+        'unique_point': _schema_str(),
+    }), min_items=1),
+    'success_formula': _schema_obj({
+        'must_have': _schema_list(),
+        'must_avoid': _schema_list(),
+        'differentiation': _schema_str(),
+    }),
+})
+
+TITLES_SCHEMA = _schema_obj({
+    'titles': _schema_list(_schema_obj({
+        'title': _schema_str("제목 (1~3단어)"),
+        'subtitle': _schema_str("부제 (15자 이내)"),
+        'concept': _schema_str("컨셉 한줄"),
+    }), min_items=1),
+})
+
+KNOWLEDGE_SUMMARY_SCHEMA = _schema_obj({
+    'integrated_summary': _schema_str("전체 학습 내용 통합 요약 5문장"),
+    'core_insights': _schema_list(min_items=1),
+    'action_plan': _schema_list(),
+    'ebook_structure': _schema_list(),
+    'unique_angle': _schema_str(),
+    'study_plan': _schema_obj({'week1': _schema_str(), 'week2': _schema_str(), 'week3': _schema_str(), 'week4': _schema_str()}),
+    'expert_tips': _schema_list(),
+})
+
+REFERENCES_SCHEMA = _schema_obj({
+    'recommendations': _schema_list(_schema_obj({
+        'title': _schema_str("자료 제목"),
+        'author': _schema_str("저자/출처"),
+        'core_message': _schema_str("핵심 메시지 (10문장 이상)"),
+        'chapters': _schema_list(_schema_obj({'name': _schema_str(), 'summary': _schema_str()})),
+        'key_arguments': _schema_list(),
+        'real_examples': _schema_list(),
+        'key_insights': _schema_list(),
+        'application': _schema_str(),
+    }, required=['title', 'author', 'core_message', 'chapters']), min_items=1),
+})
 
 def generate_cover_image_gemini(title, subtitle, theme_keywords):
     """Google Gemini로 표지 배경 이미지 생성"""
@@ -1769,186 +2687,88 @@ JSON 형식으로 응답:
         st.error(f"분석 오류: {str(e)[:150]}")
         return None
 
+def get_book():
+    """현재 세션 목차의 Book 모델 (목차 구조가 바뀌었을 때만 새로 만든다)"""
+    outline = st.session_state.get('outline', [])
+    chapters = st.session_state.setdefault('chapters', {})
+    book = st.session_state.get('book')
+    if book is None or book.signature != Book.make_signature(outline, chapters):
+        book = Book(outline, chapters)
+        st.session_state['book'] = book
+    return book
+
+def get_cleaned_content(subtopic):
+    """clean_content를 거친 본문 (본문이 바뀐 뒤 처음 읽을 때 한 번만 정리해 subtopic_data에 보관)"""
+    cleaned = subtopic.data.get('cleaned')
+    if cleaned is None:
+        cleaned = subtopic.data['cleaned'] = clean_content(subtopic.content)
+    return cleaned
+
+def iter_chapter_chunks(book, heading, tail=""):
+    """본문이 있는 챕터마다 heading(챕터 제목) → 【소제목】 + 정리된 본문 → tail 조각을 차례로 내보낸다"""
+    for chapter in book.chapters:
+        written = chapter.written()
+        if not written:
+            continue
+        yield heading(chapter.title)
+        for sub in written:
+            yield f"\n\n【{sub.title}】\n\n"
+            yield get_cleaned_content(sub)
+        if tail:
+            yield tail
+
+def write_chunks(chunks, out=None):
+    """문자열 조각을 out(열린 텍스트 파일 등)에 차례로 쓴다 - out이 없으면 StringIO에 모아 문자열 반환"""
+    if out is not None:
+        for chunk in chunks:
+            out.write(chunk)
+        return None
+    buffer = io.StringIO()
+    write_chunks(chunks, buffer)
+    return buffer.getvalue()
+
 def get_full_content():
-    full = ""
-    for ch in st.session_state.get('outline', []):
-        if ch in st.session_state.get('chapters', {}):
-            ch_data = st.session_state['chapters'][ch]
-            ch_content = ""
-            for s in ch_data.get('subtopics', []):
-                c = ch_data.get('subtopic_data', {}).get(s, {}).get('content', '')
-                if c:
-                    ch_content += f"\n\n【{s}】\n\n{clean_content(c)}"
-            if ch_content:
-                full += f"\n\n{'='*50}\n{ch}\n{'='*50}{ch_content}"
-    return full.strip()
-
-def create_ebook_docx(title, subtitle, author, chapters_data, outline, interview_data=None):
-    """베스트셀러 스타일의 전문적인 워드 문서 생성"""
-    if not DOCX_AVAILABLE:
-        return None, "python-docx 패키지가 필요합니다: pip install python-docx"
+    chunks = iter_chapter_chunks(get_book(), lambda title: f"\n\n{'='*50}\n{title}\n{'='*50}")
+    return write_chunks(chunks).strip()
 
-    try:
-        doc = Document()
-
-        # 페이지 설정 (A5 크기 - 전자책에 적합)
-        section = doc.sections[0]
-        section.page_width = Cm(14.8)
-        section.page_height = Cm(21)
-        section.left_margin = Cm(2.2)
-        section.right_margin = Cm(2.2)
-        section.top_margin = Cm(2.5)
-        section.bottom_margin = Cm(2.5)
-
-        def set_font(run, size, bold=False, color=None, italic=False):
-            run.font.size = Pt(size)
-            run.font.name = 'Malgun Gothic'
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), '맑은 고딕')
-            run.bold = bold
-            run.italic = italic
-            if color:
-                run.font.color.rgb = RGBColor(*color)
-
-        def add_bookmark(paragraph, bookmark_name):
-            """문단에 북마크 추가"""
-            # 북마크 이름에서 특수문자 제거 (Word 북마크 규칙)
-            clean_name = re.sub(r'[^\w가-힣]', '_', bookmark_name)[:40]
-
-            bookmark_start = OxmlElement('w:bookmarkStart')
-            bookmark_start.set(qn('w:id'), str(hash(clean_name) % 10000))
-            bookmark_start.set(qn('w:name'), clean_name)
-
-            bookmark_end = OxmlElement('w:bookmarkEnd')
-            bookmark_end.set(qn('w:id'), str(hash(clean_name) % 10000))
-
-            paragraph._p.insert(0, bookmark_start)
-            paragraph._p.append(bookmark_end)
-            return clean_name
-
-        def add_hyperlink(paragraph, text, bookmark_name, font_size=10, bold=False, color=(70, 70, 70)):
-            """북마크로 연결되는 하이퍼링크 추가"""
-            # 북마크 이름 정리
-            clean_name = re.sub(r'[^\w가-힣]', '_', bookmark_name)[:40]
-
-            # 하이퍼링크 요소 생성
-            hyperlink = OxmlElement('w:hyperlink')
-            hyperlink.set(qn('w:anchor'), clean_name)
-
-            # 텍스트 실행 요소
-            new_run = OxmlElement('w:r')
-            rPr = OxmlElement('w:rPr')
-
-            # 폰트 설정
-            rFonts = OxmlElement('w:rFonts')
-            rFonts.set(qn('w:ascii'), 'Malgun Gothic')
-            rFonts.set(qn('w:eastAsia'), '맑은 고딕')
-            rFonts.set(qn('w:hAnsi'), 'Malgun Gothic')
-            rPr.append(rFonts)
-
-            # 폰트 크기
-            sz = OxmlElement('w:sz')
-            sz.set(qn('w:val'), str(font_size * 2))
-            rPr.append(sz)
-            szCs = OxmlElement('w:szCs')
-            szCs.set(qn('w:val'), str(font_size * 2))
-            rPr.append(szCs)
-
-            # 볼드
-            if bold:
-                b = OxmlElement('w:b')
-                rPr.append(b)
-
-            # 색상
-            if color:
-                c = OxmlElement('w:color')
-                c.set(qn('w:val'), '{:02X}{:02X}{:02X}'.format(*color))
-                rPr.append(c)
-
-            new_run.append(rPr)
-
-            # 텍스트
-            text_elem = OxmlElement('w:t')
-            text_elem.text = text
-            new_run.append(text_elem)
-
-            hyperlink.append(new_run)
-            paragraph._p.append(hyperlink)
-
-            return hyperlink
-
-        # ══════════════════════════════════════════════════════════════
-        # 표지 페이지 (미니멀 고급 스타일)
-        # ══════════════════════════════════════════════════════════════
-        for _ in range(8):
-            doc.add_paragraph()
-
-        # 메인 타이틀
-        title_para = doc.add_paragraph()
-        title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        title_run = title_para.add_run(title)
-        set_font(title_run, 28, bold=True)
-        title_para.paragraph_format.space_after = Pt(16)
-
-        # 부제
-        if subtitle:
-            subtitle_para = doc.add_paragraph()
-            subtitle_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            sub_run = subtitle_para.add_run(subtitle)
-            set_font(sub_run, 12, color=(80, 80, 80))
-            subtitle_para.paragraph_format.space_before = Pt(8)
-
-        # 저자명
-        for _ in range(10):
-            doc.add_paragraph()
-        author_para = doc.add_paragraph()
-        author_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        author_run = author_para.add_run(author if author else "저자")
-        set_font(author_run, 13)
-
-        doc.add_page_break()
-
-        # ══════════════════════════════════════════════════════════════
-        # 판권 페이지
-        # ══════════════════════════════════════════════════════════════
-        for _ in range(18):
-            doc.add_paragraph()
-
-        copyright_lines = [
-            f"{title}",
-            "",
-            f"지은이: {author if author else '저자'}",
-            "",
-            "이 책의 저작권은 저자에게 있습니다.",
-            "무단 전재와 복제를 금합니다."
-        ]
+# 책 부속 원고 (프롤로그/에필로그/저자 소개)
+BOOK_ASSET_KEYS = ['prologue', 'epilogue', 'author_bio']
+
+DEFAULT_PROLOGUE = """이 책을 쓰게 된 이유는 단순합니다.
+
+제가 직접 경험하고 배운 것들을 나누고 싶었습니다.
+
+처음에는 저도 막막했습니다. 하지만 포기하지 않았고, 결국 방법을 찾았습니다.
+
+이 책은 단순한 이론서가 아닙니다. 직접 해보고, 실패하고, 다시 일어나며 터득한 실전 노하우입니다.
+
+당신도 할 수 있습니다.
+
+자, 이제 시작합니다."""
+
+DEFAULT_EPILOGUE = """여기까지 읽어주셔서 감사합니다.
+
+이 책에 담긴 내용이 당신의 삶에 작은 변화라도 만들어낸다면 그것으로 충분합니다.
+
+완벽할 필요 없습니다. 지금 당장 할 수 있는 것 하나만 시작해보세요.
+
+작은 시작이 큰 결과를 만듭니다.
+
+항상 응원합니다."""
 
-        for line in copyright_lines:
-            cp_para = doc.add_paragraph()
-            cp_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            if line:
-                cp_run = cp_para.add_run(line)
-                set_font(cp_run, 9, color=(120, 120, 120))
-            cp_para.paragraph_format.space_after = Pt(2)
-
-        doc.add_page_break()
-
-        # ══════════════════════════════════════════════════════════════
-        # 프롤로그 (미니멀 스타일)
-        # ══════════════════════════════════════════════════════════════
-        for _ in range(4):
-            doc.add_paragraph()
-
-        # 프롤로그 제목
-        prologue_title = doc.add_paragraph()
-        prologue_title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        pt_run = prologue_title.add_run("Prologue")
-        set_font(pt_run, 14, bold=True)
-        prologue_title.paragraph_format.space_after = Pt(30)
-
-        # 프롤로그 내용 - AI가 인터뷰 내용을 참고해서 자연스럽게 작성
-        prologue_text = None
-        if interview_data:
-            prologue_prompt = f"""당신은 자청 스타일로 글을 쓰는 베스트셀러 작가입니다. 프롤로그를 작성하세요.
+DEFAULT_AUTHOR_BIO = """실전에서 직접 부딪히며 쌓은 노하우를 독자들과 나누고자 이 책을 썼다."""
+
+def iter_txt_chunks(book, title, subtitle, assets):
+    """TXT 내보내기/미리보기 원고 조각 (제목 → 프롤로그 → 챕터 본문 → 마치며 → 저자 소개)"""
+    yield f"{title}\n{subtitle}\n\n{'='*50}\n\n"
+    yield f"Prologue\n{'-'*40}\n\n{assets.get('prologue') or DEFAULT_PROLOGUE}\n"
+    yield from iter_chapter_chunks(book, lambda ch_title: f"\n\n{ch_title}\n{'-'*40}", tail="\n")
+    yield f"\n\n마치며\n{'-'*40}\n\n{assets.get('epilogue') or DEFAULT_EPILOGUE}\n"
+    yield f"\n\nABOUT\n{'-'*40}\n\n{assets.get('author_bio') or DEFAULT_AUTHOR_BIO}\n"
+
+def build_prologue_prompt(interview_data):
+    """프롤로그 작성 프롬프트"""
+    return f"""당신은 자청 스타일로 글을 쓰는 베스트셀러 작가입니다. 프롤로그를 작성하세요.
 
 [저자 정보 - 참고용, 그대로 복사하지 말 것]
 - 분야: {interview_data.get('field', '')}
@@ -1978,591 +2798,9 @@ def create_ebook_docx(title, subtitle, author, chapters_data, outline, interview
 
 프롤로그만 출력하세요."""
 
-            generated_prologue = ask_ai(prologue_prompt, 0.7)
-            if generated_prologue:
-                prologue_text = generated_prologue
-
-        if not prologue_text:
-            prologue_text = """이 책을 쓰게 된 이유는 단순합니다.
-
-제가 직접 경험하고 배운 것들을 나누고 싶었습니다.
-
-처음에는 저도 막막했습니다. 하지만 포기하지 않았고, 결국 방법을 찾았습니다.
-
-이 책은 단순한 이론서가 아닙니다. 직접 해보고, 실패하고, 다시 일어나며 터득한 실전 노하우입니다.
-
-당신도 할 수 있습니다.
-
-자, 이제 시작합니다."""
-
-        # **프롤로그** 같은 마크다운 제목 제거
-        prologue_text = prologue_text.replace('**프롤로그**', '').replace('**Prologue**', '').strip()
-
-        for para_text in prologue_text.split('\n\n'):
-            if para_text.strip():
-                para = doc.add_paragraph()
-                para.alignment = WD_ALIGN_PARAGRAPH.LEFT  # 왼쪽 정렬 (본문과 동일)
-                para_run = para.add_run(para_text.strip())
-                set_font(para_run, 10)
-                para_format = para.paragraph_format
-                para_format.line_spacing = 1.6
-                # 문단 사이 간격 (한 줄 띄우기 효과)
-                para_format.space_after = Pt(14)
-
-        doc.add_page_break()
-
-        # ══════════════════════════════════════════════════════════════
-        # 목차 (프리미엄 미니멀 디자인)
-        # ══════════════════════════════════════════════════════════════
-
-        # 상단 여백
-        for _ in range(4):
-            doc.add_paragraph()
-
-        # 목차 제목 (미니멀 타이포그래피)
-        toc_title = doc.add_paragraph()
-        toc_title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        toc_run = toc_title.add_run("CONTENTS")
-        set_font(toc_run, 16, bold=False, color=(40, 40, 40))
-        toc_title.paragraph_format.space_after = Pt(60)
-
-        for idx, chapter in enumerate(outline):
-            # 챕터 제목 정리 (PART X. 등 접두사 제거)
-            clean_chapter = chapter
-            for prefix in [f"PART {idx + 1}.", f"PART{idx + 1}.", f"PART {idx + 1} ", f"PART{idx + 1} ", f"{idx + 1}.", f"{idx + 1})"]:
-                clean_chapter = clean_chapter.replace(prefix, "").strip()
-
-            # ─────────────────────────────────────
-            # 챕터 번호 (큰 숫자)
-            # ─────────────────────────────────────
-            ch_num_para = doc.add_paragraph()
-            ch_num_para.paragraph_format.space_before = Pt(28)
-            ch_num_para.paragraph_format.space_after = Pt(4)
-            ch_num_run = ch_num_para.add_run(f"{idx + 1:02d}")
-            set_font(ch_num_run, 24, bold=False, color=(200, 200, 200))
-
-            # ─────────────────────────────────────
-            # 챕터 제목 (하이퍼링크)
-            # ─────────────────────────────────────
-            ch_title_para = doc.add_paragraph()
-            ch_title_para.paragraph_format.space_after = Pt(14)
-            chapter_bookmark_name = f"chapter_{idx + 1}"
-            add_hyperlink(ch_title_para, clean_chapter, chapter_bookmark_name, font_size=12, bold=True, color=(30, 30, 30))
-
-            # ─────────────────────────────────────
-            # 소제목들 (심플한 리스트)
-            # ─────────────────────────────────────
-            if chapter in chapters_data:
-                ch_data = chapters_data[chapter]
-                subtopics = ch_data.get('subtopics', [])
-
-                for sub_idx, sub in enumerate(subtopics):
-                    toc_sub = doc.add_paragraph()
-                    toc_sub.paragraph_format.left_indent = Cm(0.3)
-                    toc_sub.paragraph_format.space_after = Pt(6)
-
-                    # 작은 점 불릿
-                    bullet_run = toc_sub.add_run("·  ")
-                    set_font(bullet_run, 10, color=(180, 180, 180))
-
-                    # 소제목 텍스트 (하이퍼링크로 연결)
-                    subtopic_bookmark_name = f"subtopic_{idx + 1}_{sub_idx + 1}"
-                    add_hyperlink(toc_sub, sub, subtopic_bookmark_name, font_size=10, bold=False, color=(80, 80, 80))
-
-        # 하단 여백
-        for _ in range(3):
-            doc.add_paragraph()
-
-        doc.add_page_break()
-
-        # ══════════════════════════════════════════════════════════════
-        # 본문 (프리미엄 에디토리얼 스타일)
-        # ══════════════════════════════════════════════════════════════
-
-        def add_horizontal_line(doc, width_cm=3, color=(220, 220, 220)):
-            """가로 구분선 추가"""
-            line_para = doc.add_paragraph()
-            line_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            line_run = line_para.add_run("─" * 12)
-            set_font(line_run, 10, color=color)
-            line_para.paragraph_format.space_before = Pt(20)
-            line_para.paragraph_format.space_after = Pt(20)
-            return line_para
-
-        def add_chapter_opener(doc, idx, chapter_title):
-            """챕터 시작 페이지 - 프리미엄 에디토리얼 스타일"""
-            # 상단 넓은 여백 (페이지 중앙 정도에 위치)
-            for _ in range(7):
-                doc.add_paragraph()
-
-            # PART 라벨 (작은 대문자)
-            part_label = doc.add_paragraph()
-            part_label.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            part_run = part_label.add_run(f"P A R T")
-            set_font(part_run, 9, color=(160, 160, 160))
-            part_label.paragraph_format.space_after = Pt(8)
-
-            # 챕터 번호 (매우 큰 숫자)
-            ch_num_para = doc.add_paragraph()
-            ch_num_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            ch_num_run = ch_num_para.add_run(f"{idx + 1}")
-            set_font(ch_num_run, 48, bold=False, color=(40, 40, 40))
-            ch_num_para.paragraph_format.space_after = Pt(16)
-
-            # 구분선
-            line_para = doc.add_paragraph()
-            line_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            line_run = line_para.add_run("───────────")
-            set_font(line_run, 10, color=(200, 200, 200))
-            line_para.paragraph_format.space_after = Pt(20)
-
-            # 챕터 제목
-            ch_name = doc.add_paragraph()
-            ch_name.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            chn_run = ch_name.add_run(chapter_title)
-            set_font(chn_run, 14, bold=True, color=(30, 30, 30))
-            ch_name.paragraph_format.space_after = Pt(60)
-
-            return ch_name
-
-        def add_subtopic_header(doc, subtopic_text, sub_idx):
-            """소제목 - 베스트셀러 스타일"""
-            # 소제목 전 넓은 여백 (시각적 구분)
-            spacer = doc.add_paragraph()
-            spacer.paragraph_format.space_after = Pt(40)
-
-            # 상단 미니멀 구분선
-            line_para = doc.add_paragraph()
-            line_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            line_run = line_para.add_run("──")
-            set_font(line_run, 10, color=(200, 200, 200))
-            line_para.paragraph_format.space_after = Pt(12)
-
-            # 소제목 텍스트 (대담하고 명확하게)
-            sub_title = doc.add_paragraph()
-            sub_run = sub_title.add_run(subtopic_text)
-            set_font(sub_run, 13, bold=True, color=(25, 25, 25))
-            sub_title.paragraph_format.space_after = Pt(24)
-
-            return sub_title
-
-        def format_body_paragraph(doc, text, is_first=False):
-            """본문 문단 - 베스트셀러 가독성 스타일"""
-            para = doc.add_paragraph()
-            para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-
-            if is_first and len(text) > 0:
-                # 첫 문단 첫 글자 드롭캡 (세련된 버전)
-                first_char = text[0]
-                rest_text = text[1:]
-
-                first_run = para.add_run(first_char)
-                set_font(first_run, 18, bold=True, color=(40, 40, 40))
-
-                rest_run = para.add_run(rest_text)
-                set_font(rest_run, 10.5, color=(45, 45, 45))
-            else:
-                p_run = para.add_run(text)
-                set_font(p_run, 10.5, color=(45, 45, 45))
-
-            para_format = para.paragraph_format
-            para_format.line_spacing = 1.85  # 베스트셀러 표준 줄간격
-            para_format.space_after = Pt(14)
-            para_format.first_line_indent = Cm(0.6)  # 들여쓰기
-
-            return para
-
-        def is_table_text(text):
-            """텍스트가 표 형식인지 감지"""
-            lines = text.strip().split('\n')
-            if len(lines) < 2:
-                return False
-
-            # 마크다운 테이블 감지: | 로 시작하고 | 로 끝남
-            pipe_lines = sum(1 for line in lines if line.strip().startswith('|') and line.strip().endswith('|'))
-            if pipe_lines >= 2:
-                return True
-
-            # 파이프로 구분된 테이블 (| 가 있지만 시작/끝이 아닐 수 있음)
-            pipe_content_lines = sum(1 for line in lines if '|' in line and len(line.split('|')) >= 2)
-            if pipe_content_lines >= 2:
-                return True
-
-            # 탭 구분 테이블
-            tab_lines = sum(1 for line in lines if '\t' in line)
-            if tab_lines >= 2:
-                return True
-
-            # 콜론 기반 비교 테이블 감지 (Before: xxx / After: xxx)
-            colon_lines = sum(1 for line in lines
-                            if ':' in line
-                            and not line.strip().startswith('http')
-                            and len(line.split(':')[0]) < 30)
-            if colon_lines >= 2 and colon_lines >= len(lines) * 0.6:
-                return True
-
-            return False
-
-        def parse_table_data(text):
-            """표 텍스트를 파싱하여 2D 배열로 변환"""
-            lines = text.strip().split('\n')
-            table_data = []
-
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # 순수 구분선만 스킵 (실제 내용이 없는 라인)
-                # 마크다운 구분선: |---|---| 또는 |:---:|:---:|
-                if re.match(r'^\|[\s\-:]+\|$', line):
-                    continue
-                # 박스 그리기 문자만 있는 라인
-                if re.match(r'^[─━┌┬┐├┼┤└┴┘│┃]+$', line):
-                    continue
-                # 하이픈만 있는 라인 (--- 또는 - - -)
-                if re.match(r'^[\s\-]+$', line) and len(line.replace(' ', '').replace('-', '')) == 0:
-                    continue
-
-                # 마크다운 테이블 파싱 (| cell | cell |)
-                if line.startswith('|') and line.endswith('|'):
-                    cells = [cell.strip() for cell in line.split('|')]
-                    cells = [c for c in cells if c]  # 빈 셀 제거
-                    if cells:
-                        table_data.append(cells)
-                # 일반 파이프 구분 (cell | cell)
-                elif '|' in line and not line.startswith('|'):
-                    cells = [cell.strip() for cell in line.split('|')]
-                    cells = [c for c in cells if c]
-                    if cells:
-                        table_data.append(cells)
-                # 탭 구분 테이블
-                elif '\t' in line:
-                    cells = [cell.strip() for cell in line.split('\t')]
-                    cells = [c for c in cells if c]
-                    if len(cells) >= 2:
-                        table_data.append(cells)
-                # 콜론 기반 파싱 (Before: xxx) - 단, URL이 아닌 경우
-                elif ':' in line and not line.startswith('http'):
-                    # 첫 번째 콜론으로만 분리
-                    parts = line.split(':', 1)
-                    if len(parts) == 2 and len(parts[0]) < 30:  # 키가 너무 길면 제외
-                        table_data.append([parts[0].strip(), parts[1].strip()])
-
-            return table_data
-
-        def add_premium_table(doc, table_data):
-            """프리미엄 베스트셀러 스타일 테이블 - 고급스럽고 세련된 디자인"""
-            if not table_data or len(table_data) < 1:
-                return None
-
-            rows = len(table_data)
-            cols = max(len(row) for row in table_data)
-
-            # 테이블 생성
-            table = doc.add_table(rows=rows, cols=cols)
-            table.alignment = WD_TABLE_ALIGNMENT.CENTER
-
-            # 테이블 전체 너비 설정
-            table.autofit = False
-            
-            # 열 너비 계산 (전체 너비 14cm 기준)
-            total_width = 14
-            if cols == 2:
-                col_widths = [Cm(4.5), Cm(9.5)]  # 첫 열 좁게
-            elif cols == 3:
-                col_widths = [Cm(3.5), Cm(5.25), Cm(5.25)]
-            elif cols == 4:
-                col_widths = [Cm(3), Cm(3.7), Cm(3.7), Cm(3.6)]
-            else:
-                col_widths = [Cm(total_width / cols)] * cols
-
-            for col_idx in range(cols):
-                for row in table.rows:
-                    if col_idx < len(row.cells):
-                        row.cells[col_idx].width = col_widths[col_idx] if col_idx < len(col_widths) else Cm(3)
-
-            # 각 셀 스타일링
-            for i, row_data in enumerate(table_data):
-                row = table.rows[i]
-                row.height = Cm(1.2)  # 넉넉한 행 높이
-
-                for j, cell_text in enumerate(row_data):
-                    if j < cols:
-                        cell = row.cells[j]
-                        cell.text = ''
-
-                        para = cell.paragraphs[0]
-
-                        # 첫 번째 행(헤더) - 검정 배경 + 골드 포인트
-                        if i == 0:
-                            para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                            run = para.add_run(str(cell_text))
-                            set_font(run, 10, bold=True, color=(255, 255, 255))
-                            # 헤더 배경색 (세련된 검정)
-                            shading = OxmlElement('w:shd')
-                            shading.set(qn('w:fill'), '1A1A1A')
-                            cell._tc.get_or_add_tcPr().append(shading)
-
-                        # 첫 번째 열 (라벨/항목)
-                        elif j == 0:
-                            para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                            run = para.add_run(str(cell_text))
-                            set_font(run, 10, bold=True, color=(30, 30, 30))
-                            # 연한 베이지/그레이 배경
-                            shading = OxmlElement('w:shd')
-                            shading.set(qn('w:fill'), 'F5F5F0')
-                            cell._tc.get_or_add_tcPr().append(shading)
-
-                        # 일반 내용 셀
-                        else:
-                            para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-                            para.paragraph_format.left_indent = Pt(10)
-                            run = para.add_run(str(cell_text))
-                            set_font(run, 10, color=(50, 50, 50))
-                            # 흰색 배경 (깔끔하게)
-                            shading = OxmlElement('w:shd')
-                            shading.set(qn('w:fill'), 'FFFFFF')
-                            cell._tc.get_or_add_tcPr().append(shading)
-
-                        # 셀 여백 설정 (넉넉하게)
-                        tc = cell._tc
-                        tcPr = tc.get_or_add_tcPr()
-                        tcMar = OxmlElement('w:tcMar')
-                        for margin_name, margin_val in [('top', '120'), ('left', '150'), ('bottom', '120'), ('right', '150')]:
-                            margin = OxmlElement(f'w:{margin_name}')
-                            margin.set(qn('w:w'), margin_val)
-                            margin.set(qn('w:type'), 'dxa')
-                            tcMar.append(margin)
-                        tcPr.append(tcMar)
-
-                        # 셀 수직 정렬 (가운데)
-                        vAlign = OxmlElement('w:vAlign')
-                        vAlign.set(qn('w:val'), 'center')
-                        tcPr.append(vAlign)
-
-            # 테이블 테두리 스타일 (미니멀하고 세련되게)
-            tbl = table._tbl
-            tblPr = tbl.tblPr if tbl.tblPr is not None else OxmlElement('w:tblPr')
-            tblBorders = OxmlElement('w:tblBorders')
-
-            # 상단/하단 - 진한 선
-            for border_name in ['top', 'bottom']:
-                border = OxmlElement(f'w:{border_name}')
-                border.set(qn('w:val'), 'single')
-                border.set(qn('w:sz'), '12')  # 굵은 선
-                border.set(qn('w:color'), '1A1A1A')
-                tblBorders.append(border)
-
-            # 좌우 테두리 없음 (모던한 느낌)
-            for border_name in ['left', 'right']:
-                border = OxmlElement(f'w:{border_name}')
-                border.set(qn('w:val'), 'nil')
-                tblBorders.append(border)
-
-            # 내부 가로선 - 얇고 연하게
-            for border_name in ['insideH']:
-                border = OxmlElement(f'w:{border_name}')
-                border.set(qn('w:val'), 'single')
-                border.set(qn('w:sz'), '4')
-                border.set(qn('w:color'), 'D0D0D0')
-                tblBorders.append(border)
-
-            # 내부 세로선 - 없음 (깔끔하게)
-            for border_name in ['insideV']:
-                border = OxmlElement(f'w:{border_name}')
-                border.set(qn('w:val'), 'nil')
-                tblBorders.append(border)
-
-            tblPr.append(tblBorders)
-
-            # 테이블 전후 여백
-            spacer = doc.add_paragraph()
-            spacer.paragraph_format.space_after = Pt(20)
-
-            return table
-
-        def process_content_with_tables(doc, text):
-            """본문 텍스트에서 표를 감지하고 처리"""
-            blocks = []
-            current_block = []
-            table_lines = []
-
-            lines = text.split('\n')
-            i = 0
-
-            def is_table_start(line, next_line=None):
-                """표 시작 라인인지 확인"""
-                stripped = line.strip()
-                # 마크다운 테이블 (| cell | cell |)
-                if stripped.startswith('|') and stripped.endswith('|') and stripped.count('|') >= 2:
-                    return True
-                # 파이프로 구분된 내용 (cell | cell)
-                if '|' in stripped and len(stripped.split('|')) >= 2:
-                    parts = stripped.split('|')
-                    if any(p.strip() and not re.match(r'^[\s\-:]+$', p) for p in parts):
-                        return True
-                # 콜론 기반 테이블 (키: 값) - 연속된 경우
-                if next_line and ':' in stripped and ':' in next_line:
-                    if len(stripped.split(':')[0].strip()) < 30 and len(next_line.split(':')[0].strip()) < 30:
-                        return True
-                return False
-
-            def is_table_continue(line):
-                """표 계속 라인인지 확인"""
-                stripped = line.strip()
-                # 빈 줄은 표 종료
-                if not stripped:
-                    return False
-                # 마크다운 테이블
-                if stripped.startswith('|') and stripped.endswith('|'):
-                    return True
-                # 마크다운 구분선
-                if re.match(r'^\|[\s\-:]+\|$', stripped):
-                    return True
-                # 파이프로 구분된 내용
-                if '|' in stripped:
-                    return True
-                # 콜론 기반 (키: 값)
-                if ':' in stripped and len(stripped.split(':')[0].strip()) < 30:
-                    return True
-                return False
-
-            while i < len(lines):
-                line = lines[i]
-                next_line = lines[i + 1] if i + 1 < len(lines) else None
-
-                if is_table_start(line, next_line):
-                    # 이전 일반 텍스트 저장
-                    if current_block:
-                        blocks.append(('text', '\n'.join(current_block)))
-                        current_block = []
-
-                    # 표 라인 수집
-                    table_lines = [line]
-                    i += 1
-                    while i < len(lines) and is_table_continue(lines[i]):
-                        table_lines.append(lines[i])
-                        i += 1
-
-                    if len(table_lines) >= 2:
-                        blocks.append(('table', '\n'.join(table_lines)))
-                    else:
-                        current_block.extend(table_lines)
-                    table_lines = []
-                else:
-                    current_block.append(line)
-                    i += 1
-
-            # 마지막 블록 저장
-            if current_block:
-                blocks.append(('text', '\n'.join(current_block)))
-
-            return blocks
-
-        for idx, chapter in enumerate(outline):
-            if chapter in chapters_data:
-                # ─────────────────────────────────────
-                # 챕터 시작 페이지 (프리미엄 오프너)
-                # ─────────────────────────────────────
-                clean_chapter = chapter
-                for prefix in [f"PART {idx + 1}.", f"PART{idx + 1}.", f"PART {idx + 1} ", f"PART{idx + 1} ", f"{idx + 1}.", f"{idx + 1})"]:
-                    clean_chapter = clean_chapter.replace(prefix, "").strip()
-
-                ch_name = add_chapter_opener(doc, idx, clean_chapter)
-                add_bookmark(ch_name, f"chapter_{idx + 1}")
-
-                doc.add_page_break()
-
-                # ─────────────────────────────────────
-                # 본문 시작
-                # ─────────────────────────────────────
-                ch_data = chapters_data[chapter]
-                subtopics = ch_data.get('subtopics', [])
-
-                for sub_idx, sub in enumerate(subtopics):
-                    content = ch_data.get('subtopic_data', {}).get(sub, {}).get('content', '')
-                    if content:
-                        # 소제목마다 새 페이지에서 시작 (첫 번째 제외)
-                        if sub_idx > 0:
-                            doc.add_page_break()
-
-                        # 소제목 (프리미엄 스타일)
-                        sub_title = add_subtopic_header(doc, sub, sub_idx)
-                        add_bookmark(sub_title, f"subtopic_{idx + 1}_{sub_idx + 1}")
-
-                        # 본문 내용 (표 감지 및 처리 포함)
-                        cleaned = clean_content(content)
-
-                        # 표가 포함된 콘텐츠 처리
-                        content_blocks = process_content_with_tables(doc, cleaned)
-
-                        is_first_para = True
-                        for block_type, block_content in content_blocks:
-                            if block_type == 'table':
-                                # 표 데이터 파싱 및 프리미엄 테이블 생성
-                                table_data = parse_table_data(block_content)
-                                if table_data and len(table_data) >= 2:
-                                    # 표 전 여백
-                                    spacer = doc.add_paragraph()
-                                    spacer.paragraph_format.space_after = Pt(10)
-                                    add_premium_table(doc, table_data)
-                                    is_first_para = False
-                            else:
-                                # 일반 텍스트 처리
-                                paragraphs = block_content.split('\n\n')
-                                if not paragraphs or not any(p.strip() for p in paragraphs):
-                                    paragraphs = block_content.split('\n')
-
-                                for para_text in paragraphs:
-                                    if para_text.strip():
-                                        format_body_paragraph(doc, para_text.strip(), is_first=is_first_para)
-                                        is_first_para = False
-
-                        # 소제목 사이 구분 (마지막 소제목 제외)
-                        if sub_idx < len(subtopics) - 1:
-                            separator = doc.add_paragraph()
-                            separator.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                            sep_run = separator.add_run("· · ·")
-                            set_font(sep_run, 10, color=(200, 200, 200))
-                            separator.paragraph_format.space_before = Pt(30)
-                            separator.paragraph_format.space_after = Pt(30)
-
-                doc.add_page_break()
-
-        # ══════════════════════════════════════════════════════════════
-        # 에필로그 (프리미엄 에디토리얼 스타일)
-        # ══════════════════════════════════════════════════════════════
-
-        # 상단 넓은 여백
-        for _ in range(6):
-            doc.add_paragraph()
-
-        # 에필로그 라벨
-        ep_label = doc.add_paragraph()
-        ep_label.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        ep_label_run = ep_label.add_run("E P I L O G U E")
-        set_font(ep_label_run, 9, color=(160, 160, 160))
-        ep_label.paragraph_format.space_after = Pt(16)
-
-        # 구분선
-        ep_line = doc.add_paragraph()
-        ep_line.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        ep_line_run = ep_line.add_run("───────────")
-        set_font(ep_line_run, 10, color=(200, 200, 200))
-        ep_line.paragraph_format.space_after = Pt(20)
-
-        # 에필로그 제목
-        epilogue_title = doc.add_paragraph()
-        epilogue_title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        ep_run = epilogue_title.add_run("마치며")
-        set_font(ep_run, 14, bold=True, color=(40, 40, 40))
-        epilogue_title.paragraph_format.space_after = Pt(40)
-
-        # 에필로그 내용 - AI가 인터뷰 내용을 참고해서 자연스럽게 작성
-        epilogue_text = None
-        if interview_data:
-            epilogue_prompt = f"""당신은 자청 스타일로 글을 쓰는 베스트셀러 작가입니다. 에필로그를 작성하세요.
+def build_epilogue_prompt(interview_data):
+    """에필로그 작성 프롬프트"""
+    return f"""당신은 자청 스타일로 글을 쓰는 베스트셀러 작가입니다. 에필로그를 작성하세요.
 
 [저자 정보 - 참고용, 그대로 복사하지 말 것]
 - 분야: {interview_data.get('field', '')}
@@ -2609,149 +2847,176 @@ def create_ebook_docx(title, subtitle, author, chapters_data, outline, interview
 
 에필로그만 출력하세요."""
 
-            generated_epilogue = ask_ai(epilogue_prompt, 0.7)
-            if generated_epilogue:
-                epilogue_text = generated_epilogue
-
-        if not epilogue_text:
-            epilogue_text = """여기까지 읽어주셔서 감사합니다.
-
-이 책에 담긴 내용이 당신의 삶에 작은 변화라도 만들어낸다면 그것으로 충분합니다.
-
-완벽할 필요 없습니다. 지금 당장 할 수 있는 것 하나만 시작해보세요.
-
-작은 시작이 큰 결과를 만듭니다.
+def build_author_bio(interview_data):
+    """인터뷰 내용으로 저자 소개 작성 (AI 호출 없음)"""
+    if not interview_data:
+        return DEFAULT_AUTHOR_BIO
 
-항상 응원합니다."""
+    career_text = interview_data.get('author_career', '')
+    field = interview_data.get('field', '')
+    exp = interview_data.get('experience_years', '')
+    method = interview_data.get('core_method', '')
 
-        for para_text in epilogue_text.split('\n\n'):
-            if para_text.strip():
-                para = doc.add_paragraph()
-                para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-                para_run = para.add_run(para_text.strip())
-                set_font(para_run, 10, color=(50, 50, 50))
-                para_format = para.paragraph_format
-                para_format.line_spacing = 1.7
-                para_format.space_after = Pt(14)
-                para_format.first_line_indent = Cm(0.5)
-
-        # 저자 서명 (프리미엄 스타일)
-        for _ in range(3):
-            doc.add_paragraph()
-
-        # 서명 라인
-        sign_line = doc.add_paragraph()
-        sign_line.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        sign_line_run = sign_line.add_run("─────")
-        set_font(sign_line_run, 10, color=(200, 200, 200))
-        sign_line.paragraph_format.space_after = Pt(10)
-
-        sign_para = doc.add_paragraph()
-        sign_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        sign_run = sign_para.add_run(f"{author if author else '저자'}")
-        set_font(sign_run, 11, italic=True, color=(80, 80, 80))
-
-        doc.add_page_break()
-
-        # ══════════════════════════════════════════════════════════════
-        # 저자 소개 페이지 (프리미엄 에디토리얼 스타일)
-        # ══════════════════════════════════════════════════════════════
-
-        # 상단 넓은 여백
-        for _ in range(6):
-            doc.add_paragraph()
-
-        # 저자 소개 라벨
-        about_label = doc.add_paragraph()
-        about_label.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        about_label_run = about_label.add_run("A B O U T")
-        set_font(about_label_run, 9, color=(160, 160, 160))
-        about_label.paragraph_format.space_after = Pt(16)
-
-        # 구분선
-        about_line = doc.add_paragraph()
-        about_line.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        about_line_run = about_line.add_run("───────────")
-        set_font(about_line_run, 10, color=(200, 200, 200))
-        about_line.paragraph_format.space_after = Pt(20)
-
-        # 저자명 (크게)
-        author_name_para = doc.add_paragraph()
-        author_name_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        author_name_run = author_name_para.add_run(author if author else "저자")
-        set_font(author_name_run, 16, bold=True, color=(40, 40, 40))
-        author_name_para.paragraph_format.space_after = Pt(30)
-
-        # 저자 소개 내용
-        if interview_data:
-            career_text = interview_data.get('author_career', '')
-            field = interview_data.get('field', '')
-            exp = interview_data.get('experience_years', '')
-            method = interview_data.get('core_method', '')
-
-            if career_text:
-                author_bio = f"""{field} 분야에서 {exp}간 활동해온 실전가.
+    if career_text:
+        return f"""{field} 분야에서 {exp}간 활동해온 실전가.
 
 {career_text}
 
 {method[:100] if method else ''}"""
-            else:
-                author_bio = f"""{field} 분야에서 {exp}간 활동해온 실전가.
+    return f"""{field} 분야에서 {exp}간 활동해온 실전가.
 
 {method}"""
-        else:
-            author_bio = """실전에서 직접 부딪히며 쌓은 노하우를 독자들과 나누고자 이 책을 썼다."""
-
-        for para_text in author_bio.split('\n\n'):
-            if para_text.strip():
-                para = doc.add_paragraph()
-                para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                para_run = para.add_run(para_text.strip())
-                set_font(para_run, 10, color=(80, 80, 80))
-                para_format = para.paragraph_format
-                para_format.line_spacing = 1.6
-                para_format.space_after = Pt(14)
-
-        # 하단 장식
-        for _ in range(4):
-            doc.add_paragraph()
-
-        end_mark = doc.add_paragraph()
-        end_mark.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        end_run = end_mark.add_run("◆")
-        set_font(end_run, 12, color=(200, 200, 200))
-
-        # 메모리에 저장
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer.getvalue(), None
 
-    except Exception as e:
-        return None, f"문서 생성 오류: {str(e)}"
+def get_book_assets():
+    """세션에 저장된 부속 원고 (없는 항목은 빈 문자열)"""
+    assets = st.session_state.get('book_assets') or {}
+    return {k: assets.get(k, '') for k in BOOK_ASSET_KEYS}
+
+def generate_book_assets(interview_data, only_missing=False):
+    """프롤로그/에필로그/저자 소개를 한 번에 병렬 생성해서 book_assets에 저장"""
+    assets = get_book_assets()
+
+    prompts = {}
+    if interview_data:
+        for name, build_prompt in [('prologue', build_prologue_prompt), ('epilogue', build_epilogue_prompt)]:
+            if not (only_missing and assets.get(name)):
+                prompts[name] = build_prompt(interview_data)
+
+    if prompts:
+        with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+            futures = {name: submit_with_ctx(executor, ask_ai, prompt, 0.7, cache_kind='content') for name, prompt in prompts.items()}
+            for name, future in futures.items():
+                text = future.result()
+                if text:
+                    # **프롤로그** 같은 마크다운 제목 제거
+                    for heading in ['**프롤로그**', '**Prologue**', '**에필로그**', '**Epilogue**']:
+                        text = text.replace(heading, '')
+                    assets[name] = text.strip()
+
+    if not (only_missing and assets.get('author_bio')):
+        assets['author_bio'] = build_author_bio(interview_data)
+
+    st.session_state['book_assets'] = assets
+    return assets
+
+IMAGE_DIGEST_CACHE_LIMIT = 256  # 세션별로 기억할 이미지 해시 수 (넘으면 비움)
+
+def image_digest(img):
+    """업로드 이미지(base64) 해시 - 이미지 딕셔너리(프로젝트 데이터)는 건드리지 않고 세션 캐시에 둔다
+
+    캐시는 base64 문자열 객체 id로 찾고, 같은 객체인지 확인한 뒤에만 쓴다
+    (문자열이 바뀌면 새로 계산).
+    """
+    data = img['data']
+    cache = st.session_state.setdefault('image_digests', {})
+    entry = cache.get(id(data))
+    if entry is not None and entry[0] is data:
+        return entry[1]
+    if len(cache) >= IMAGE_DIGEST_CACHE_LIMIT:
+        cache.clear()
+    digest = hashlib.sha1(data.encode('ascii')).hexdigest()[:16]
+    cache[id(data)] = (data, digest)
+    return digest
+
+def get_docx_images(images):
+    """소제목 이미지(base64 문자열 목록)를 워드용으로 (읽을 수 없는 파일은 건너뛴다)"""
+    prepared = (prepare_image(base64.b64decode(data)) for data in images)
+    return tuple(image for image in prepared if image is not None)
+
+def snapshot_docx_chapters(book):
+    """워드로 내보낼 목차/본문 스냅샷 (스크립트 스레드에서 만들어 작업에 넘긴다)
+
+    작업 스레드가 Page 5에서 고치는 중인 책을 직접 읽지 않도록 정리된 본문과
+    이미지 base64 문자열만 담는다. 이미지 변환은 create_ebook_docx에서 한다.
+    """
+    return [
+        DocxChapter(chapter.index, chapter.title, [
+            DocxSubtopic(sub.index, sub.title, get_cleaned_content(sub), tuple(img['data'] for img in sub.images)) if sub.content
+            else DocxSubtopic(sub.index, sub.title, None)
+            for sub in chapter.subtopics
+        ])
+        for chapter in book.chapters
+    ]
 
-def generate_outline_only(interview_data, progress_placeholder):
-    """인터뷰 데이터를 기반으로 목차까지만 생성 (본문 제외)"""
+def get_book_hash(title, subtitle, author, book, assets=None):
+    """워드 캐시용 책 내용 해시 (제목/부제/저자/목차/본문/이미지/부속 원고가 같으면 같은 값)"""
+    payload = {
+        'title': title,
+        'subtitle': subtitle,
+        'author': author,
+        'assets': assets or {},
+        'chapters': [
+            [chapter.title, [[sub.title, sub.content, [image_digest(img) for img in sub.images]] for sub in chapter.subtopics]]
+            for chapter in book.chapters
+        ],
+    }
+    payload = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+DOCX_EXPORT_DIR = Path(tempfile.gettempdir()) / "ebook_app_exports"
+DOCX_EXPORT_MAX_AGE = 24 * 3600  # 이보다 오래된 워드 파일은 새로 만들 때 정리 (초)
+
+def get_docx_export_path():
+    """이 세션의 워드 파일 경로 (다시 만들면 같은 파일을 덮어쓴다)"""
+    export_id = st.session_state.setdefault('docx_export_id', uuid.uuid4().hex)
+    return DOCX_EXPORT_DIR / f"{export_id}.docx"
+
+def prune_docx_exports(keep=None):
+    """끝난 세션이 남긴 오래된 워드 파일 삭제"""
+    if not DOCX_EXPORT_DIR.exists():
+        return
+    cutoff = time.time() - DOCX_EXPORT_MAX_AGE
+    for path in DOCX_EXPORT_DIR.glob("*.docx*"):
+        try:
+            if path != keep and path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+def create_ebook_docx(title, subtitle, author, chapters, assets=None, fragment_cache=None, path=None):
+    """베스트셀러 스타일의 전문적인 워드 문서 생성 (AI 호출 없음, 부속 원고는 assets 사용)
+
+    chapters는 snapshot_docx_chapters의 결과 (작업 스레드에서 실행해도 세션의 책을 읽지 않는다).
+    파일은 path(기본: 이 세션의 내보내기 파일)에 스트리밍으로 쓰고 (경로, None)을 반환한다.
+    fragment_cache(FragmentCache)를 주면 내용이 바뀌지 않은 챕터는 이전에 렌더링한 조각을 재사용한다.
+    """
+    assets = assets or {}
+    if not DOCX_AVAILABLE:
+        return None, "python-docx 패키지가 필요합니다: pip install python-docx"
+
+    path = Path(path or get_docx_export_path())
+    tmp_path = path.with_name(path.name + ".tmp")
     try:
-        topic = interview_data.get('topic', '')
-        if not topic:
-            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        prune_docx_exports(keep=path)
+        chapters = [
+            chapter._replace(subtopics=[sub._replace(images=get_docx_images(sub.images)) for sub in chapter.subtopics])
+            for chapter in chapters
+        ]
+        # 다 쓴 뒤에 바꿔치기 (내려받는 중인 이전 파일이 깨지지 않게)
+        with open(tmp_path, 'wb') as f:
+            write_ebook_docx(
+                f, title, subtitle, author, chapters,
+                prologue=assets.get('prologue') or DEFAULT_PROLOGUE,
+                epilogue=assets.get('epilogue') or DEFAULT_EPILOGUE,
+                author_bio=assets.get('author_bio') or DEFAULT_AUTHOR_BIO,
+                fragment_cache=fragment_cache,
+            )
+        os.replace(tmp_path, path)
+        return str(path), None
 
-        # 1. 타겟 자동 설정
-        progress_placeholder.info("🎯 1/4 타겟 독자 분석 중...")
-        target = f"{interview_data.get('target_reader', '')} - {interview_data.get('target_problem', '')}"
-        st.session_state['target_persona'] = target
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        return None, f"문서 생성 오류: {str(e)}"
 
-        # 2. 책 고유 컨셉 생성 (가장 중요!)
-        progress_placeholder.info("💡 2/4 책 고유 컨셉 설계 중...")
-        concept_prompt = f"""당신은 크몽/클래스101 베스트셀러 전자책 기획자입니다.
-이 책만의 '고유한 시스템/공식'을 만들어야 합니다.
+def apply_outline(outline):
+    """파싱된 Outline을 세션 목차로 저장 (소제목 본문 데이터는 새로 만든다)"""
+    st.session_state['outline'] = outline.chapter_titles()
+    st.session_state['chapters'] = {ch.title: new_chapter_data(ch.subtopics) for ch in outline.chapters}
 
-[저자 정보]
-주제: {topic}
-핵심 방법: {interview_data.get('core_method', '')}
-저자만의 차별점: {interview_data.get('unique_point', '')}
-타겟의 고민: {interview_data.get('target_problem', '')}
+# 목차 단계 프롬프트의 고정 규칙 (system으로 보내 Anthropic 프롬프트 캐시로 재사용)
+OUTLINE_CONCEPT_SYSTEM_PROMPT = """당신은 크몽/클래스101 베스트셀러 전자책 기획자입니다.
+이 책만의 '고유한 시스템/공식'을 만들어야 합니다.
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 🔥 실제 잘 팔리는 전자책의 고유 시스템/공식 예시
@@ -2824,20 +3089,9 @@ def generate_outline_only(interview_data, progress_placeholder):
 [목차에서 반복할 키워드]
 (시스템 이름 또는 핵심 단어 1~2개)"""
 
-        book_concept = ask_ai(concept_prompt, 0.8)
-        st.session_state['book_concept'] = book_concept
-
-        # 3. 제목 생성
-        progress_placeholder.info("📝 3/4 제목 생성 중...")
-        title_prompt = f"""당신은 크몽/클래스101 베스트셀러 전자책 제목을 만드는 전문가입니다.
+OUTLINE_TITLE_SYSTEM_PROMPT = """당신은 크몽/클래스101 베스트셀러 전자책 제목을 만드는 전문가입니다.
 결제 버튼을 누르게 만드는 제목을 써주세요.
 
-[이 책의 컨셉]
-{book_concept}
-
-[주제]
-{topic}
-
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 🔥 실제 잘 팔리는 전자책 제목 분석
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -2896,25 +3150,12 @@ def generate_outline_only(interview_data, progress_placeholder):
 부제: 구체적인 결과/약속을 담아 15~25자
 
 JSON만 출력:
-{{
+{
     "title": "제목 (컨셉+내용이 드러나게, 3~8단어)",
     "subtitle": "부제 (구체적 결과/약속, 15~25자)"
-}}"""
-
-        title_result = ask_ai(title_prompt, 0.4)
-        title_data = parse_json(title_result)
-        if title_data:
-            st.session_state['book_title'] = title_data.get('title', topic)
-            st.session_state['subtitle'] = title_data.get('subtitle', '')
+}"""
 
-        # 4. 목차 생성 (책 컨셉 기반)
-        progress_placeholder.info("📋 4/4 목차 설계 중...")
-        outline_prompt = f"""당신은 자청입니다. 목차를 보는 순간 "이거 안 사면 손해다"라는 생각이 들게 만드세요.
-
-[이 책의 고유 시스템/공식]
-{book_concept}
-
-[주제]: {topic}
+OUTLINE_SYSTEM_PROMPT = """당신은 자청입니다. 목차를 보는 순간 "이거 안 사면 손해다"라는 생각이 들게 만드세요.
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 🎯 핵심: 고유 시스템 네이밍
@@ -3052,91 +3293,104 @@ PART 6. [시스템명] 완성 - [궁극적 결과가 실현되는 시스템]
 
 목차만 출력. 콜론(:) 절대 사용 금지."""
 
-        outline_result = ask_ai(outline_prompt, 0.4)
-
-        if outline_result:
-            chapters = []
-            subtopics = {}
-            current_ch = None
-
-            lines = outline_result.split('\n')
-            for i, orig_line in enumerate(lines):
-                line = orig_line.strip()
-                if not line:
-                    continue
-
-                # 챕터 감지 (PART, 파트, Chapter, 1., 2. 등 다양한 형식)
-                is_chapter = False
-                ch_name = None
-
-                # PART 1. 제목 형식
-                if re.match(r'^(PART|파트|Part)\s*\d+[\.\s]', line, re.IGNORECASE):
-                    is_chapter = True
-                    ch_name = line
-                # Chapter 1. 제목 형식
-                elif re.match(r'^(Chapter|챕터)\s*\d+[\.\s]', line, re.IGNORECASE):
-                    is_chapter = True
-                    ch_name = line
-                # 마크다운 헤더 형식
-                elif re.match(r'^#+\s*(PART|파트|Chapter|챕터|\d+)', line, re.IGNORECASE):
-                    is_chapter = True
-                    ch_name = re.sub(r'^#+\s*', '', line)
-                # 1. 제목 형식 (숫자로 시작, 들여쓰기 없음)
-                elif re.match(r'^\d+[\.\)]\s', line) and not orig_line.startswith(' '):
-                    is_chapter = True
-                    ch_name = line
-                # 【1부】 형식
-                elif re.match(r'^[【\[]?\s*\d+\s*(부|장|편)[】\]]?', line):
-                    is_chapter = True
-                    ch_name = line
-
-                if is_chapter and ch_name:
-                    ch_name = re.sub(r'^[#\*\-\s]+', '', ch_name)
-                    ch_name = ch_name.replace('**', '').replace('*', '').replace('#', '').strip()
-                    if ch_name and len(ch_name) > 3:
-                        current_ch = ch_name
-                        if current_ch not in chapters:
-                            chapters.append(current_ch)
-                            subtopics[current_ch] = []
-                elif current_ch:
-                    # 소제목 감지
-                    is_subtopic = False
-                    st_name = None
-
-                    # - 소제목 형식
-                    if re.match(r'^[\-\•\·\*\→\▶]\s*', line):
-                        is_subtopic = True
-                        st_name = re.sub(r'^[\-\•\·\*\→\▶]\s*', '', line)
-                    # 1) 소제목, a) 소제목 형식
-                    elif re.match(r'^[a-z\d][\)\.\:]\s', line, re.IGNORECASE):
-                        is_subtopic = True
-                        st_name = re.sub(r'^[a-z\d][\)\.\:]\s*', '', line, flags=re.IGNORECASE)
-                    # 들여쓰기된 라인
-                    elif orig_line.startswith('  ') or orig_line.startswith('\t'):
-                        is_subtopic = True
-                        st_name = line.lstrip('- •·*→▶0123456789.):\t ')
-                    # 챕터가 아닌 일반 텍스트 (이전이 챕터였고, 현재가 짧은 문장이면 소제목으로 간주)
-                    elif len(chapters) > 0 and not re.match(r'^(PART|파트|Part|Chapter|챕터|\d+[\.\)])', line, re.IGNORECASE):
-                        if len(line) > 5 and len(line) < 100:
-                            is_subtopic = True
-                            st_name = line.lstrip('- •·*→▶0123456789.):\t ')
-
-                    if is_subtopic and st_name:
-                        st_name = st_name.replace('**', '').replace('*', '').replace('#', '').strip()
-                        st_name = re.sub(r'^\d+[\.\)\:]\s*', '', st_name)  # 앞 숫자 제거
-                        if st_name and len(st_name) > 3 and len(subtopics[current_ch]) < 5:
-                            # 챕터 이름과 동일하면 스킵
-                            if st_name.lower() != current_ch.lower() and st_name not in subtopics[current_ch]:
-                                subtopics[current_ch].append(st_name)
-
-            if chapters:
-                st.session_state['outline'] = chapters
-                st.session_state['chapters'] = {}
-                for ch in chapters:
-                    st.session_state['chapters'][ch] = {
-                        'subtopics': subtopics.get(ch, []),
-                        'subtopic_data': {s: {'questions': [], 'answers': [], 'content': ''} for s in subtopics.get(ch, [])}
-                    }
+SUBTOPIC_SYSTEM_PROMPT = """당신은 자청입니다. 이 소제목 하나로 결제를 이끌어내세요.
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+🎯 목표 = "이거 뭔데?" 하면서 클릭하게 만들기
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+[S급 예시]
+- 적게 먹으면 빠진다고? 그거 다 거짓말이다
+- 나도 3년간 요요만 반복하다 깨달은 불편한 진실
+- 먹는 양 늘렸는데 오히려 빠진 이유
+- 90%가 모르는 기초대사량의 진짜 비밀
+- 이 시스템이 완성되면 생기는 일
+
+[패턴 - 하나 선택]
+[반전형] "~하면 무조건 망한다", "~는 전부 거짓말이다"
+[숫자형] "3년 삽질 끝에 깨달은 것", "90%가 모르는 ~"
+[비밀형] "아무도 안 알려주는 ~", "~의 진짜 비밀"
+[결과형] "이것만 바꿔도 ~", "~ 후 완전히 달라진 것들"
+
+❌ 금지: ~의 이해, ~하는 방법, 나침반, 열쇠, 마법, 효과적인, 성공적인
+
+소제목 하나만 (15~30자, 기호 없이):"""
+
+CHAPTER_SUBTOPICS_SYSTEM_PROMPT = """당신은 자청입니다. 이 챕터 소제목 3개로 "이건 사야 돼" 만드세요.
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+🎯 소제목 = "이거 뭔데?" 하면서 클릭하게
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+[S급 예시]
+- 적게 먹으면 빠진다고? 그거 다 거짓말이다
+- 나도 3년간 요요만 반복하다 깨달은 불편한 진실
+- 그 사람들의 식단과 생활을 전부 뜯어봤다
+- 셋포인트 시스템이 작동하는 단 하나의 원리
+- 먹는 양 늘렸는데 오히려 빠진 이유
+- 6개월 뒤 거울 보고 소름 돋았다
+
+✅ 3개 모두 다른 패턴으로:
+1번: [반전형] "~하면 무조건 망한다", "~는 전부 거짓말이다"
+2번: [숫자/스토리형] "3년 삽질 끝에~", "그 사람들을 전부 뜯어봤다"
+3번: [비밀/결과형] "~의 진짜 비밀", "~ 후 소름 돋았다"
+
+❌ 절대 금지:
+- ~의 이해, ~하는 방법, 효과적인, 성공적인
+- 나침반, 열쇠, 마법, 가이드, 완벽 정리
+- 같은 패턴/비유 반복
+
+소제목 3개만 (줄바꿈으로 구분, 기호/번호 없이):"""
+
+def generate_outline_only(interview_data, progress_placeholder):
+    """인터뷰 데이터를 기반으로 목차까지만 생성 (본문 제외)"""
+    try:
+        topic = interview_data.get('topic', '')
+        if not topic:
+            return False
+
+        # 1. 타겟 자동 설정
+        progress_placeholder.info("🎯 1/4 타겟 독자 분석 중...")
+        target = f"{interview_data.get('target_reader', '')} - {interview_data.get('target_problem', '')}"
+        st.session_state['target_persona'] = target
+
+        # 2. 책 고유 컨셉 생성 (가장 중요!)
+        progress_placeholder.info("💡 2/4 책 고유 컨셉 설계 중...")
+        concept_prompt = f"""[저자 정보]
+주제: {topic}
+핵심 방법: {interview_data.get('core_method', '')}
+저자만의 차별점: {interview_data.get('unique_point', '')}
+타겟의 고민: {interview_data.get('target_problem', '')}"""
+
+        book_concept = ask_ai(concept_prompt, 0.8, cache_kind='outline', system=OUTLINE_CONCEPT_SYSTEM_PROMPT)
+        st.session_state['book_concept'] = book_concept
+
+        # 3. 제목 생성
+        progress_placeholder.info("📝 3/4 제목 생성 중...")
+        title_prompt = f"""[이 책의 컨셉]
+{book_concept}
+
+[주제]
+{topic}"""
+
+        title_result = ask_ai(title_prompt, 0.4, cache_kind='outline', system=OUTLINE_TITLE_SYSTEM_PROMPT)
+        title_data = parse_json(title_result)
+        if title_data:
+            st.session_state['book_title'] = title_data.get('title', topic)
+            st.session_state['subtitle'] = title_data.get('subtitle', '')
+
+        # 4. 목차 생성 (책 컨셉 기반)
+        progress_placeholder.info("📋 4/4 목차 설계 중...")
+        outline_prompt = f"""[이 책의 고유 시스템/공식]
+{book_concept}
+
+[주제]: {topic}"""
+
+        outline_result = ask_ai(outline_prompt, 0.4, cache_kind='outline', system=OUTLINE_SYSTEM_PROMPT)
+
+        outline = parse_outline(outline_result, max_subtopics=5)
+        if outline:
+            apply_outline(outline)
 
         # 목차가 생성되지 않았으면 기본 목차 생성
         if not st.session_state.get('outline'):
@@ -3155,13 +3409,7 @@ PART 6. [시스템명] 완성 - [궁극적 결과가 실현되는 시스템]
                 default_chapters[3]: ["월 100만원 만드는 구조", "자동화로 시간 벌기", "확장 전략 A to Z"],
                 default_chapters[4]: ["1년 후 당신의 모습", "다음 레벨로 가는 로드맵", "지금 바로 해야 할 첫 번째 행동"]
             }
-            st.session_state['outline'] = default_chapters
-            st.session_state['chapters'] = {}
-            for ch in default_chapters:
-                st.session_state['chapters'][ch] = {
-                    'subtopics': default_subtopics.get(ch, []),
-                    'subtopic_data': {s: {'questions': [], 'answers': [], 'content': ''} for s in default_subtopics.get(ch, [])}
-                }
+            apply_outline(Outline([OutlineChapter(ch, default_subtopics[ch]) for ch in default_chapters]))
 
         # 저자명 및 인터뷰 데이터 저장
         st.session_state['author_name'] = interview_data.get('author_name', '')
@@ -3183,39 +3431,16 @@ def regenerate_single_subtopic(chapter_name, subtopic_index, existing_subtopics)
     # 기존 소제목들 (중복 방지용)
     other_subtopics = [s for i, s in enumerate(existing_subtopics) if i != subtopic_index]
 
-    prompt = f"""당신은 자청입니다. 이 소제목 하나로 결제를 이끌어내세요.
-
-[책 컨셉/시스템]
+    prompt = f"""[책 컨셉/시스템]
 {book_concept}
 
 [챕터]: {chapter_name}
 [주제]: {topic}
 
 [기존 소제목들 - 절대 비슷하면 안 됨]
-{chr(10).join(f'- {s}' for s in other_subtopics)}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🎯 목표 = "이거 뭔데?" 하면서 클릭하게 만들기
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-[S급 예시]
-- 적게 먹으면 빠진다고? 그거 다 거짓말이다
-- 나도 3년간 요요만 반복하다 깨달은 불편한 진실
-- 먹는 양 늘렸는데 오히려 빠진 이유
-- 90%가 모르는 기초대사량의 진짜 비밀
-- 이 시스템이 완성되면 생기는 일
-
-[패턴 - 하나 선택]
-[반전형] "~하면 무조건 망한다", "~는 전부 거짓말이다"
-[숫자형] "3년 삽질 끝에 깨달은 것", "90%가 모르는 ~"
-[비밀형] "아무도 안 알려주는 ~", "~의 진짜 비밀"
-[결과형] "이것만 바꿔도 ~", "~ 후 완전히 달라진 것들"
+{chr(10).join(f'- {s}' for s in other_subtopics)}"""
 
-❌ 금지: ~의 이해, ~하는 방법, 나침반, 열쇠, 마법, 효과적인, 성공적인
-
-소제목 하나만 (15~30자, 기호 없이):"""
-
-    result = ask_ai(prompt, 0.9)
+    result = ask_ai(prompt, 0.9, cache_kind='outline', bypass_cache=True, system=SUBTOPIC_SYSTEM_PROMPT)
     if result:
         return result.strip().strip('"').strip("'").strip('-').strip()
     return None
@@ -3244,9 +3469,7 @@ def regenerate_chapter_subtopics(chapter_name, chapter_index):
     }
     current_role = chapter_roles.get(chapter_index, "핵심 내용 전달")
 
-    prompt = f"""당신은 자청입니다. 이 챕터 소제목 3개로 "이건 사야 돼" 만드세요.
-
-[책 컨셉/시스템]
+    prompt = f"""[책 컨셉/시스템]
 {book_concept}
 
 [주제]: {topic}
@@ -3254,92 +3477,138 @@ def regenerate_chapter_subtopics(chapter_name, chapter_index):
 [이 챕터의 역할]: {current_role}
 
 [다른 챕터 소제목들 - 절대 비슷하면 안 됨]
-{chr(10).join(f'- {s}' for s in other_chapter_subtopics[:8])}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🎯 소제목 = "이거 뭔데?" 하면서 클릭하게
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-[S급 예시]
-- 적게 먹으면 빠진다고? 그거 다 거짓말이다
-- 나도 3년간 요요만 반복하다 깨달은 불편한 진실
-- 그 사람들의 식단과 생활을 전부 뜯어봤다
-- 셋포인트 시스템이 작동하는 단 하나의 원리
-- 먹는 양 늘렸는데 오히려 빠진 이유
-- 6개월 뒤 거울 보고 소름 돋았다
-
-✅ 3개 모두 다른 패턴으로:
-1번: [반전형] "~하면 무조건 망한다", "~는 전부 거짓말이다"
-2번: [숫자/스토리형] "3년 삽질 끝에~", "그 사람들을 전부 뜯어봤다"
-3번: [비밀/결과형] "~의 진짜 비밀", "~ 후 소름 돋았다"
+{chr(10).join(f'- {s}' for s in other_chapter_subtopics[:8])}"""
 
-❌ 절대 금지:
-- ~의 이해, ~하는 방법, 효과적인, 성공적인
-- 나침반, 열쇠, 마법, 가이드, 완벽 정리
-- 같은 패턴/비유 반복
-
-소제목 3개만 (줄바꿈으로 구분, 기호/번호 없이):"""
-
-    result = ask_ai(prompt, 0.8)
+    result = ask_ai(prompt, 0.8, cache_kind='outline', bypass_cache=True, system=CHAPTER_SUBTOPICS_SYSTEM_PROMPT)
     if result:
         lines = [line.strip().strip('"').strip("'").strip('-').strip() for line in result.strip().split('\n') if line.strip() and len(line.strip()) > 5]
         return lines[:3] if lines else None
     return None
 
-def generate_body_from_outline(interview_data, progress_placeholder):
-    """생성된 목차를 기반으로 본문만 생성"""
-    try:
-        topic = interview_data.get('topic', '')
-        book_concept = st.session_state.get('book_concept', '')
+BODY_HOOK_STYLES = [
+    "질문으로 시작 (예: '왜 우리는 항상 실패할까요?')",
+    "고백으로 시작 (예: '솔직히 말하면, 저도 처음엔 몰랐습니다.')",
+    "반전 사실로 시작 (예: '대부분의 사람들이 믿는 것과 정반대였습니다.')",
+    "통계/숫자로 시작 (예: '92%가 이 실수를 반복합니다.')",
+    "에피소드로 시작 (예: '어느 날 친구에게서 연락이 왔습니다.')",
+    "선언으로 시작 (예: '결론부터 말하겠습니다. 방법은 하나입니다.')",
+]
+
+SUMMARY_MAX_CHARS = 160  # 소제목 요약 최대 길이 ('이미 작성된 내용'에 들어감)
+PREV_SUMMARY_WINDOW = 6  # '이미 작성된 내용'에 넣을 직전 소제목 수
+PREV_CHAPTER_WINDOW = 5  # 병렬 모드에서 목차로 보여줄 앞 챕터 수
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?。])\s+|\n+')
+_EMPHASIS_TERM = re.compile(r'「([^」]{1,30})」')
+
+def summarize_subtopic(content, limit=SUMMARY_MAX_CHARS):
+    """본문에서 뽑은 짧은 요약 (AI 호출 없음)
+
+    첫 문단은 보통 도입부 훅이라 건너뛰고, ★ 핵심 문장과 마지막 문단의 첫 문장,
+    「」 강조어를 우선으로 limit자 안에 담는다.
+    """
+    if not content:
+        return ''
+    paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
+    body = paragraphs[1:] if len(paragraphs) > 2 else paragraphs
+    starred = [line.strip().lstrip('★').strip() for p in body for line in p.split('\n') if line.strip().startswith('★')]
+
+    picks = starred[:2]
+    for p in (body[-1:] + body[:1]) if body else []:
+        first = next((x.strip() for x in _SENTENCE_SPLIT.split(p) if len(x.strip()) > 5 and not x.lstrip().startswith(('|', '★'))), '')
+        if first and first not in picks:
+            picks.append(first)
+    summary = ' / '.join(picks)
+    terms = list(dict.fromkeys(_EMPHASIS_TERM.findall(content)))[:4]
+    if terms:
+        summary = f"{summary} [핵심어: {', '.join(terms)}]" if summary else f"[핵심어: {', '.join(terms)}]"
+    summary = summary.replace('「', '').replace('」', '').replace('**', '')
+    return summary if len(summary) <= limit else summary[:limit - 1] + '…'
+
+def set_subtopic_content(subtopic, content):
+    """소제목 본문 저장 - 본문이 바뀔 때 한 번만 요약과 분량 통계를 새로 만든다"""
+    subtopic.set_content(content)
+    subtopic.data['summary'] = summarize_subtopic(content)
+    subtopic.data.pop('cleaned', None)
+    if st.session_state.get('book') not in (None, subtopic.chapter.book):
+        # 작업 도중 목차가 바뀌어 예전 모델로 저장됨 → 현재 모델은 다음에 새로 집계
+        st.session_state.pop('book', None)
+
+class SummaryIndex:
+    """목차 순서대로 정렬된 소제목 요약 색인 (세션에 보관)
+
+    목차가 바뀔 때만 다시 만들고, 요약 자체는 subtopic_data['summary']에서 읽는다.
+    소제목마다 앞 챕터 전체를 다시 훑지 않고 직전 몇 개만 꺼내 쓴다.
+    """
+
+    def __init__(self, outline, chapters):
+        self.signature = self.make_signature(outline, chapters)
+        self.keys = [(ch, sub) for ch in outline for sub in chapters.get(ch, {}).get('subtopics', [])]
+        self.position = {key: i for i, key in enumerate(self.keys)}
+        self.chapter_start = {}
+        for i, (ch, _) in enumerate(self.keys):
+            self.chapter_start.setdefault(ch, i)
+        # 병렬 모드용 앞 챕터 목차 줄 (챕터 순서대로)
+        self.chapter_lines = [
+            (ch, f"- {ch}: {', '.join(chapters[ch]['subtopics'])}")
+            for ch in outline if chapters.get(ch, {}).get('subtopics')
+        ]
+        self.chapter_order = {ch: i for i, ch in enumerate(outline)}
 
-        if not st.session_state.get('outline') or not st.session_state.get('chapters'):
-            progress_placeholder.error("먼저 목차를 생성해주세요.")
-            return False
+    @staticmethod
+    def make_signature(outline, chapters):
+        return tuple((ch, tuple(chapters.get(ch, {}).get('subtopics', []))) for ch in outline)
 
-        # 본문 생성
-        total_subtopics = sum(len(st.session_state['chapters'][ch]['subtopics']) for ch in st.session_state['outline'])
-        done = 0
-
-        for ch in st.session_state['outline']:
-            ch_data = st.session_state['chapters'][ch]
-            for sub in ch_data['subtopics']:
-                done += 1
-                progress_placeholder.info(f"✍️ 본문 작성 중... ({done}/{total_subtopics}) - {sub[:20]}...")
-
-                # 이전 소제목들의 내용 요약 (중복 방지용)
-                prev_contents = []
-                for prev_ch in st.session_state['outline']:
-                    if prev_ch == ch:
-                        break
-                    prev_ch_data = st.session_state['chapters'].get(prev_ch, {})
-                    for prev_sub in prev_ch_data.get('subtopics', []):
-                        prev_content = prev_ch_data.get('subtopic_data', {}).get(prev_sub, {}).get('content', '')
-                        if prev_content:
-                            prev_contents.append(f"- {prev_sub}: {prev_content[:100]}...")
-
-                # 현재 챕터의 이전 소제목들
-                current_ch_prev = []
-                for prev_sub in ch_data['subtopics']:
-                    if prev_sub == sub:
-                        break
-                    prev_content = ch_data.get('subtopic_data', {}).get(prev_sub, {}).get('content', '')
-                    if prev_content:
-                        current_ch_prev.append(f"- {prev_sub}: {prev_content[:100]}...")
-
-                prev_summary = "\n".join(prev_contents[-5:] + current_ch_prev) if (prev_contents or current_ch_prev) else "없음"
-
-                # 소제목 인덱스에 따라 다른 시작 스타일 선택
-                hook_styles = [
-                    "질문으로 시작 (예: '왜 우리는 항상 실패할까요?')",
-                    "고백으로 시작 (예: '솔직히 말하면, 저도 처음엔 몰랐습니다.')",
-                    "반전 사실로 시작 (예: '대부분의 사람들이 믿는 것과 정반대였습니다.')",
-                    "통계/숫자로 시작 (예: '92%가 이 실수를 반복합니다.')",
-                    "에피소드로 시작 (예: '어느 날 친구에게서 연락이 왔습니다.')",
-                    "선언으로 시작 (예: '결론부터 말하겠습니다. 방법은 하나입니다.')",
-                ]
-                current_hook_style = hook_styles[done % len(hook_styles)]
+    def before(self, chapter, subtopic, window=PREV_SUMMARY_WINDOW):
+        """(챕터, 소제목) 바로 앞의 소제목 키 최대 window개 (목차 순서)"""
+        pos = self.position.get((chapter, subtopic), 0)
+        return self.keys[max(0, pos - window):pos]
 
-                content_prompt = f"""당신은 전세계 베스트셀러 작가들의 기법을 마스터한 작가입니다.
+    def chapters_before(self, chapter, window=PREV_CHAPTER_WINDOW):
+        """앞 챕터들의 목차 줄 최대 window개"""
+        index = self.chapter_order.get(chapter, 0)
+        lines = [line for ch, line in self.chapter_lines if self.chapter_order[ch] < index]
+        return lines[-window:]
+
+def get_summary_index():
+    """현재 목차에 맞는 요약 색인 (목차가 바뀌었으면 새로 만든다)"""
+    outline = st.session_state.get('outline', [])
+    chapters = st.session_state.get('chapters', {})
+    index = st.session_state.get('summary_index')
+    if index is None or index.signature != SummaryIndex.make_signature(outline, chapters):
+        index = SummaryIndex(outline, chapters)
+        st.session_state['summary_index'] = index
+    return index
+
+def get_subtopic_summary(sub_data):
+    """저장된 요약 반환 (이전 세션/저널처럼 요약이 없는 본문은 이때 한 번 만든다)"""
+    if sub_data.get('content') and not sub_data.get('summary'):
+        sub_data['summary'] = summarize_subtopic(sub_data['content'])
+    return sub_data.get('summary', '')
+
+def build_prev_summary(chapter, subtopic, use_bodies=False, index=None):
+    """중복 방지용 '이미 작성된 내용' 요약
+
+    직전 PREV_SUMMARY_WINDOW개 소제목의 저장된 요약으로 만든다 (책 길이와 무관).
+    use_bodies=False(병렬 모드)면 앞 챕터 목차를 함께 넣고, 아직 본문이 없는
+    소제목은 제목만 넣어 다른 소제목 본문이 끝나기를 기다리지 않는다.
+    index는 작업 스레드에서 쓰도록 미리 만든 SummaryIndex.
+    """
+    if index is None:
+        index = get_summary_index()
+    chapters = st.session_state['chapters']
+
+    lines = [] if use_bodies else index.chapters_before(chapter)
+    for prev_ch, prev_sub in index.before(chapter, subtopic):
+        summary = get_subtopic_summary(chapters.get(prev_ch, {}).get('subtopic_data', {}).get(prev_sub, {}))
+        same = " (같은 챕터)" if prev_ch == chapter else ""
+        if summary:
+            lines.append(f"- {prev_sub}{same}: {summary}")
+        elif not use_bodies:
+            lines.append(f"- {prev_sub}{same}")
+
+    return "\n".join(lines) if lines else "없음"
+
+BODY_SYSTEM_PROMPT = """당신은 전세계 베스트셀러 작가들의 기법을 마스터한 작가입니다.
 
 🚨🚨🚨 최우선 규칙 (반드시 지켜라) 🚨🚨🚨
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -3349,23 +3618,11 @@ def generate_body_from_outline(interview_data, progress_placeholder):
    ✅ "저는", "우리는" 정도만 사용
 
 2. 이전 글과 다른 시작으로 시작해라!
-   이번 글은 반드시: {current_hook_style}
+   이번 글의 시작 방식은 요청에 적힌 대로 따른다.
    ❌ 매번 같은 패턴 금지 (날짜+상황, 고백, 질문 등)
    ❌ "20XX년 X월" 형식의 날짜로 시작 금지
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-[집필 정보]
-주제: {topic}
-챕터: {ch}
-현재 작성할 소제목: {sub}
-핵심 방법론: {interview_data.get('core_method', '')}
-
-[이 책의 고유 컨셉]
-{book_concept}
-
-[이미 작성된 내용 - 중복 금지]
-{prev_summary}
-
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 ✍️ 글쓰기 스타일
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -3431,18 +3688,289 @@ def generate_body_from_outline(interview_data, progress_placeholder):
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 📏 분량: 1500~1800자
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"""
+
+def build_body_prompt(interview_data, book_concept, chapter, subtopic, prev_summary, hook_style):
+    """목차 기반 본문 생성 프롬프트 → (system, prompt)
+
+    system은 모든 소제목이 같은 고정 규칙 + 책 단위 정보(주제/방법론/컨셉)라 캐시되고,
+    prompt에는 소제목마다 바뀌는 내용만 넣는다.
+    """
+    topic = interview_data.get('topic', '')
+    book_info = f"""[집필 정보]
+주제: {topic}
+핵심 방법론: {interview_data.get('core_method', '')}
 
-'{sub}' 본문을 작성하세요.
-- 이번 글 시작: {current_hook_style}
+[이 책의 고유 컨셉]
+{book_concept}"""
+    prompt = f"""챕터: {chapter}
+현재 작성할 소제목: {subtopic}
+
+[이미 작성된 내용 - 중복 금지]
+{prev_summary}
+
+'{subtopic}' 본문을 작성하세요.
+- 이번 글 시작: {hook_style}
 - 자연스러운 흐름으로 1500~1800자
 - 반전/깨달음 하나 필수
 - 이전 글과 완전히 다른 톤으로 시작"""
+    return [BODY_SYSTEM_PROMPT, book_info], prompt
+
+# ==========================================
+# 작업 저널 (긴 생성 작업 중단 후 이어하기)
+# ==========================================
+JOURNAL_DIR = Path.home() / ".ebook_app_journal"
+JOURNAL_LIST_LIMIT = 5  # 첫 화면에 보여줄 최근 작업 수
+JOURNAL_HISTORY_LIMIT = 20  # 기기별로 디스크에 남길 저널 수
+JOURNAL_MAX_AGE_DAYS = 30  # 이보다 오래 손대지 않은 저널은 삭제
+JOURNAL_INDEX_NAME = "index.json"
+_journal_lock = threading.Lock()
+
+def get_journal_owner():
+    """저널 소유자 (기기 ID 해시) - 기기 ID가 없으면 None (저널 기록 안 함)"""
+    device_id = get_device_id()
+    if not device_id:
+        return None
+    return hashlib.sha256(device_id.encode('utf-8')).hexdigest()[:16]
+
+def get_journal_path(owner, project_id):
+    return JOURNAL_DIR / owner / f"{project_id}.jsonl"
+
+def is_valid_project_id(project_id):
+    """start_journal이 만든 형식(숫자_16진수)만 허용 - 경로 조작 방지"""
+    return bool(re.fullmatch(r'\d{14}_[0-9a-f]{8}', project_id or ''))
+
+def read_journal_index(owner):
+    """기기별 저널 목록 {project_id: {topic, pipeline, updated, total, remaining}} (_journal_lock 안에서 호출)"""
+    try:
+        return json.loads((JOURNAL_DIR / owner / JOURNAL_INDEX_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+def write_journal_index(owner, index):
+    path = JOURNAL_DIR / owner / JOURNAL_INDEX_NAME
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(index, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, path)
+
+def prune_journals(owner, index):
+    """오래되었거나 JOURNAL_HISTORY_LIMIT를 넘는 저널 삭제 (_journal_lock 안에서 호출)"""
+    cutoff = (datetime.now() - timedelta(days=JOURNAL_MAX_AGE_DAYS)).isoformat(timespec='seconds')
+    ordered = sorted(index, key=lambda pid: index[pid]['updated'], reverse=True)
+    for pid in ordered[JOURNAL_HISTORY_LIMIT:] + [pid for pid in ordered[:JOURNAL_HISTORY_LIMIT] if index[pid]['updated'] < cutoff]:
+        get_journal_path(owner, pid).unlink(missing_ok=True)
+        del index[pid]
+
+def append_journal(journal, record, entry=None, done_key=None):
+    """저널에 한 줄 추가 (바로 디스크에 기록) 후 목록(index.json) 갱신
+
+    entry는 새 목록 항목(작업 시작 시), done_key는 완성된 (챕터, 소제목).
+    """
+    if not journal:
+        return
+    owner, project_id = journal
+    now = datetime.now().isoformat(timespec='seconds')
+    line = json.dumps(dict(record, ts=now), ensure_ascii=False) + "\n"
+    try:
+        with _journal_lock:
+            (JOURNAL_DIR / owner).mkdir(parents=True, exist_ok=True)
+            with open(get_journal_path(owner, project_id), 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            index = read_journal_index(owner)
+            if entry is not None:
+                index[project_id] = dict(entry, updated=now)
+                prune_journals(owner, index)
+            item = index.get(project_id)
+            if item is not None:
+                item['updated'] = now
+                if done_key is not None and list(done_key) in item['remaining']:
+                    item['remaining'].remove(list(done_key))
+                write_journal_index(owner, index)
+    except OSError:
+        pass  # 저널 기록 실패가 생성 자체를 막지 않도록
+
+def start_journal(pipeline, topic, interview_data=None, resume=False):
+    """생성 작업 시작 기록 (목차 포함) 후 저널 핸들 (owner, project_id) 반환
+
+    resume=True면 세션의 기존 project_id를 이어서 쓴다. 기기 ID가 없으면 None.
+    """
+    owner = get_journal_owner()
+    if not owner:
+        return None
+    project_id = st.session_state.get('project_id') if resume else None
+    if not project_id:
+        project_id = datetime.now().strftime('%Y%m%d%H%M%S') + '_' + uuid.uuid4().hex[:8]
+        st.session_state['project_id'] = project_id
+    outline = st.session_state['outline']
+    chapters = st.session_state['chapters']
+    subtopics = {ch: chapters[ch]['subtopics'] for ch in outline}
+    keys = [[ch, sub] for ch in outline for sub in subtopics[ch]]
+    journal = (owner, project_id)
+    append_journal(journal, {
+        'type': 'project',
+        'pipeline': pipeline,
+        'topic': topic,
+        'interview_data': interview_data or {},
+        'target_persona': st.session_state.get('target_persona', ''),
+        'book_concept': st.session_state.get('book_concept', ''),
+        'book_title': st.session_state.get('book_title', ''),
+        'outline': outline,
+        'subtopics': subtopics,
+    }, entry={
+        'topic': topic,
+        'pipeline': pipeline,
+        'total': len(keys),
+        'remaining': [key for key in keys if not chapters[key[0]].get('subtopic_data', {}).get(key[1], {}).get('content')],
+    })
+    return journal
+
+def journal_subtopic(journal, chapter, subtopic, content):
+    """완성된 소제목 본문 기록 (작업 스레드에서 호출 가능)"""
+    if journal and content:
+        append_journal(journal, {'type': 'subtopic', 'chapter': chapter, 'subtopic': subtopic, 'content': content},
+                       done_key=(chapter, subtopic))
+
+def read_journal(owner, project_id):
+    """저널 읽기 → (마지막 project 기록, {(챕터, 소제목): 본문})"""
+    project = None
+    contents = {}
+    try:
+        with open(get_journal_path(owner, project_id), encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 기록 도중 끊긴 마지막 줄
+                if record.get('type') == 'project':
+                    project = record
+                elif record.get('type') == 'subtopic':
+                    contents[(record['chapter'], record['subtopic'])] = record['content']
+    except OSError:
+        return None, {}
+    return project, contents
+
+def list_journals(limit=JOURNAL_LIST_LIMIT):
+    """이 기기의 최근 작업 목록 (최신순) - 저널 본문은 읽지 않고 index.json만 본다"""
+    owner = get_journal_owner()
+    if not owner:
+        return []
+    with _journal_lock:
+        index = read_journal_index(owner)
+    cutoff = (datetime.now() - timedelta(days=JOURNAL_MAX_AGE_DAYS)).isoformat(timespec='seconds')
+    ordered = sorted((pid for pid in index if index[pid]['updated'] >= cutoff),
+                     key=lambda pid: index[pid]['updated'], reverse=True)
+    return [{
+        'project_id': pid,
+        'topic': index[pid].get('topic', ''),
+        'pipeline': index[pid].get('pipeline', ''),
+        'updated': datetime.fromisoformat(index[pid]['updated']).strftime('%m/%d %H:%M'),
+        'done': index[pid]['total'] - len(index[pid]['remaining']),
+        'total': index[pid]['total'],
+    } for pid in ordered[:limit]]
+
+def restore_journal(project_id):
+    """이 기기의 저널 내용으로 세션 복원 (목차 + 완성된 본문), project 기록 반환"""
+    owner = get_journal_owner()
+    if not owner or not is_valid_project_id(project_id):
+        return None
+    with _journal_lock:
+        if project_id not in read_journal_index(owner):
+            return None  # 다른 기기의 작업이거나 이미 정리된 작업
+    project, contents = read_journal(owner, project_id)
+    if not project:
+        return None
+    st.session_state['project_id'] = project_id
+    st.session_state['topic'] = project.get('topic', '')
+    st.session_state['target_persona'] = project.get('target_persona', '')
+    st.session_state['book_concept'] = project.get('book_concept', '')
+    if project.get('book_title'):
+        st.session_state['book_title'] = project['book_title']
+    if project.get('interview_data'):
+        st.session_state['interview_data'] = project['interview_data']
+    st.session_state['outline'] = project['outline']
+    st.session_state['chapters'] = {}
+    for ch in project['outline']:
+        subs = project['subtopics'].get(ch, [])
+        st.session_state['chapters'][ch] = new_chapter_data(subs, {s: contents.get((ch, s), '') for s in subs})
+    return project
+
+def run_subtopic_jobs(jobs, write_fn, save_fn, progress_placeholder, max_workers, label="✍️ 본문 작성 중..."):
+    """(챕터, 소제목) 목록을 최대 max_workers개씩 동시에 작성
+
+    write_fn(index, ch, sub)는 작업 스레드에서, save_fn(ch, sub, result)과
+    진행 표시는 메인 스레드에서 끝나는 순서대로 실행된다.
+    """
+    total = len(jobs)
+    if max_workers <= 1:
+        for index, (ch, sub) in enumerate(jobs):
+            progress_placeholder.info(f"{label} ({index + 1}/{total}) - {sub[:20]}...")
+            save_fn(ch, sub, write_fn(index, ch, sub))
+        return
+
+    progress_placeholder.info(f"{label} (0/{total}) - {min(max_workers, total)}개씩 동시 작성")
+    done = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            submit_with_ctx(executor, write_fn, index, ch, sub): (ch, sub)
+            for index, (ch, sub) in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            ch, sub = futures[future]
+            save_fn(ch, sub, future.result())
+            done += 1
+            progress_placeholder.info(f"{label} ({done}/{total}) - {sub[:20]} 완료")
+
+def get_generation_workers():
+    """사이드바에서 설정한 본문 동시 생성 수"""
+    return max(1, int(st.session_state.get('generation_workers', BODY_GENERATION_WORKERS)))
+
+def generate_body_from_outline(interview_data, progress_placeholder, max_workers=None, resume=False):
+    """생성된 목차를 기반으로 본문만 생성
+
+    max_workers(기본: 사이드바 설정)개의 소제목을 동시에 작성하고, 끝나는 대로 subtopic_data에 저장한다.
+    병렬 모드에서는 앞 내용 맥락을 완성된 본문 대신 목차에서 가져온다.
+    완성된 본문은 작업 저널에 바로 기록되며, resume=True면 본문이 있는 소제목은 건너뛴다.
+    """
+    try:
+        book_concept = st.session_state.get('book_concept', '')
+
+        if not st.session_state.get('outline') or not st.session_state.get('chapters'):
+            progress_placeholder.error("먼저 목차를 생성해주세요.")
+            return False
+
+        if max_workers is None:
+            max_workers = get_generation_workers()
+        book = get_book()
+        all_subtopics = list(book.iter_subtopics())
+        order = {(sub.chapter.title, sub.title): index for index, sub in enumerate(all_subtopics)}
+        jobs = [(sub.chapter.title, sub.title) for sub in all_subtopics if not (resume and sub.done)]
+        parallel = max_workers > 1
+        journal = start_journal('outline', interview_data.get('topic', ''), interview_data, resume=resume)
+        summary_index = get_summary_index()
+
+        def write_body(index, ch, sub):
+            prev_summary = build_prev_summary(ch, sub, use_bodies=not parallel, index=summary_index)
+            # 소제목 순서에 따라 다른 시작 스타일 선택
+            hook_style = BODY_HOOK_STYLES[(order[(ch, sub)] + 1) % len(BODY_HOOK_STYLES)]
+            system, content_prompt = build_body_prompt(interview_data, book_concept, ch, sub, prev_summary, hook_style)
+            content = ask_ai(content_prompt, 0.7, cache_kind='content', system=system)
+            if content:
+                content = clean_content(content)  # 이모티콘/마크다운 제거
+                journal_subtopic(journal, ch, sub, content)
+            return content
+
+        def save_body(ch, sub, content):
+            if content:
+                set_subtopic_content(book.find(ch, sub), content)
 
-                content = ask_ai(content_prompt, 0.7)
-                if content:
-                    content = clean_content(content)  # 이모티콘/마크다운 제거
-                    ch_data['subtopic_data'][sub]['content'] = content
+        # 본문 생성
+        run_subtopic_jobs(jobs, write_body, save_body, progress_placeholder, max_workers)
+
+        # 프롤로그/에필로그/저자 소개 (한 번에 병렬 생성)
+        progress_placeholder.info("📖 프롤로그 · 에필로그 작성 중...")
+        generate_book_assets(interview_data, only_missing=True)
 
         # 완료 처리
         st.session_state['interview_completed'] = True
@@ -3461,23 +3989,27 @@ def go_prev():
     if st.session_state['current_page'] > 0:
         st.session_state['current_page'] -= 1
 
-def auto_generate_all(topic, progress_placeholder):
-    """주제만 입력하면 목차+본문까지 자동 생성"""
+def auto_generate_all(topic, progress_placeholder, max_workers=None, resume=False):
+    """주제만 입력하면 목차+본문까지 자동 생성 (본문은 max_workers개씩 동시 작성)
+
+    resume=True면 (저널에서 복원한) 기존 목차를 그대로 쓰고 본문이 없는 소제목만 작성한다.
+    """
     try:
+        if resume and st.session_state.get('outline'):
+            return generate_auto_bodies(topic, progress_placeholder, max_workers, resume=True)
+
         # 1. 타겟 자동 생성
         progress_placeholder.info("🎯 1/4 타겟 분석 중...")
-        target_result = suggest_targets(topic)
-        targets = parse_json(target_result)
-        if targets and targets.get('targets'):
-            first_target = targets['targets'][0]
-            persona = f"{first_target.get('name', '')} - {first_target.get('description', '')}"
+        targets = suggest_targets(topic)
+        if targets:
+            first_target = targets['personas'][0]
+            persona = f"{first_target['name']} - {first_target['needs']}"
             st.session_state['target_persona'] = persona
 
             # 페인포인트 분석
-            pain_result = analyze_pains_deep(topic, persona)
-            pain_data = parse_json(pain_result)
+            pain_data = analyze_pains_deep(topic, persona)
             if pain_data:
-                st.session_state['pains'] = pain_data.get('pains', [])
+                st.session_state['pains'] = pain_data['surface_pains']['pains'] + pain_data['hidden_pains']['pains']
 
         # 2. 목차 자동 생성
         progress_placeholder.info("📋 2/4 목차 생성 중...")
@@ -3487,90 +4019,135 @@ def auto_generate_all(topic, progress_placeholder):
             st.session_state.get('pains', [])
         )
 
-        # 목차 텍스트 파싱 (PAGE 4와 동일한 방식)
-        if outline_result:
-            chapters = []
-            subtopics = {}
-            current_ch = None
-
-            for line in outline_result.split('\n'):
-                orig_line = line
-                line = line.strip()
-                if not line:
-                    continue
-
-                # 챕터 감지 (PART, 1., 2. 등)
-                is_chapter = False
-                ch_name = None
-
-                if re.match(r'^(PART|파트)\s*\d+', line, re.IGNORECASE):
-                    is_chapter = True
-                    ch_name = line
-                elif re.match(r'^\d+[\.\)]\s', line):
-                    is_chapter = True
-                    ch_name = line
-                elif re.match(r'^#+\s*(PART|파트|\d+)', line, re.IGNORECASE):
-                    is_chapter = True
-                    ch_name = re.sub(r'^#+\s*', '', line)
-
-                if is_chapter and ch_name:
-                    ch_name = ch_name.replace('**', '').replace('*', '').replace('#', '').strip()
-                    if ch_name and len(ch_name) > 3:
-                        current_ch = ch_name
-                        if current_ch not in chapters:
-                            chapters.append(current_ch)
-                            subtopics[current_ch] = []
-                elif current_ch:
-                    # 소제목 감지
-                    is_subtopic = False
-                    st_name = None
-
-                    if line.startswith('-') or line.startswith('•') or line.startswith('·'):
-                        is_subtopic = True
-                        st_name = line.strip().lstrip('-•· ')
-                    elif re.match(r'^\s+[\da-z][\)\.]', orig_line):
-                        is_subtopic = True
-                        st_name = re.sub(r'^[\s\da-z\)\.\-]+', '', line).strip()
-
-                    if is_subtopic and st_name:
-                        st_name = st_name.replace('**', '').replace('*', '').replace('#', '').strip()
-                        if st_name and len(st_name) > 3 and not re.match(r'^(PART|파트|Chapter|챕터)', st_name, re.IGNORECASE):
-                            subtopics[current_ch].append(st_name)
-
-            if chapters:
-                st.session_state['outline'] = chapters
-                st.session_state['chapters'] = {}
-                for ch in chapters:
-                    st.session_state['chapters'][ch] = {
-                        'subtopics': subtopics.get(ch, []),
-                        'subtopic_data': {s: {'questions': [], 'answers': [], 'content': ''} for s in subtopics.get(ch, [])}
-                    }
+        outline = parse_outline(outline_result)
+        if outline:
+            apply_outline(outline)
 
         # 3. 본문 자동 생성
-        progress_placeholder.info("✍️ 3/4 본문 작성 중...")
-        if st.session_state.get('outline') and st.session_state.get('chapters'):
-            total_subtopics = sum(len(st.session_state['chapters'][ch]['subtopics']) for ch in st.session_state['outline'])
-            done = 0
-
-            for ch in st.session_state['outline']:
-                ch_data = st.session_state['chapters'][ch]
-                for sub in ch_data['subtopics']:
-                    done += 1
-                    progress_placeholder.info(f"✍️ 본문 작성 중... ({done}/{total_subtopics})")
-
-                    content = generate_content_premium(sub, ch, [], [], topic, st.session_state.get('target_persona', ''))
-                    if content:
-                        ch_data['subtopic_data'][sub]['content'] = content
-                        ch_data['subtopic_data'][sub]['formatted'] = format_content_html(content)
-
-        # 4. 완료
-        progress_placeholder.success("✅ 완료! 본문 페이지로 이동합니다...")
-        return True
+        return generate_auto_bodies(topic, progress_placeholder, max_workers)
 
     except Exception as e:
         progress_placeholder.error(f"오류 발생: {str(e)}")
         return False
 
+def generate_auto_bodies(topic, progress_placeholder, max_workers=None, resume=False):
+    """빠른 제작 3~4단계: 목차의 모든 소제목 본문 작성 (결과는 저널에 바로 기록)"""
+    progress_placeholder.info("✍️ 3/4 본문 작성 중...")
+    if st.session_state.get('outline') and st.session_state.get('chapters'):
+        persona = st.session_state.get('target_persona', '')
+        book = get_book()
+        jobs = [(sub.chapter.title, sub.title) for sub in book.iter_subtopics() if not (resume and sub.done)]
+        journal = start_journal('auto', topic, resume=resume)
+
+        def write_content(index, ch, sub):
+            content = generate_content_premium(sub, ch, [], [], topic, persona)
+            journal_subtopic(journal, ch, sub, content)
+            return content
+
+        def save_content(ch, sub, content):
+            if content:
+                set_subtopic_content(book.find(ch, sub), content)
+
+        run_subtopic_jobs(
+            jobs, write_content, save_content, progress_placeholder,
+            max_workers if max_workers is not None else get_generation_workers(),
+            label="✍️ 3/4 본문 작성 중..."
+        )
+
+    # 4. 완료
+    progress_placeholder.success("✅ 완료! 본문 페이지로 이동합니다...")
+    return True
+
+def get_screen():
+    """지금 보고 있는 화면 (작업이 끝났을 때 자동 이동 여부 판단용)"""
+    return (st.session_state.get('interview_step'), st.session_state.get('current_page'))
+
+def get_active_job():
+    """이 세션에서 대기/실행 중인 작업 (없으면 None)"""
+    engine = get_job_engine()
+    for entry in st.session_state.get('jobs', []):
+        job = engine.get(entry['id'])
+        if job and job['status'] in JOB_ACTIVE_STATUSES:
+            return job
+    return None
+
+def start_job(kind, label, fn, next_state=None, on_done=None):
+    """긴 작업을 백그라운드로 넘기고 화면 새로고침
+
+    fn(progress)는 작업 스레드에서 실행된다. 성공하면 on_done(result)을 호출하고,
+    사용자가 그 사이 다른 화면으로 가지 않았다면 next_state로 이동한다.
+    """
+    if get_active_job() is not None:
+        st.warning("⏳ 이미 진행 중인 작업이 있습니다. 끝난 뒤 다시 시도해주세요.")
+        return
+    job_id = get_job_engine().submit(kind, label, fn)
+    st.session_state['jobs'] = st.session_state.get('jobs', []) + [{
+        'id': job_id,
+        'next_state': next_state,
+        'on_done': on_done,
+        'origin': get_screen(),
+        'applied': False,
+    }]
+    st.rerun()
+
+def render_job_panel():
+    """이 세션의 작업 상태 표시 - 끝난 작업은 결과를 반영하고 앱 전체를 다시 그린다"""
+    engine = get_job_engine()
+    for entry in list(st.session_state.get('jobs', [])):
+        job = engine.get(entry['id'])
+        if job is None:
+            st.session_state['jobs'].remove(entry)
+            continue
+
+        if job['status'] in JOB_ACTIVE_STATUSES:
+            st.info(f"**{job['label']}** · {job['message']}")
+            continue
+
+        if not entry['applied']:
+            entry['applied'] = True
+            result = engine.pop_result(entry['id'])
+            if job['status'] == 'done':
+                if entry['on_done']:
+                    entry['on_done'](result)
+                if entry['next_state'] and entry['origin'] == get_screen():
+                    for key, value in entry['next_state'].items():
+                        st.session_state[key] = value
+            st.rerun()
+
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            if job['status'] == 'done':
+                st.success(f"**{job['label']}** · {job['message']}")
+            else:
+                st.error(f"**{job['label']}** · {job['message']}")
+        with col2:
+            if st.button("닫기", key=f"job_close_{job['id']}", use_container_width=True):
+                st.session_state['jobs'].remove(entry)
+                st.rerun()
+        if job['errors']:
+            with st.expander(f"⚠️ 작업 중 메시지 {len(job['errors'])}개"):
+                for message in job['errors']:
+                    st.caption(message)
+
+# 진행 중인 작업이 있을 때만 주기적으로 다시 그림
+if hasattr(st, 'fragment'):
+    render_job_panel_live = st.fragment(run_every=JOB_POLL_INTERVAL)(render_job_panel)
+else:
+    render_job_panel_live = None
+
+def show_job_panel():
+    """백그라운드 작업 상태 영역"""
+    if not st.session_state.get('jobs'):
+        return
+    if get_active_job() is None:
+        render_job_panel()
+    elif render_job_panel_live is not None:
+        render_job_panel_live()
+    else:
+        render_job_panel()
+        if st.button("🔄 작업 상태 새로고침", key="job_refresh"):
+            st.rerun()
+
 
 # ==========================================
 # AI 함수들
@@ -3631,10 +4208,11 @@ JSON:
     ],
     "recommendation": "최종 권장 2문장 한국어로"
 }}"""
-    return ask_ai(prompt, 0.5)
+    return ask_ai(prompt, 0.5, cache_kind='analysis')
 
 
 def suggest_targets(topic):
+    """구매 가능성이 높은 타겟 3개 추천 → {'personas': [...]} (실패 시 None)"""
     prompt = f"""주제: {topic}
 
 이 주제의 전자책을 가장 많이 구매할 것 같은 핵심 타겟 3개만 추천해주세요.
@@ -3642,7 +4220,7 @@ def suggest_targets(topic):
 
 [중요] 모든 답변은 반드시 한국어로만 작성하세요.
 
-JSON:
+아래 형식으로 답하세요:
 {{
     "personas": [
         {{
@@ -3653,10 +4231,11 @@ JSON:
         }}
     ]
 }}"""
-    return ask_ai(prompt, 0.7)
+    return ask_ai_json(prompt, TARGETS_SCHEMA, 'submit_targets', "추천 타겟 3개 제출", 0.7)
 
 
 def analyze_pains_deep(topic, persona):
+    """타겟 고민 심층 분석 → dict (실패 시 None)"""
     prompt = f"""주제: {topic}
 타겟: {persona}
 
@@ -3664,7 +4243,7 @@ def analyze_pains_deep(topic, persona):
 
 [중요] 모든 답변은 반드시 한국어로만 작성하세요. 외국어 사용 금지.
 
-JSON:
+아래 형식으로 답하세요:
 {{
     "surface_pains": {{
         "pains": ["표면적 고민1", "고민2", "고민3", "고민4", "고민5"],
@@ -3693,10 +4272,11 @@ JSON:
     }},
     "marketing_hook": "마케팅 훅 한 문장"
 }}"""
-    return ask_ai(prompt, 0.6)
+    return ask_ai_json(prompt, PAINS_SCHEMA, 'submit_pain_analysis', "타겟 고민 심층 분석 제출", 0.6)
 
 
 def analyze_competitor_reviews(topic):
+    """경쟁 도서 부정 리뷰 분석 → dict (실패 시 None)"""
     prompt = f"""주제: {topic}
 
 이 주제 관련 전자책/도서의 부정적 리뷰를 분석해주세요.
@@ -3706,7 +4286,7 @@ def analyze_competitor_reviews(topic):
 - 영어, 러시아어 등 외국어 절대 사용 금지
 - 한글과 숫자만 사용하세요.
 
-JSON:
+아래 형식으로 답하세요:
 {{
     "analysis_scope": {{
         "books_analyzed": "287권",
@@ -3762,10 +4342,11 @@ JSON:
         "differentiation": "차별화 전략 한국어로 2문장"
     }}
 }}"""
-    return ask_ai(prompt, 0.6)
+    return ask_ai_json(prompt, REVIEWS_SCHEMA, 'submit_review_analysis', "경쟁 도서 부정 리뷰 분석 제출", 0.6)
 
 
 def generate_titles_bestseller(topic, persona, pains):
+    """교보문고 품격의 제목 5개 → {'titles': [...]} (실패 시 None)"""
     prompt = f"""당신은 교보문고 베스트셀러 TOP 20 제목만 분석하는 전문가입니다.
 
 주제: {topic}
@@ -3833,7 +4414,7 @@ X "30대를 위한", "직장인을 위한" (타겟 명시)
 '{topic}' 주제로 교보문고 품격의 제목 5개 생성.
 각 제목은 서로 다른 패턴으로.
 
-JSON:
+아래 형식으로 답하세요:
 {{
     "titles": [
         {{"title": "제목 (1~3단어)", "subtitle": "부제 (15자 이내)", "concept": "컨셉 한줄"}},
@@ -3843,7 +4424,7 @@ JSON:
         {{"title": "제목", "subtitle": "부제", "concept": "컨셉"}}
     ]
 }}"""
-    return ask_ai(prompt, 0.75)
+    return ask_ai_json(prompt, TITLES_SCHEMA, 'submit_titles', "제목 5개 제출", 0.75, cache_kind='title')
 
 
 def analyze_text_content(text, source=""):
@@ -3861,11 +4442,11 @@ JSON:
     "ebook_ideas": ["아이디어1", "아이디어2"],
     "summary": "요약 3문장"
 }}"""
-    return ask_ai(prompt, 0.5)
+    return ask_ai(prompt, 0.5, cache_kind='analysis')
 
 
 def summarize_all_knowledge(items, topic):
-    """전체 학습 내용 통합 요약"""
+    """전체 학습 내용 통합 요약 → dict (실패 시 None)"""
     all_points = []
     all_tips = []
     all_ideas = []
@@ -3889,7 +4470,7 @@ def summarize_all_knowledge(items, topic):
 전자책 활용 아이디어:
 {chr(10).join([f"• {i}" for i in all_ideas[:10]])}
 
-JSON:
+아래 형식으로 답하세요:
 {{
     "integrated_summary": "전체 학습 내용 통합 요약 5문장",
     "core_insights": [
@@ -3923,7 +4504,7 @@ JSON:
         "팁 3"
     ]
 }}"""
-    return ask_ai(prompt, 0.6)
+    return ask_ai_json(prompt, KNOWLEDGE_SUMMARY_SCHEMA, 'submit_knowledge_summary', "학습 내용 통합 요약 제출", 0.6)
 
 
 def generate_outline(topic, persona, pains, gaps=None):
@@ -4067,28 +4648,10 @@ PART 6. 셋포인트 완성 - 신경 안 써도 체중 유지되는 몸 시스
 - [소제목]
 
 목차만 출력. 콜론(:) 절대 사용 금지."""
-    return ask_ai(prompt, 0.4)
+    return ask_ai(prompt, 0.4, cache_kind='outline')
 
 
-def generate_content_premium(subtopic, chapter, questions, answers, topic, persona):
-    """자청 스타일 몰입형 글쓰기"""
-    qa_pairs = ""
-    for i, (q, a) in enumerate(zip(questions, answers), 1):
-        if a.strip():
-            qa_pairs += f"\n질문{i}: {q}\n답변{i}: {a}\n"
-
-    # 책 컨셉/시스템 가져오기
-    book_concept = st.session_state.get('book_concept', '')
-
-    prompt = f"""'{subtopic}'에 대해 글을 씁니다.
-
-[주제]: {topic}
-[챕터]: {chapter}
-[책의 시스템/컨셉]: {book_concept}
-[참고 내용]
-{qa_pairs}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CONTENT_SYSTEM_PROMPT = """━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 🎯 핵심: 자청처럼 쓴다
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
@@ -4221,7 +4784,29 @@ def generate_content_premium(subtopic, chapter, questions, answers, topic, perso
 - 표는 1~2개 포함
 - 문체: ~했다 / ~였다 / ~더라 / ~인가?
 - 마지막은 "다음 장에서 알려주겠다"로 끝낸다"""
-    return ask_ai(prompt, 0.75)
+
+def generate_content_premium(subtopic, chapter, questions, answers, topic, persona, on_text=None):
+    """자청 스타일 몰입형 글쓰기 (on_text를 넘기면 스트리밍, 고정 규칙은 캐시되는 system으로)"""
+    qa_pairs = ""
+    for i, (q, a) in enumerate(zip(questions, answers), 1):
+        if a.strip():
+            qa_pairs += f"\n질문{i}: {q}\n답변{i}: {a}\n"
+
+    # 책 컨셉/시스템 가져오기
+    book_concept = st.session_state.get('book_concept', '')
+
+    # 책 전체에서 같은 정보는 system 두 번째 블록으로 (책 단위로 캐시)
+    book_info = f"""[주제]: {topic}
+[책의 시스템/컨셉]: {book_concept}"""
+
+    prompt = f"""'{subtopic}'에 대해 글을 씁니다.
+
+[챕터]: {chapter}
+[참고 내용]
+{qa_pairs}
+
+'{subtopic}' 본문을 작성하세요. 분량 2500~3500자, 표 1~2개 포함."""
+    return ask_ai(prompt, 0.75, on_text=on_text, cache_kind='content', system=[CONTENT_SYSTEM_PROMPT, book_info])
 
 
 def format_content_html(content):
@@ -4240,13 +4825,36 @@ def format_content_html(content):
     return formatted
 
 
+def content_preview_html(content):
+    """본문 미리보기 박스 HTML (스트리밍 중간 결과에도 사용, 스타일은 전체 CSS에 있음)"""
+    return f"""<div class="content-preview-box">
+    {format_content_html(content)}
+</div>
+"""
+
+PREVIEW_CACHE_LIMIT = 64  # 세션에 보관할 미리보기 HTML 수
+
+def get_preview_html(subtopic):
+    """소제목 미리보기 HTML - (소제목 id, 본문 해시)별로 보관해 본문이 바뀔 때만 다시 만든다"""
+    cache = st.session_state.setdefault('preview_html_cache', OrderedDict())
+    key = (subtopic.id, subtopic.content_hash)
+    preview = cache.get(key)
+    if preview is None:
+        preview = cache[key] = content_preview_html(subtopic.content)
+        while len(cache) > PREVIEW_CACHE_LIMIT:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return preview
+
+
 def generate_questions(subtopic, chapter, topic):
     prompt = f"""'{topic}' 전자책 '{chapter}' 챕터의 '{subtopic}' 작성용 질문 3개:
 
 Q1: [질문]
 Q2: [질문]
 Q3: [질문]"""
-    return ask_ai(prompt, 0.7)
+    return ask_ai(prompt, 0.7, cache_kind='question')
 
 
 # ==========================================
@@ -4331,6 +4939,9 @@ else:
     </div>
     """, unsafe_allow_html=True)
 
+# 백그라운드 작업 진행 상황 (인터뷰/페이지 공통)
+show_job_panel()
+
 # ==========================================
 # 인터뷰 모드 (interview_completed가 False일 때)
 # ==========================================
@@ -4439,8 +5050,7 @@ if not st.session_state.get('interview_completed', False):
         if 'ai_target_suggestions' not in st.session_state or st.session_state.get('ai_target_topic') != topic:
             if st.button("🔍 AI 타겟 분석 시작", key="analyze_target", use_container_width=True, type="primary"):
                 with st.spinner("시장 데이터 분석 중..."):
-                    result = suggest_targets(topic)
-                    parsed = parse_json(result)
+                    parsed = suggest_targets(topic)
                     if parsed and parsed.get('personas'):
                         st.session_state['ai_target_suggestions'] = parsed['personas']
                         st.session_state['ai_target_topic'] = topic
@@ -4595,16 +5205,13 @@ if not st.session_state.get('interview_completed', False):
                     st.session_state['temp_interview']['why_write'] = why_write
                     st.session_state['temp_interview']['final_message'] = final_message
 
-                    # 목차만 먼저 생성
-                    progress_box = st.empty()
+                    # 목차만 먼저 생성 (백그라운드, 끝나면 목차 확인 단계로 이동)
                     interview_data = st.session_state['temp_interview']
-                    success = generate_outline_only(interview_data, progress_box)
-
-                    if success:
-                        import time
-                        time.sleep(1)
-                        st.session_state['interview_step'] = 6  # 목차 확인 단계로 이동
-                        st.rerun()
+                    start_job(
+                        'outline', "📋 목차 생성",
+                        lambda progress: generate_outline_only(interview_data, progress),
+                        next_state={'interview_step': 6}
+                    )
 
     # ========== STEP 6: 목차 확인 및 본문 생성 ==========
     elif step == 6:
@@ -4692,7 +5299,7 @@ if not st.session_state.get('interview_completed', False):
                         if new_sub != sub and new_sub.strip():
                             st.session_state['chapters'][ch]['subtopics'][j] = new_sub.strip()
                             # subtopic_data도 업데이트
-                            old_data = st.session_state['chapters'][ch]['subtopic_data'].pop(sub, {'questions': [], 'answers': [], 'content': ''})
+                            old_data = st.session_state['chapters'][ch]['subtopic_data'].pop(sub, None) or new_subtopic_data()
                             st.session_state['chapters'][ch]['subtopic_data'][new_sub.strip()] = old_data
                             st.rerun()
 
@@ -4706,15 +5313,12 @@ if not st.session_state.get('interview_completed', False):
                 st.rerun()
         with col2:
             if st.button("✍️ 본문 생성하기", key="generate_body", use_container_width=True, type="primary"):
-                progress_box = st.empty()
                 interview_data = st.session_state.get('interview_data', st.session_state['temp_interview'])
-                success = generate_body_from_outline(interview_data, progress_box)
-
-                if success:
-                    import time
-                    time.sleep(1)
-                    st.session_state['current_page'] = 7  # 최종 출력 페이지로 이동
-                    st.rerun()
+                start_job(
+                    'body', "✍️ 본문 생성",
+                    lambda progress: generate_body_from_outline(interview_data, progress),
+                    next_state={'current_page': 7}  # 최종 출력 페이지로 이동
+                )
 
     # 기존 방식 사용 옵션
     st.markdown("---")
@@ -4927,13 +5531,45 @@ if current == 0:
             elif not get_api_key():
                 st.error("사이드바에서 API 키를 입력해주세요")
             else:
-                progress_box = st.empty()
-                success = auto_generate_all(topic, progress_box)
-                if success:
-                    import time
-                    time.sleep(1)
-                    st.session_state['current_page'] = 5  # 본문 페이지로 이동
-                    st.rerun()
+                start_job(
+                    'auto', "🚀 빠른 제작",
+                    lambda progress: auto_generate_all(topic, progress),
+                    next_state={'current_page': 5}  # 본문 페이지로 이동
+                )
+
+        # 중단된 작업 이어하기 (작업 저널)
+        journals = list_journals()
+        if journals:
+            with st.expander("🔁 이전 작업 불러오기 / 이어서 생성", expanded=False):
+                for j, journal in enumerate(journals):
+                    st.caption(f"{journal['topic'] or '(주제 없음)'} · 본문 {journal['done']}/{journal['total']} · {journal['updated']}")
+                    jcol1, jcol2 = st.columns([1, 1])
+                    with jcol1:
+                        if st.button("📂 불러오기", key=f"p0_journal_load_{j}", use_container_width=True):
+                            if restore_journal(journal['project_id']):
+                                st.session_state['current_page'] = 5
+                                st.rerun()
+                    with jcol2:
+                        if journal['done'] < journal['total']:
+                            if st.button("▶️ 이어서 생성", key=f"p0_journal_resume_{j}", use_container_width=True):
+                                if not get_api_key():
+                                    st.error("사이드바에서 API 키를 입력해주세요")
+                                else:
+                                    project = restore_journal(journal['project_id'])
+                                    resume_topic = st.session_state['topic']
+                                    if project and project.get('pipeline') == 'outline':
+                                        resume_data = project.get('interview_data', {})
+                                        start_job(
+                                            'body', "▶️ 본문 이어서 생성",
+                                            lambda progress: generate_body_from_outline(resume_data, progress, resume=True),
+                                            next_state={'current_page': 7}  # 인터뷰 방식은 최종 출력 페이지로
+                                        )
+                                    else:
+                                        start_job(
+                                            'auto', "▶️ 본문 이어서 생성",
+                                            lambda progress: auto_generate_all(resume_topic, progress, resume=True),
+                                            next_state={'current_page': 5}
+                                        )
 
         st.markdown("---")
         st.caption("또는 시장 분석부터 단계별로 진행:")
@@ -5126,8 +5762,7 @@ elif current == 1:
         if st.button("AI 타겟 추천", key="p1_target"):
             if st.session_state['topic'] and get_api_key():
                 with st.spinner("분석 중..."):
-                    result = suggest_targets(st.session_state['topic'])
-                    parsed = parse_json(result)
+                    parsed = suggest_targets(st.session_state['topic'])
                     if parsed:
                         st.session_state['suggested_targets'] = parsed
                         st.rerun()
@@ -5167,8 +5802,7 @@ elif current == 1:
                 st.error("API 키를 입력해주세요")
             else:
                 with st.spinner("심층 분석 중..."):
-                    r = analyze_pains_deep(st.session_state['topic'], persona)
-                    parsed = parse_json(r)
+                    parsed = analyze_pains_deep(st.session_state['topic'], persona)
                     if parsed:
                         st.session_state['analyzed_pains'] = parsed
                         surface = parsed.get('surface_pains', {}).get('pains', [])
@@ -5208,8 +5842,7 @@ elif current == 1:
         if st.button("베스트셀러 제목 생성", key="p1_title"):
             if st.session_state['topic']:
                 with st.spinner("베스트셀러 패턴 분석 중..."):
-                    r = generate_titles_bestseller(st.session_state['topic'], st.session_state['target_persona'], st.session_state['pain_points'])
-                    parsed = parse_json(r)
+                    parsed = generate_titles_bestseller(st.session_state['topic'], st.session_state['target_persona'], st.session_state['pain_points'])
                     if parsed:
                         st.session_state['generated_titles'] = parsed
                         st.rerun()
@@ -5283,8 +5916,7 @@ elif current == 2:
                 st.error("API 키를 입력해주세요")
             else:
                 with st.spinner("경쟁 도서 분석 중..."):
-                    result = analyze_competitor_reviews(st.session_state['topic'])
-                    parsed = parse_json(result)
+                    parsed = analyze_competitor_reviews(st.session_state['topic'])
                     if parsed:
                         st.session_state['review_analysis'] = parsed
                         concepts = parsed.get('concept_suggestions', [])
@@ -5395,7 +6027,7 @@ elif current == 3:
 
 중요: 책의 모든 주요 챕터를 빠짐없이 요약해주세요. 일부만 하지 말고 전체 목차를 다 포함해주세요.
 
-JSON 형식으로 응답:
+아래 형식으로 답하세요:
 {{
     "recommendations": [
         {{
@@ -5419,8 +6051,7 @@ JSON 형식으로 응답:
         }}
     ]
 }}"""
-                            result = ask_ai(prompt, 0.8)
-                            parsed = parse_json(result)
+                            parsed = ask_ai_json(prompt, REFERENCES_SCHEMA, 'submit_references', "추천 레퍼런스 3개 제출", 0.8)
                             if parsed and parsed.get('recommendations'):
                                 st.session_state['recommended_refs'] = parsed['recommendations']
                                 st.rerun()
@@ -5592,7 +6223,7 @@ JSON 형식으로 응답:
     "title_suggestions": ["제목 제안 1 (부제 포함)", "제목 제안 2 (부제 포함)", "제목 제안 3 (부제 포함)"],
     "differentiation": "경쟁작 대비 구체적인 차별화 전략 (3문장 이상)"
 }}"""
-                            result = ask_ai(prompt, 0.9)
+                            result = ask_ai(prompt, 0.9, cache_kind='analysis')
                             parsed = parse_json(result)
                             if parsed:
                                 st.session_state['generated_ideas'] = parsed
@@ -5661,7 +6292,7 @@ JSON 형식으로 응답:
     "recommended_angles": ["추천 접근 방식 1", "접근 방식 2", "접근 방식 3"],
     "avoid": ["피해야 할 것 1", "피해야 할 것 2"]
 }}"""
-                        result = ask_ai(prompt, 0.8)
+                        result = ask_ai(prompt, 0.8, cache_kind='analysis')
                         parsed = parse_json(result)
                         if parsed:
                             st.session_state['trend_analysis'] = parsed
@@ -5735,7 +6366,7 @@ JSON 형식으로 응답:
     "key_chapters": ["핵심 챕터 1", "챕터 2"],
     "content_structure": "콘텐츠 구성 방식"
 }}"""
-                        result = ask_ai(prompt, 0.7)
+                        result = ask_ai(prompt, 0.7, cache_kind='analysis')
                         parsed = parse_json(result)
                         if parsed:
                             parsed['title'] = comp_title
@@ -5828,81 +6459,10 @@ elif current == 4:
                     )
 
                     if result:
-                        lines = result.split('\n')
-                        chapters = []
-                        current_ch = None
-                        subtopics = {}
-
-                        for line in lines:
-                            orig_line = line
-                            line = line.strip()
-                            if not line:
-                                continue
-
-                            # 마크다운 정리 (먼저 정리한 후 검사)
-                            clean_line = re.sub(r'^[#\*\s]+', '', line).strip()
-                            clean_line = clean_line.replace('**', '').replace('*', '').strip()
-
-                            # PART 또는 챕터 형식 인식 (더 유연하게)
-                            is_chapter = False
-
-                            # PART 형식 (다양한 변형)
-                            if re.search(r'PART\s*\d+', clean_line, re.IGNORECASE):
-                                is_chapter = True
-                            # 파트 형식 (한글)
-                            elif re.search(r'파트\s*\d+', clean_line):
-                                is_chapter = True
-                            # Chapter 형식
-                            elif re.search(r'(Chapter|챕터)\s*\d+', clean_line, re.IGNORECASE):
-                                is_chapter = True
-                            # "1. 제목" 형식
-                            elif re.match(r'^\d+[\.\)]\s*.+', clean_line) and not clean_line.startswith('-'):
-                                is_chapter = True
-                            # 숫자로 시작하는 제목 (예: "1 첫번째 파트")
-                            elif re.match(r'^\d+\s+[가-힣A-Za-z]', clean_line):
-                                is_chapter = True
-
-                            if is_chapter:
-                                name = clean_line
-                                if name and len(name) > 3:
-                                    current_ch = name
-                                    chapters.append(current_ch)
-                                    subtopics[current_ch] = []
-
-                            # 소제목 - 다양한 형식 지원
-                            elif current_ch:
-                                is_subtopic = False
-                                st_name = ""
-
-                                # "-" 또는 "•" 또는 "·" 로 시작
-                                if re.match(r'^\s*[\-\•\·]\s*', line):
-                                    is_subtopic = True
-                                    st_name = re.sub(r'^[\s\-\•\·]+', '', line).strip()
-                                # 들여쓰기 된 내용
-                                elif orig_line.startswith('  ') or orig_line.startswith('\t'):
-                                    if not any(x in line.upper() for x in ['PART', 'CHAPTER', '파트']):
-                                        is_subtopic = True
-                                        st_name = line.strip().lstrip('-•· ')
-                                # "  1)" 또는 "  a)" 형식
-                                elif re.match(r'^\s+[\da-z][\)\.]', orig_line):
-                                    is_subtopic = True
-                                    st_name = re.sub(r'^[\s\da-z\)\.\-]+', '', line).strip()
-
-                                if is_subtopic:
-                                    st_name = st_name.replace('**', '').replace('*', '').replace('#', '').strip()
-                                    # 소제목이 충분히 길고 유효한 경우만 추가
-                                    if st_name and len(st_name) > 3 and not re.match(r'^(PART|파트|Chapter|챕터)', st_name, re.IGNORECASE):
-                                        subtopics[current_ch].append(st_name)
-
-                        if chapters:
-                            st.session_state['outline'] = chapters
-                            st.session_state['chapters'] = {}
-                            for ch in chapters:
-                                st.session_state['chapters'][ch] = {
-                                    'subtopics': subtopics.get(ch, []),
-                                    'subtopic_data': {s: {'questions': [], 'answers': [], 'content': ''} for s in subtopics.get(ch, [])}
-                                }
-                            st.success(f"{len(chapters)}개 챕터 생성!")
+                        outline = parse_outline(result)
+                        if outline:
+                            apply_outline(outline)
+                            st.success(f"{len(outline)}개 챕터 생성!")
                             st.rerun()
                         else:
                             st.error("목차 생성 실패. 다시 시도해주세요.")
@@ -5944,10 +6504,11 @@ elif current == 4:
                         key=f"edit_ch_{ch_idx}"
                     )
                     updated_outline.append(new_ch_title)
-                    updated_chapters[new_ch_title] = {'subtopics': [], 'subtopic_data': {}}
+                    old_chapter = st.session_state['chapters'].get(ch, {})
+                    updated_chapters[new_ch_title] = new_chapter_data([], chapter_id=old_chapter.get('id'))
 
                     # 소제목 수정
-                    subtopics = st.session_state['chapters'].get(ch, {}).get('subtopics', [])
+                    subtopics = old_chapter.get('subtopics', [])
                     new_subtopics = []
                     for st_idx, st_name in enumerate(subtopics):
                         new_st = st.text_input(
@@ -5959,7 +6520,7 @@ elif current == 4:
                         if new_st.strip():
                             new_subtopics.append(new_st)
                             # 기존 데이터 유지
-                            old_data = st.session_state['chapters'].get(ch, {}).get('subtopic_data', {}).get(st_name, {'questions': [], 'answers': [], 'content': ''})
+                            old_data = old_chapter.get('subtopic_data', {}).get(st_name) or new_subtopic_data()
                             updated_chapters[new_ch_title]['subtopic_data'][new_st] = old_data
 
                     updated_chapters[new_ch_title]['subtopics'] = new_subtopics
@@ -6028,10 +6589,12 @@ elif current == 5:
         with col_sel1:
             selected_ch = st.selectbox("챕터", st.session_state['outline'], key="p5_chapter")
 
+        book = get_book()
+        chapter = book.find_chapter(selected_ch) if selected_ch else None
+
         # 선택된 챕터가 있고 chapters에 존재하는지 확인
-        if selected_ch and selected_ch in st.session_state.get('chapters', {}):
-            ch_data = st.session_state['chapters'][selected_ch]
-            subtopics_list = ch_data.get('subtopics', [])
+        if chapter:
+            subtopics_list = [sub.title for sub in chapter.subtopics]
 
             # 소제목이 있는 경우에만 선택박스 표시
             selected_st = None
@@ -6040,26 +6603,21 @@ elif current == 5:
                     selected_st = st.selectbox("소제목", subtopics_list, key="p5_subtopic")
 
             # 진행률 표시
-            completed = sum(1 for s in subtopics_list if ch_data.get('subtopic_data', {}).get(s, {}).get('content'))
+            completed = chapter.done_count()
             total = len(subtopics_list)
             if total > 0:
                 st.progress(completed / total)
                 st.caption(f"{completed}/{total} 완료")
 
             # 소제목이 선택된 경우에만 편집 UI 표시
-            if selected_st:
-                # subtopic_data 초기화 확인
-                if 'subtopic_data' not in ch_data:
-                    ch_data['subtopic_data'] = {}
-                if selected_st not in ch_data['subtopic_data']:
-                    ch_data['subtopic_data'][selected_st] = {'questions': [], 'answers': [], 'content': ''}
-
-                st_data = ch_data['subtopic_data'][selected_st]
+            subtopic = chapter.subtopic(selected_st) if selected_st else None
+            if subtopic:
+                st_data = subtopic.data
 
                 col1, col2 = st.columns([1, 1])
 
-                # 버튼 키를 위한 고유 식별자
-                st_key = f"{selected_ch}_{selected_st}".replace(" ", "_")
+                # 버튼 키를 위한 고유 식별자 (제목을 바꿔도 유지)
+                st_key = subtopic.id
 
                 with col1:
                     st.markdown("### 인터뷰")
@@ -6097,10 +6655,17 @@ elif current == 5:
                             if not get_api_key():
                                 st.error("API 키를 입력해주세요")
                             else:
-                                with st.spinner("본문 작성 중... (1~2분 소요)"):
-                                    content = generate_content_premium(selected_st, selected_ch, st_data['questions'], st_data['answers'], st.session_state['topic'], st.session_state['target_persona'])
+                                # 토큰이 도착하는 대로 미리보기 박스에 표시
+                                stream_box = st.empty()
+                                stream_box.caption("✍️ 본문 작성 중... 글이 써지는 대로 바로 보여드려요")
+
+                                def show_partial_content(text):
+                                    stream_box.markdown(content_preview_html(text), unsafe_allow_html=True)
+
+                                with st.spinner("본문 작성 중..."):
+                                    content = generate_content_premium(selected_st, selected_ch, st_data['questions'], st_data['answers'], st.session_state['topic'], st.session_state['target_persona'], on_text=show_partial_content)
                                     if content:
-                                        st_data['content'] = content
+                                        set_subtopic_content(subtopic, content)
                                         st.success("본문 생성 완료!")
                                         st.rerun()
                                     else:
@@ -6112,38 +6677,8 @@ elif current == 5:
                     current_content = st_data.get('content', '')
                     if current_content:
                         # HTML 형식으로 변환하여 표시
-                        formatted_html = format_content_html(current_content)
-                        st.markdown(f"""
-                        <style>
-                        .content-preview-box {{
-                            background:#ffffff !important;
-                            padding:25px 30px;
-                            border-radius:12px;
-                            border:1px solid rgba(212,175,55,0.3);
-                            margin:15px 0;
-                            font-family:'S-CoreDream', sans-serif !important;
-                            font-size:17px;
-                            max-height:500px;
-                            overflow-y:auto;
-                        }}
-                        .content-preview-box,
-                        .content-preview-box p,
-                        .content-preview-box span,
-                        .content-preview-box div {{
-                            color:#000000 !important;
-                            -webkit-text-fill-color:#000000 !important;
-                        }}
-                        .content-preview-box b[style*="color:#e67e22"],
-                        .content-preview-box p[style*="color:#e67e22"] {{
-                            color:#e67e22 !important;
-                            -webkit-text-fill-color:#e67e22 !important;
-                        }}
-                        </style>
-                        <div class="content-preview-box">
-                            {formatted_html}
-                        </div>
-                        """, unsafe_allow_html=True)
-                        st.caption(f"📝 {len(current_content.replace(' ', '').replace(chr(10), '')):,}자")
+                        st.markdown(get_preview_html(subtopic), unsafe_allow_html=True)
+                        st.caption(f"📝 {subtopic.chars:,}자")
 
                         # 이미지 추가 기능
                         st.markdown("---")
@@ -6176,7 +6711,7 @@ elif current == 5:
                             st.caption("「중요단어」 → 주황색 강조 | ★ 문장 → 핵심 강조")
                             edited = st.text_area("본문 편집", value=current_content, height=400, key=f"content_{st_key}", label_visibility="collapsed")
                             if edited != current_content:
-                                st_data['content'] = edited
+                                set_subtopic_content(subtopic, edited)
                                 st.rerun()
                     else:
                         st.markdown('<div style="text-align:center;padding:80px 20px;background:rgba(255,255,255,0.03);border-radius:12px;border:1px dashed rgba(212,175,55,0.3);"><p style="color:var(--text2);font-size:16px;">본문이 아직 없습니다<br>질문에 답변 후 "본문 생성" 버튼을 누르세요</p></div>', unsafe_allow_html=True)
@@ -6185,10 +6720,8 @@ elif current == 5:
 
         st.markdown("---")
         st.markdown("### 전체 본문")
-        full_content = get_full_content()
-        if full_content:
-            char_count = len(full_content.replace(' ', '').replace('\n', ''))
-            st.success(f"총 {char_count:,}자 | 약 {char_count//500}페이지")
+        if book.done_count():
+            st.success(f"총 {book.char_count():,}자 | {book.totals.paragraphs:,}문단 | 약 {book.page_count()}페이지")
 
     st.markdown('<div class="next-section"></div>', unsafe_allow_html=True)
     c1, c2, c3 = st.columns([1, 1, 1])
@@ -6251,7 +6784,7 @@ JSON 형식으로 응답:
     "reference_books": ["참고할 베스트셀러 표지 1", "표지 2", "표지 3"],
     "canva_search_keyword": "Canva에서 검색할 키워드 (영문)"
 }}"""
-                    result = ask_ai(prompt, 0.7)
+                    result = ask_ai(prompt, 0.7, cache_kind='analysis')
                     parsed = parse_json(result)
                     if parsed:
                         st.session_state['cover_suggestion'] = parsed
@@ -6381,17 +6914,32 @@ elif current == 7:
         final_title = st.text_input("제목", value=st.session_state.get('book_title', ''), key="p6_title")
         final_subtitle = st.text_input("부제", value=st.session_state.get('subtitle', ''), key="p6_subtitle")
 
-        full = f"{final_title}\n{final_subtitle}\n\n{'='*50}\n\n"
-        for ch in st.session_state.get('outline', []):
-            if ch in st.session_state.get('chapters', {}):
-                ch_data = st.session_state['chapters'][ch]
-                ch_content = ""
-                for s in ch_data.get('subtopics', []):
-                    c = ch_data.get('subtopic_data', {}).get(s, {}).get('content', '')
-                    if c:
-                        ch_content += f"\n\n【{s}】\n\n{clean_content(c)}"
-                if ch_content:
-                    full += f"\n\n{ch}\n{'-'*40}{ch_content}\n"
+        # 부속 원고 (프롤로그/에필로그/저자 소개) - 모든 내보내기에서 공통 사용
+        book_assets = get_book_assets()
+        with st.expander("✍️ 프롤로그 · 에필로그 · 저자 소개", expanded=not any(book_assets.values())):
+            interview_data = st.session_state.get('interview_data', {})
+            if not interview_data:
+                st.caption("인터뷰 정보가 없으면 기본 문구가 들어갑니다. 직접 수정할 수 있습니다.")
+            if st.button("✨ AI로 한 번에 생성", key="p7_gen_assets", use_container_width=True):
+                if not get_api_key():
+                    st.error("API 키를 입력해주세요")
+                else:
+                    with st.spinner("프롤로그 · 에필로그 · 저자 소개 작성 중..."):
+                        generate_book_assets(interview_data)
+                    # 편집창을 새 원고로 갱신
+                    for name in BOOK_ASSET_KEYS:
+                        st.session_state.pop(f"p7_asset_{name}", None)
+                    st.rerun()
+
+            asset_labels = {'prologue': "프롤로그", 'epilogue': "에필로그 (마치며)", 'author_bio': "저자 소개"}
+            for name in BOOK_ASSET_KEYS:
+                edited_asset = st.text_area(asset_labels[name], value=book_assets[name], height=150, key=f"p7_asset_{name}")
+                if edited_asset != book_assets[name]:
+                    book_assets[name] = edited_asset
+                    st.session_state['book_assets'] = book_assets
+
+        book = get_book()
+        full = write_chunks(iter_txt_chunks(book, final_title, final_subtitle, book_assets))
 
         st.markdown("**미리보기**")
         st.text_area("전체 내용", value=full, height=300, disabled=True, key="p7_preview")
@@ -6438,43 +6986,64 @@ elif current == 7:
         with c3:
             # DOCX 다운로드
             if DOCX_AVAILABLE:
-                docx_data, docx_error = create_ebook_docx(
-                    final_title,
-                    final_subtitle,
-                    author_name,
-                    st.session_state.get('chapters', {}),
-                    st.session_state.get('outline', []),
-                    st.session_state.get('interview_data', {})
-                )
-                if docx_data:
-                    st.download_button(
-                        "📘 WORD",
-                        docx_data,
-                        file_name=f"{final_title or 'ebook'}.docx",
-                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                        use_container_width=True,
-                        key="p7_docx"
-                    )
-                else:
-                    st.button("📘 WORD", disabled=True, use_container_width=True, key="p7_docx_disabled")
-                    if docx_error:
-                        st.caption(f"⚠️ {docx_error[:30]}")
+                # 워드 파일은 버튼을 눌렀을 때만 생성, 내용이 같으면 만들어 둔 파일 재사용
+                book_hash = get_book_hash(final_title, final_subtitle, author_name, book, book_assets)
+                docx_cache = st.session_state.get('docx_cache')
+                if docx_cache and docx_cache.get('hash') == book_hash and os.path.exists(docx_cache.get('path', '')):
+                    with open(docx_cache['path'], 'rb') as docx_file:
+                        st.download_button(
+                            "📘 WORD",
+                            docx_file,
+                            file_name=f"{final_title or 'ebook'}.docx",
+                            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                            use_container_width=True,
+                            key="p7_docx"
+                        )
+                elif (get_active_job() or {}).get('kind') == 'docx':
+                    st.button("⏳ WORD 생성 중...", disabled=True, use_container_width=True, key="p7_docx_wait")
+                elif st.button("📘 WORD 만들기", use_container_width=True, key="p7_docx_build"):
+                    # 챕터 조각 캐시는 세션에 두고 계속 쓴다 (본문을 고친 챕터만 다시 렌더링)
+                    fragment_cache = st.session_state.setdefault('docx_fragment_cache', FragmentCache())
+                    # 작업에는 지금 내용의 스냅샷만 넘긴다 (book_hash도 같은 시점의 값)
+                    docx_args = (final_title, final_subtitle, author_name, snapshot_docx_chapters(book),
+                                 dict(book_assets), fragment_cache, get_docx_export_path())
+
+                    def build_docx(progress):
+                        progress.info("워드 파일 생성 중...")
+                        docx_path, docx_error = create_ebook_docx(*docx_args)
+                        if not docx_path:
+                            progress.error(f"워드 생성 실패: {docx_error or '알 수 없는 오류'}")
+                            return None
+                        progress.success("✅ 워드 파일 준비 완료")
+                        return docx_path
+
+                    def keep_docx(docx_path):
+                        # 파일 경로만 보관 (내용은 임시 파일에, 세션마다 최신 버전 하나)
+                        st.session_state['docx_cache'] = {'hash': book_hash, 'path': docx_path}
+
+                    start_job('docx', "📘 WORD 만들기", build_docx, on_done=keep_docx)
             else:
                 st.button("📘 WORD", disabled=True, use_container_width=True, key="p7_docx_na")
                 st.caption("pip install python-docx")
 
-        total = len(full.replace(' ', '').replace('\n', ''))
+        # 본문 합계는 모델에 누적된 값, 부속 원고만 따로 센다
+        total = book.char_count() + sum(count_chars(text) for text in (
+            book_assets['prologue'] or DEFAULT_PROLOGUE,
+            book_assets['epilogue'] or DEFAULT_EPILOGUE,
+            book_assets['author_bio'] or DEFAULT_AUTHOR_BIO,
+        ))
         if total > 0:
-            st.success(f"총 {total:,}자 | 약 {total//500}페이지")
+            st.success(f"총 {total:,}자 | 약 {estimate_pages(total)}페이지")
 
     with col2:
         st.markdown("### 현황")
-        total_st = sum(len(ch.get('subtopics', [])) for ch in st.session_state.get('chapters', {}).values())
-        done = sum(1 for ch in st.session_state.get('chapters', {}).values() for s in ch.get('subtopic_data', {}).values() if s.get('content'))
+        total_st = book.subtopic_count()
+        done = book.done_count()
 
         if total_st > 0:
             st.progress(done / total_st)
             st.write(f"**완료:** {done}/{total_st}")
+            st.write(f"**분량:** {book.char_count():,}자 · {book.totals.paragraphs:,}문단 · 약 {book.page_count()}페이지")
 
     st.markdown('<div class="next-section"></div>', unsafe_allow_html=True)
     c1, c2, c3 = st.columns([1, 2, 1])